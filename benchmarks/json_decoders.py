@@ -0,0 +1,114 @@
+import argparse
+import json
+import random
+import timeit
+from requests.models import Response
+from binance.client import PublicClient
+from binance.json_decoder import JSON_DECODERS
+
+
+def synthetic_exchange_info(symbols: int = 2000) -> dict:
+    filters = [
+        {'filterType': 'PRICE_FILTER', 'minPrice': '0.00000100',
+         'maxPrice': '100000.00000000', 'tickSize': '0.00000100'},
+        {'filterType': 'PERCENT_PRICE', 'multiplierUp': '5',
+         'multiplierDown': '0.2', 'avgPriceMins': 5},
+        {'filterType': 'LOT_SIZE', 'minQty': '0.00100000',
+         'maxQty': '100000.00000000', 'stepSize': '0.00100000'},
+        {'filterType': 'MIN_NOTIONAL', 'minNotional': '0.00010000',
+         'applyToMarket': True, 'avgPriceMins': 5},
+        {'filterType': 'ICEBERG_PARTS', 'limit': 10},
+        {'filterType': 'MARKET_LOT_SIZE', 'minQty': '0.00000000',
+         'maxQty': '1000.00000000', 'stepSize': '0.00000000'},
+        {'filterType': 'MAX_NUM_ORDERS', 'maxNumOrders': 200},
+        {'filterType': 'MAX_NUM_ALGO_ORDERS', 'maxNumAlgoOrders': 5},
+    ]
+    return {
+        'timezone': 'UTC',
+        'serverTime': 1609459200000,
+        'rateLimits': [],
+        'exchangeFilters': [],
+        'symbols': [{'symbol': 'SYM{}BTC'.format(i), 'status': 'TRADING',
+                     'baseAsset': 'SYM{}'.format(i), 'baseAssetPrecision': 8,
+                     'quoteAsset': 'BTC', 'quotePrecision': 8,
+                     'quoteAssetPrecision': 8, 'baseCommissionPrecision': 8,
+                     'quoteCommissionPrecision': 8,
+                     'orderTypes': ['LIMIT', 'LIMIT_MAKER', 'MARKET',
+                                    'STOP_LOSS_LIMIT', 'TAKE_PROFIT_LIMIT'],
+                     'icebergAllowed': True, 'ocoAllowed': True,
+                     'quoteOrderQtyMarketAllowed': True,
+                     'isSpotTradingAllowed': True, 'isMarginTradingAllowed': False,
+                     'filters': filters, 'permissions': ['SPOT']}
+                    for i in range(symbols)]}
+
+
+def synthetic_24hr_ticker(symbols: int = 2000) -> list:
+    def price():
+        return '{:.8f}'.format(random.uniform(0.0001, 50000))
+    return [{'symbol': 'SYM{}BTC'.format(i), 'priceChange': price(),
+             'priceChangePercent': '1.234', 'weightedAvgPrice': price(),
+             'prevClosePrice': price(), 'lastPrice': price(), 'lastQty': price(),
+             'bidPrice': price(), 'bidQty': price(), 'askPrice': price(),
+             'askQty': price(), 'openPrice': price(), 'highPrice': price(),
+             'lowPrice': price(), 'volume': price(), 'quoteVolume': price(),
+             'openTime': 1609372800000, 'closeTime': 1609459199999,
+             'firstId': 100000 + i, 'lastId': 200000 + i, 'count': 100000}
+            for i in range(symbols)]
+
+
+def synthetic_klines(rows: int = 1000) -> list:
+    def price():
+        return '{:.8f}'.format(random.uniform(0.0001, 50000))
+    return [[1609459200000 + i * 60000, price(), price(), price(), price(), price(),
+             1609459259999 + i * 60000, price(), 1000, price(), price(), '0']
+            for i in range(rows)]
+
+
+def synthetic_payloads() -> dict:
+    return {'exchangeInfo': json.dumps(synthetic_exchange_info()).encode(),
+            'ticker/24hr': json.dumps(synthetic_24hr_ticker()).encode(),
+            'klines': json.dumps(synthetic_klines()).encode()}
+
+
+def live_payloads() -> dict:
+    client = PublicClient()
+    session = client.request_handler.session
+    uris = {'exchangeInfo': (client._create_api_uri('exchangeInfo'), {}),
+            'ticker/24hr': (client._create_api_uri('ticker/24hr'), {}),
+            'klines': (client._create_api_uri('klines'),
+                       {'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 1000})}
+    return {name: session.get(uri, params=params).content
+            for name, (uri, params) in uris.items()}
+
+
+def requests_json(content: bytes):
+    # what response.json() costs, including the charset detection
+    response = Response()
+    response._content = content
+    return response.json()
+
+
+def run(payloads: dict, number: int) -> None:
+    decoders = dict(JSON_DECODERS)
+    decoders['response.json()'] = requests_json
+    print('{:<16}{:>10}'.format('payload', 'size kB') +
+          ''.join('{:>18}'.format(name) for name in decoders))
+    for payload_name, content in payloads.items():
+        timings = []
+        for decoder in decoders.values():
+            seconds = min(timeit.repeat(lambda: decoder(content),
+                                        number=number, repeat=3)) / number
+            timings.append('{:>15.2f} ms'.format(seconds * 1000))
+        print('{:<16}{:>10.0f}'.format(payload_name, len(content) / 1024) +
+              ''.join(timings))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare json decoders on large binance responses')
+    parser.add_argument('--live', action='store_true',
+                        help='fetch the payloads from the binance api')
+    parser.add_argument('--number', type=int, default=20,
+                        help='decodes per timing run')
+    args = parser.parse_args()
+    run(live_payloads() if args.live else synthetic_payloads(), args.number)
@@ -23,6 +23,7 @@ class ApiUrl(object):
         self.FUTURES  = self._base_url + '/sapi'
         self.WALLET1 = self._base_url + '/sapi'
         self.WALLET2 = self._base_url + '/wapi'
+        self.STREAM  = 'wss://stream.binance.{}:9443'.format(self._tld)
         
      
 class KlineInterval(object):
@@ -41,6 +42,10 @@ class KlineInterval(object):
     THREEDAY      = '3d'
     ONEWEEK       = '1w'
     ONEMONTH      = '1M'
+
+class KlineOutputFormat(object):
+    NUMPY   = 'numpy'    # structured array with typed fields
+    COLUMNS = 'columns'  # dict of contiguous typed column arrays
     
 class OrderStatus(object):
     NEW              = 'NEW'
@@ -135,5 +140,9 @@ WEBSOCKET_DEPTH_5 = '5'
 WEBSOCKET_DEPTH_10 = '10'
 WEBSOCKET_DEPTH_20 = '20'
 
+class DepthUpdateSpeed(object):
+    MS100  = '100ms'
+    MS1000 = '1000ms'
+
 if __name__ == '__main__':
     pass
@@ -0,0 +1,343 @@
+from typing import AsyncIterator, Callable, Union
+from .async_request_handler import AsyncRequestHandler
+from .clock import AsyncServerClock
+from .exchange_info_cache import AsyncExchangeInfoCache
+from .client import PublicClient, AuthenticatedClient
+from binance.endpoints.margin_trade import MarginAccountEndpoints
+from binance.endpoints.market_data import MarketDataEndpoints
+from binance.endpoints.spot_trade import SpotAccountTradeEndpoints
+from binance.endpoints.wallet import HISTORY_PAGE_LIMIT, WalletEndpoints
+from binance.klines import format_klines
+from binance.order_filters import SymbolFilters
+from binance.utils import BatchResult, format_time, gather_batch_concurrently
+from binance.utils import interval_to_ms, raise_first_error
+import asyncio
+
+
+class AsyncMarketDataEndpoints(MarketDataEndpoints):
+    # endpoints which post-process a response have to await it first,
+    # all other endpoints return the request handler coroutine directly
+
+    async def start_clock_sync(self, interval: float = 60.0, samples: int = 3) -> AsyncServerClock:
+        clock = AsyncServerClock(self.get_server_time, interval, samples)
+        await clock.sync()
+        clock.start()
+        self.request_handler.clock = clock
+        return clock
+
+    async def run_batch(self, calls: list, max_workers: int = None) -> BatchResult:
+        outcomes = await gather_batch_concurrently(
+            self._get_batch_calls(calls),
+            max_workers or self.request_handler.pool_maxsize)
+        return BatchResult(range(len(calls)), outcomes)
+
+    async def map_symbols(self,
+                          method: str,
+                          symbols: list,
+                          max_workers: int = None,
+                          **kwargs) -> BatchResult:
+        calls = [(method, dict(kwargs, symbol=symbol)) for symbol in symbols]
+        outcomes = await gather_batch_concurrently(
+            self._get_batch_calls(calls),
+            max_workers or self.request_handler.pool_maxsize)
+        return BatchResult(symbols, outcomes)
+
+    async def get_exchange_info(self) -> dict:
+        if self.exchange_info_cache is not None:
+            return await self.exchange_info_cache.get()
+        return await self._get_exchange_info()
+
+    async def _get_exchange_info(self) -> dict:
+        uri = self._create_api_uri('exchangeInfo')
+        exchange_info = await self.request_handler.get(uri)
+        if self.request_handler.rate_limiter is not None:
+            self.request_handler.rate_limiter.update_limits(
+                exchange_info['rateLimits'])
+        return exchange_info
+
+    async def get_symbol_info(self, symbol: str) -> dict:
+        if self.exchange_info_cache is not None:
+            return await self.exchange_info_cache.get_symbol(symbol)
+        resp_data = await self.get_exchange_info()
+        for sym_data in resp_data['symbols']:
+            if(sym_data['symbol'] == symbol.upper()):
+                return sym_data
+        return None
+
+    async def get_klines(self,
+                         symbol: str,
+                         interval: str,
+                         startTime: Union[int, str] = None,
+                         endTime: Union[int, str] = None,
+                         limit: int = None,
+                         output_format: str = None) -> dict:
+        klines = await super().get_klines(symbol=symbol,
+                                          interval=interval,
+                                          startTime=startTime,
+                                          endTime=endTime,
+                                          limit=limit)
+        return format_klines(klines, output_format)
+
+    async def _get_kline_page(self, output_format: str = None, **params):
+        return self._decode_kline_page(await self.get_klines(**params),
+                                       output_format)
+
+    async def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        if self.exchange_info_cache is not None:
+            return await self.exchange_info_cache.get_symbol_filters(symbol)
+        symbol_info = await self.get_symbol_info(symbol)
+        if symbol_info is None:
+            return None
+        return SymbolFilters.from_symbol_info(symbol_info)
+
+    async def _get_earliest_valid_timestamp(self, symbol: str, interval: str):
+        kline = await self.get_klines(
+            symbol=symbol,
+            interval=interval,
+            limit=1,
+            startTime=0,
+            endTime=None)
+        return kline[0][0]
+
+    async def _get_historical_kline_params(self,
+                                           symbol: str,
+                                           interval: str,
+                                           startTime: Union[int, str],
+                                           endTime: Union[int, str] = None) -> dict:
+        params = locals()
+        del params['self']
+        earliest_timestamp = await self._get_earliest_valid_timestamp(symbol,
+                                                                      interval)
+        return self._check_historical_kline_params(earliest_timestamp, **params)
+
+    async def get_historical_klines(self,
+                                    symbol: str,
+                                    interval: str,
+                                    startTime: Union[int, str],
+                                    endTime: Union[int, str] = None,
+                                    max_workers: int = None,
+                                    output_format: str = None) -> dict:
+        params = await self._get_historical_kline_params(symbol, interval,
+                                                         startTime, endTime)
+        if(max_workers is not None) and (interval != self.KLINE_INTERVAL.ONEMONTH):
+            windows = self._get_kline_windows(**params)
+            pages = raise_first_error(await gather_batch_concurrently(
+                [(self._get_kline_page, dict(window, output_format=output_format))
+                 for window in windows],
+                max_workers))
+        else:
+            pages = [page async for page in self._iter_kline_pages(params,
+                                                                   output_format)]
+        return self._merge_kline_pages(pages, output_format)
+
+    async def iter_historical_klines(self,
+                                     symbol: str,
+                                     interval: str,
+                                     startTime: Union[int, str],
+                                     endTime: Union[int, str] = None,
+                                     output_format: str = None) -> AsyncIterator:
+        params = await self._get_historical_kline_params(symbol, interval,
+                                                         startTime, endTime)
+        async for page in self._iter_kline_pages(params, output_format):
+            yield page
+
+    async def _iter_kline_pages(self, params: dict, output_format: str = None) -> AsyncIterator:
+        params = dict(params, limit=500)
+        api_call_count = 0
+        while(True):
+            fetched_data = await self.get_klines(**params)
+            api_call_count += 1
+            if fetched_data:
+                yield self._decode_kline_page(fetched_data, output_format)
+            if(len(fetched_data) < params['limit']):
+                break
+            params['startTime'] = fetched_data[-1][0] + interval_to_ms(params['interval'])
+            if (api_call_count) == 3:
+                if self.request_handler.rate_limiter is None:
+                    await asyncio.sleep(0.5)
+                api_call_count = 0
+
+
+class AsyncSpotAccountTradeEndpoints(SpotAccountTradeEndpoints):
+
+    async def create_orders(self, orders: list, max_workers: int = None) -> BatchResult:
+        outcomes = await self._create_orders(orders, max_workers)
+        return BatchResult(range(len(orders)), outcomes)
+
+    async def _get_historical_data(self,
+                                   func: Callable,
+                                   symbol,
+                                   startTime: Union[int, str] = 0,
+                                   endTime: Union[int, str] = None,
+                                   **kwargs) -> dict:
+
+        data = []
+        async for page in self._iter_historical_data(func, symbol, startTime,
+                                                     endTime, **kwargs):
+            data.extend(page)
+        return data
+
+    async def _iter_historical_data(self,
+                                    func: Callable,
+                                    symbol,
+                                    startTime: Union[int, str] = 0,
+                                    endTime: Union[int, str] = None,
+                                    **kwargs) -> AsyncIterator:
+
+        earliest_data = await func(symbol, startTime=0, limit=1)
+        if not earliest_data:
+            return
+        startTime = format_time(startTime)
+        startTime = max(earliest_data[0]['time'], startTime)
+        if(endTime is not None):
+            endTime = format_time(endTime)
+            if(startTime > endTime):
+                raise ValueError('startTime entered is greater than endTime')
+        limit = 500
+        api_call_count = 0
+        while(True):
+            fetched_data = await func(symbol,
+                                      startTime=startTime,
+                                      endTime=endTime,
+                                      limit=limit,
+                                      **kwargs)
+            api_call_count += 1
+            if fetched_data:
+                yield fetched_data
+            if(len(fetched_data) < limit):
+                break
+            startTime = fetched_data[-1]['time'] + 1
+            if (api_call_count) == 3:
+                if self.request_handler.rate_limiter is None:
+                    await asyncio.sleep(0.5)  # sleep to prevent overload of api calls
+                api_call_count = 0
+
+
+class AsyncMarginAccountEndpoints(MarginAccountEndpoints):
+
+    async def iter_margin_records(self,
+                                  method: str,
+                                  queries: list = None,
+                                  max_workers: int = None,
+                                  **kwargs) -> AsyncIterator:
+        func = getattr(self, method)
+        max_workers = max_workers or self.request_handler.pool_maxsize
+        first_calls = self._margin_record_calls(method, queries, kwargs)
+        first_pages = raise_first_error(await gather_batch_concurrently(
+            [(func, call) for call in first_calls], max_workers))
+        remaining = self._remaining_page_calls(first_calls, first_pages)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def get_page(kwargs):
+            async with semaphore:
+                return await func(**kwargs)
+        tasks = [asyncio.ensure_future(get_page(call)) for _, call in remaining]
+        position = 0
+        try:
+            for index, first_page in enumerate(first_pages):
+                for row in first_page.get('rows', []):
+                    yield row
+                while (position < len(remaining)) and (remaining[position][0] == index):
+                    for row in (await tasks[position]).get('rows', []):
+                        yield row
+                    position += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_margin_records(self,
+                                 method: str,
+                                 queries: list = None,
+                                 max_workers: int = None,
+                                 **kwargs) -> list:
+        return [row async for row in self.iter_margin_records(method, queries,
+                                                              max_workers, **kwargs)]
+
+
+class AsyncWalletEndpoints(WalletEndpoints):
+
+    async def _get_history_window(self, func: Callable, **params) -> list:
+        records = []
+        offset = 0
+        while(True):
+            page = await func(offset=offset, limit=HISTORY_PAGE_LIMIT, **params)
+            records.extend(page)
+            if len(page) < HISTORY_PAGE_LIMIT:
+                return records
+            offset += HISTORY_PAGE_LIMIT
+
+    async def _get_history_range(self,
+                                 func: Callable,
+                                 key: str,
+                                 time_key: str,
+                                 startTime: Union[int, str],
+                                 endTime: Union[int, str] = None,
+                                 max_workers: int = None,
+                                 **params) -> list:
+        windows = raise_first_error(await gather_batch_concurrently(
+            [(self._get_history_window, call)
+             for call in self._history_calls(func, startTime, endTime, **params)],
+            max_workers or self.request_handler.pool_maxsize))
+        return self._merge_history(windows, key, time_key)
+
+    async def _iter_history_range(self,
+                                  func: Callable,
+                                  key: str,
+                                  time_key: str,
+                                  startTime: Union[int, str],
+                                  endTime: Union[int, str] = None,
+                                  max_workers: int = None,
+                                  **params) -> AsyncIterator:
+        semaphore = asyncio.Semaphore(max_workers or self.request_handler.pool_maxsize)
+
+        async def get_window(kwargs):
+            async with semaphore:
+                return await self._get_history_window(**kwargs)
+        tasks = [asyncio.ensure_future(get_window(kwargs))
+                 for kwargs in self._history_calls(func, startTime, endTime, **params)]
+        seen = set()
+        try:
+            for task in tasks:
+                for record in self._merge_history([await task], key, time_key, seen):
+                    yield record
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class AsyncPublicClient(AsyncMarketDataEndpoints, PublicClient):
+
+    _request_handler_class = AsyncRequestHandler
+    _exchange_info_cache_class = AsyncExchangeInfoCache
+
+    async def close(self) -> None:
+        await self.request_handler.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class AsyncAuthenticatedClient(AsyncMarketDataEndpoints,
+                               AsyncMarginAccountEndpoints,
+                               AsyncSpotAccountTradeEndpoints,
+                               AsyncWalletEndpoints,
+                               AuthenticatedClient):
+
+    _request_handler_class = AsyncRequestHandler
+    _exchange_info_cache_class = AsyncExchangeInfoCache
+
+    async def close(self) -> None:
+        await self.request_handler.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,196 @@
+from .rate_limiter import RateLimiter
+from .coalescer import AsyncRequestCoalescer
+from .exceptions import BinanceAPIError, RequestHandlerError
+from .request_handler import RequestHandler
+from .retry import RetryPolicy, NO_SUCH_ORDER
+from .utils import gather_batch_concurrently
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+import aiohttp
+import asyncio
+
+
+class AsyncRequestHandler(RequestHandler):
+
+    _retry_exceptions = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+    _coalescer_class = AsyncRequestCoalescer
+
+    def __init__(self,
+                 api_key: str = None,
+                 api_secret: str = None,
+                 request_params: dict = None,
+                 rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = True,
+                 json_decoder: str = None,
+                 coalesce_ttl: float = None):
+
+        super().__init__(api_key=api_key,
+                         api_secret=api_secret,
+                         request_params=request_params,
+                         rate_limiter=rate_limiter,
+                         retry_policy=retry_policy,
+                         pool_maxsize=pool_maxsize,
+                         pool_block=pool_block,
+                         json_decoder=json_decoder,
+                         coalesce_ttl=coalesce_ttl)
+        self._connections_opened = 0
+        self._connections_reused = 0
+
+    def _init_session(self) -> None:
+        # aiohttp sessions have to be created inside a running event loop
+        return None
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        async def on_connection_create_end(session, context, params):
+            self._connections_opened += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self._connections_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if (self.session is None) or self.session.closed:
+            # aiohttp always queues requests once the connector limit is
+            # reached, so pool_block has no effect here
+            self.session = aiohttp.ClientSession(
+                headers=self._session_headers(),
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize),
+                trace_configs=[self._trace_config()])
+        return self.session
+
+    def mount_pools(self, *uri_prefixes: str) -> None:
+        # a single aiohttp connector pools the connections of all prefixes
+        pass
+
+    async def warm_up(self, uri: str, connections: int = None) -> dict:
+        connections = connections or self.pool_maxsize
+        await asyncio.gather(*[self.get(uri, coalesce=False) for _ in range(connections)])
+        return self.pool_stats()
+
+    def pool_stats(self) -> dict:
+        requests = self._connections_opened + self._connections_reused
+        if not requests:
+            return {}
+        return {'https://': {'requests': requests,
+                             'connections_opened': self._connections_opened,
+                             'connections_reused': self._connections_reused}}
+
+    def _request_kwargs(self) -> dict:
+        kwargs = super()._request_kwargs()
+        kwargs['timeout'] = aiohttp.ClientTimeout(total=kwargs['timeout'])
+        if 'verify' in kwargs:
+            kwargs['ssl'] = None if kwargs.pop('verify') else False
+        return kwargs
+
+    @staticmethod
+    def _normalize_params(params) -> list:
+        # aiohttp only accepts str, int and float query values
+        if isinstance(params, dict):
+            params = params.items()
+        normalized = []
+        for key, value in params:
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for val in values:
+                if isinstance(val, bool):
+                    val = str(val)
+                normalized.append((key, val))
+        return normalized
+
+    async def _send(self,
+                    method: str,
+                    uri: str,
+                    signed: bool,
+                    params: dict,
+                    prepared: tuple = None) -> Response:
+        kwargs = self._request_kwargs()
+        wait, query_params = prepared or self._prepare_request(method, uri, signed, params)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if query_params is None:
+            query_params = self._prepare_params(signed, params)
+        kwargs['params'] = self._normalize_params(query_params)
+        session = self._get_session()
+        async with session.request(method.upper(), uri, **kwargs) as resp:
+            body = await resp.read()
+            response = self._create_response(resp, body)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_headers(response.status_code,
+                                                  response.headers)
+        return response
+
+    async def _lookup_order(self, uri: str, params: dict) -> dict:
+        try:
+            return await self._request('get', uri, signed=True,
+                                       **RetryPolicy.order_lookup_params(params))
+        except BinanceAPIError as e:
+            if e.code == NO_SUCH_ORDER:
+                return None
+            raise
+
+    async def _request(self,
+                       method: str,
+                       uri: str,
+                       signed: bool = False,
+                       forced_params=False,
+                       prepared: tuple = None,
+                       **params):
+
+        retry_policy = self.get_retry_policy(uri)
+        attempt = 0
+        while(True):
+            try:
+                response = await self._send(method, uri, signed, params, prepared)
+                prepared = None
+            except self._retry_exceptions:
+                prepared = None
+                if retry_policy is None:
+                    raise
+                delay = retry_policy.get_delay(attempt, method, uri, params)
+                if delay is None:
+                    raise
+            else:
+                if (retry_policy is None) or (200 <= response.status_code < 300):
+                    return self._handle_response(response)
+                delay = retry_policy.get_delay(attempt, method, uri, params, response)
+                if delay is None:
+                    return self._handle_response(response)
+            await asyncio.sleep(delay)
+            attempt += 1
+            if retry_policy.requires_lookup(method, uri, params):
+                order = await self._lookup_order(uri, params)
+                if order is not None:
+                    return order
+
+    async def post_batch(self, path, params_list: list, max_workers: int = None) -> list:
+        if not self.authenticated:
+            raise RequestHandlerError(
+                "Unauthenticated client issued a POST http request")
+        return await gather_batch_concurrently(
+            self._prepare_batch('post', path, params_list),
+            max_workers or self.pool_maxsize)
+
+    @staticmethod
+    def _create_response(resp: aiohttp.ClientResponse, body: bytes) -> Response:
+        # wrap the aiohttp response so that response handling and
+        # BinanceAPIError are shared with the blocking RequestHandler
+        response = Response()
+        response.status_code = resp.status
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.url = str(resp.url)
+        response.encoding = resp.charset or 'utf-8'
+        response._content = body
+        return response
+
+    async def close(self) -> None:
+        if (self.session is not None) and not self.session.closed:
+            await self.session.close()
+
+
+if __name__ == '__main__':
+    pass
@@ -1,9 +1,13 @@
 from .api_def import ApiUrl, ApiVersion
-from .api_def import KlineInterval, DepositHistoryStatus
+from .api_def import KlineInterval, DepositHistoryStatus, FuturesTransferType
 from .api_def import OrderResponseType, OrderSide, OrderStatus, OrderType
 from .api_def import SideEffectType, TimeInForce 
 from .api_def import WithrawHistoryStatus, WalletType
+from .exchange_info_cache import ExchangeInfoCache
+from .rate_limiter import RateLimiter
 from .request_handler import RequestHandler
+from .retry import RetryPolicy
+from binance.endpoints.futures import FuturesEndpoints
 from binance.endpoints.market_data import MarketDataEndpoints
 from binance.endpoints.margin_trade import MarginAccountEndpoints
 from binance.endpoints.spot_trade import SpotAccountTradeEndpoints
@@ -12,12 +16,30 @@ from binance.endpoints.wallet import WalletEndpoints
 
 class PublicClient(MarketDataEndpoints):
 
+    _request_handler_class = RequestHandler
+    _exchange_info_cache_class = ExchangeInfoCache
+
     def __init__(self,
                  endpoint_version: str='',
                  request_params: dict=None,
-                 tld: str='com'):       
+                 tld: str='com',
+                 rate_limiter: RateLimiter = None,
+                 exchange_info_ttl: float = None,
+                 retry_policy: RetryPolicy = None,
+                 pool_maxsize: int = 10,
+                 json_decoder: str = None,
+                 coalesce_ttl: float = None):
         self.API_URL = ApiUrl(endpoint_version, tld)
-        self._request_handler = RequestHandler(request_params=request_params)
+        self._request_handler = self._request_handler_class(
+            request_params=request_params,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            pool_maxsize=pool_maxsize,
+            json_decoder=json_decoder,
+            coalesce_ttl=coalesce_ttl)
+        self._request_handler.mount_pools(*self._pool_prefixes())
+        self._exchange_info_cache = self._create_exchange_info_cache(
+            exchange_info_ttl)
         self._kline_interval = KlineInterval
 
     @property
@@ -27,30 +49,63 @@ class PublicClient(MarketDataEndpoints):
     @property
     def request_handler(self):
         return self._request_handler
+
+    @property
+    def exchange_info_cache(self):
+        return self._exchange_info_cache
+
+    def _create_exchange_info_cache(self, ttl: float = None):
+        if ttl is None:
+            return None
+        return self._exchange_info_cache_class(self._get_exchange_info, ttl)
     
     def _create_api_uri(self, path: str, version=ApiVersion.PUBLIC) -> str:
         return self.API_URL.DEFAULT + '/' + version + '/' + path
 
+    def _pool_prefixes(self) -> list:
+        return [self.API_URL.DEFAULT + '/', self.API_URL.MARGIN + '/',
+                self.API_URL.WITHDRAW + '/']
+
  
 class AuthenticatedClient(MarketDataEndpoints,
                           MarginAccountEndpoints,
                           SpotAccountTradeEndpoints,
-                          WalletEndpoints):
+                          WalletEndpoints,
+                          FuturesEndpoints):
+
+    _request_handler_class = RequestHandler
+    _exchange_info_cache_class = ExchangeInfoCache
 
     def __init__(self,
                  api_key: str,
                  api_secret: str,
                  endpoint_version: str = '',
                  request_params: dict = None,
-                 tld: str = 'com'):
+                 tld: str = 'com',
+                 rate_limiter: RateLimiter = None,
+                 exchange_info_ttl: float = None,
+                 retry_policy: RetryPolicy = None,
+                 pool_maxsize: int = 10,
+                 json_decoder: str = None,
+                 coalesce_ttl: float = None):
 
         self.API_URL = ApiUrl(endpoint_version, tld)
         self._api_version = ApiVersion
         self._deposit_history_status = DepositHistoryStatus
+        self._futures_transfer_type = FuturesTransferType
         self._kline_interval = KlineInterval
-        self._request_handler = RequestHandler(api_key=api_key,
-                                               api_secret=api_secret,
-                                               request_params=request_params)
+        self._request_handler = self._request_handler_class(
+            api_key=api_key,
+            api_secret=api_secret,
+            request_params=request_params,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            pool_maxsize=pool_maxsize,
+            json_decoder=json_decoder,
+            coalesce_ttl=coalesce_ttl)
+        self._request_handler.mount_pools(*self._pool_prefixes())
+        self._exchange_info_cache = self._create_exchange_info_cache(
+            exchange_info_ttl)
         self._order_response_type = OrderResponseType
         self._order_side = OrderSide
         self._order_status = OrderStatus
@@ -96,10 +151,23 @@ class AuthenticatedClient(MarketDataEndpoints,
     def request_handler(self):
         return self._request_handler
 
+    @property
+    def exchange_info_cache(self):
+        return self._exchange_info_cache
+
+    def _create_exchange_info_cache(self, ttl: float = None):
+        if ttl is None:
+            return None
+        return self._exchange_info_cache_class(self._get_exchange_info, ttl)
+
     @property
     def DEPOSIT_HISTORY_STATUS(self):
         return self._deposit_history_status
 
+    @property
+    def FUTURES_TRANSFER_TYPE(self):
+        return self._futures_transfer_type
+
     @property
     def WALLET_TYPE(self):
         return self._wallet_type
@@ -111,11 +179,15 @@ class AuthenticatedClient(MarketDataEndpoints,
     def _create_api_uri(self, path: str, version=ApiVersion.PUBLIC) -> str:
         return self.API_URL.DEFAULT + '/' + version + '/' + path
 
+    def _pool_prefixes(self) -> list:
+        return [self.API_URL.DEFAULT + '/', self.API_URL.MARGIN + '/',
+                self.API_URL.WITHDRAW + '/']
+
     def _create_margin_api_uri(self, path: str):
         return self.API_URL.MARGIN + '/' + self.API_VERSION.MARGIN + '/' + path
 
     def _create_futures_api_uri(self, path: str):
-        return self.API_URL.FUTURES + '/' + self.FUTURES_API_VERSION + '/' + path
+        return self.API_URL.FUTURES + '/' + self.API_VERSION.FUTURES + '/' + path
 
     def _create_wallet_v3_api_uri(self, path: str):
         return self.API_URL.WALLET2 + '/' + self.API_VERSION.WALLET2 + '/' + path
@@ -0,0 +1,127 @@
+from typing import Callable
+import asyncio
+import threading
+import time
+
+
+class ClockSample(object):
+    def __init__(self, send_time: float, receive_time: float, server_time: int):
+        self.rtt = receive_time - send_time
+        # the server stamped its time roughly halfway through the round trip
+        self.midpoint = send_time + self.rtt / 2
+        self.server_time = server_time
+        self.local_time = time.time() * 1000 - (time.monotonic() - self.midpoint) * 1000
+
+    @property
+    def offset_ms(self) -> float:
+        return self.server_time - self.local_time
+
+
+class ServerClock(object):
+    # server time is extrapolated from the best recent sample with the
+    # monotonic clock, so wall clock jumps never affect request timestamps
+
+    def __init__(self,
+                 fetch_server_time: Callable,
+                 interval: float = 60.0,
+                 samples: int = 3):
+        self.fetch_server_time = fetch_server_time
+        self.interval = interval
+        self.samples = samples
+        self._sample = None
+        self._offset_history = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _take_sample(self, send_time: float, response: dict) -> ClockSample:
+        return ClockSample(send_time, time.monotonic(), response['serverTime'])
+
+    def _update(self, samples: list) -> None:
+        sample = min(samples, key=lambda s: s.rtt)
+        self._sample = sample
+        self._offset_history.append((sample.local_time, sample.offset_ms))
+        del self._offset_history[:-10]
+
+    def sync(self) -> None:
+        samples = []
+        for _ in range(self.samples):
+            send_time = time.monotonic()
+            samples.append(self._take_sample(send_time, self.fetch_server_time()))
+        self._update(samples)
+
+    @property
+    def synced(self) -> bool:
+        return self._sample is not None
+
+    def now_ms(self) -> int:
+        if self._sample is None:
+            return int(time.time() * 1000)
+        elapsed = time.monotonic() - self._sample.midpoint
+        return int(self._sample.server_time + elapsed * 1000)
+
+    @property
+    def metrics(self) -> dict:
+        if self._sample is None:
+            return {}
+        drift = None
+        if len(self._offset_history) > 1:
+            (first_time, first_offset) = self._offset_history[0]
+            (last_time, last_offset) = self._offset_history[-1]
+            if last_time > first_time:
+                drift = (last_offset - first_offset) / (last_time - first_time) * 3600 * 1000
+        return {'offset_ms': self._sample.offset_ms,
+                'rtt_ms': self._sample.rtt * 1000,
+                'latency_ms': self._sample.rtt * 1000 / 2,
+                'drift_ms_per_hour': drift,
+                'last_sync_age_s': time.monotonic() - self._sample.midpoint}
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sync()
+            except Exception:
+                # keep the previous estimate until the next successful sync
+                pass
+
+    def start(self) -> None:
+        if (self._thread is not None) and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class AsyncServerClock(ServerClock):
+    def __init__(self,
+                 fetch_server_time: Callable,
+                 interval: float = 60.0,
+                 samples: int = 3):
+        super().__init__(fetch_server_time, interval, samples)
+        self._task = None
+
+    async def sync(self) -> None:
+        samples = []
+        for _ in range(self.samples):
+            send_time = time.monotonic()
+            samples.append(self._take_sample(send_time, await self.fetch_server_time()))
+        self._update(samples)
+
+    async def _run(self) -> None:
+        while(True):
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync()
+            except Exception:
+                pass
+
+    def start(self) -> None:
+        if (self._task is not None) and not self._task.done():
+            return
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
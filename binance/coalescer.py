@@ -0,0 +1,101 @@
+from typing import Callable, Hashable
+import asyncio
+import threading
+import time
+
+
+class _Flight(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer(object):
+    # identical requests issued while one is in flight wait for its result
+    # instead of sending their own. With a ttl the result is also reused for
+    # ttl seconds afterwards. Callers share the returned object, so it must
+    # not be modified in place
+
+    def __init__(self, ttl: float = 0.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._results = {}
+
+    @staticmethod
+    def make_key(uri: str, params: dict) -> Hashable:
+        return (uri, tuple(sorted((key, str(value)) for key, value in params.items())))
+
+    def _get_cached(self, key: Hashable, now: float):
+        cached = self._results.get(key)
+        if (cached is not None) and (cached[0] > now):
+            return cached
+        return None
+
+    def _store(self, key: Hashable, result) -> None:
+        now = time.monotonic()
+        self._results = {k: v for k, v in self._results.items() if v[0] > now}
+        self._results[key] = (now + self.ttl, result)
+
+    def call(self, key: Hashable, func: Callable):
+        with self._lock:
+            cached = self._get_cached(key, time.monotonic())
+            if cached is not None:
+                return cached[1]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = func()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if self.ttl and (flight.error is None):
+                    self._store(key, flight.result)
+            flight.event.set()
+
+
+class AsyncRequestCoalescer(RequestCoalescer):
+    # the event loop runs one coroutine at a time, no lock is needed. The
+    # request runs in its own task which every caller awaits shielded, so a
+    # cancelled caller, the first one included, never cancels the others
+
+    async def _run(self, key: Hashable, func: Callable):
+        try:
+            result = await func()
+        finally:
+            del self._in_flight[key]
+        if self.ttl:
+            self._store(key, result)
+        return result
+
+    @staticmethod
+    def _consume_error(task: asyncio.Task) -> None:
+        # the callers raise the error themselves, there may be none left
+        if not task.cancelled():
+            task.exception()
+
+    async def call(self, key: Hashable, func: Callable):
+        cached = self._get_cached(key, time.monotonic())
+        if cached is not None:
+            return cached[1]
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._run(key, func))
+            task.add_done_callback(self._consume_error)
+        return await asyncio.shield(task)
+
+
+if __name__ == '__main__':
+    pass
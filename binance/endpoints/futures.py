@@ -2,6 +2,7 @@ from abc import ABCMeta, abstractmethod
 from typing import Union
 from binance.utils import format_time
 from binance.exceptions import FuturesTradingError
+from binance.retry import RetryPolicy
 
 class FuturesEndpoints(metaclass = ABCMeta):
 
@@ -21,9 +22,13 @@ class FuturesEndpoints(metaclass = ABCMeta):
         pass
     
     @abstractmethod
-    def _create_futures_api_uri(self, path: str, version:str) -> str:
+    def _create_futures_api_uri(self, path: str) -> str:
         pass
 
+    def set_futures_retry_policy(self, retry_policy: RetryPolicy) -> None:
+        self.request_handler.set_retry_policy(
+            retry_policy, self._create_futures_api_uri('futures/'))
+
     def future_account_transfer(self,
                                 asset: str,
                                 amount: float,
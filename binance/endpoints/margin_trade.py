@@ -1,7 +1,20 @@
 from abc import ABCMeta, abstractmethod
-from typing import Union
+from typing import Iterator, Union
 from binance.exceptions import MarginTradingError
-from binance.utils import format_time, interval_to_ms
+from binance.retry import RetryPolicy
+from binance.utils import format_time, interval_to_ms, rename_deprecated_param
+from binance.utils import iter_concurrently, run_concurrently
+
+
+# record endpoints paged with current/size which return rows and a total
+MARGIN_RECORD_METHODS = ('get_cross_margin_transfer_history',
+                         'query_margin_loan_record',
+                         'query_margin_repay_record',
+                         'get_margin_interest_history',
+                         'get_margin_force_liquidation_record',
+                         'get_isolated_margin_transfer_history')
+MARGIN_RECORD_PAGE_SIZE = 100
+
 
 class MarginAccountEndpoints(metaclass = ABCMeta):
     @property
@@ -33,6 +46,62 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
     def _create_margin_api_uri(self, path: str) -> str:
         pass
 
+    def set_margin_retry_policy(self, retry_policy: RetryPolicy) -> None:
+        self.request_handler.set_retry_policy(
+            retry_policy,
+            self._create_margin_api_uri('margin/'),
+            self._create_margin_api_uri('userDataStream'))
+
+    def _margin_record_calls(self, method: str, queries: list, kwargs: dict) -> list:
+        if method not in MARGIN_RECORD_METHODS:
+            raise ValueError('{} is not a paged margin record method'.format(method))
+        # the pages are chosen here, a current or size of the caller is replaced
+        calls = []
+        for query in (queries or [{}]):
+            call = dict(kwargs)
+            call.update(query)
+            call.update(current=1, size=MARGIN_RECORD_PAGE_SIZE)
+            calls.append(call)
+        return calls
+
+    @staticmethod
+    def _remaining_page_calls(first_calls: list, first_pages: list) -> list:
+        # (query index, kwargs) of every page after the first of each query
+        calls = []
+        for index, (call, page) in enumerate(zip(first_calls, first_pages)):
+            pages = -(-page['total'] // MARGIN_RECORD_PAGE_SIZE)
+            calls += [(index, dict(call, current=current)) for current in range(2, pages + 1)]
+        return calls
+
+    def iter_margin_records(self,
+                            method: str,
+                            queries: list = None,
+                            max_workers: int = None,
+                            **kwargs) -> Iterator:
+        # e.g. iter_margin_records('get_margin_interest_history',
+        # [{'asset': asset} for asset in assets], startTime=start). The first
+        # page of every query gives its total, all remaining pages are then
+        # requested concurrently. Rows are yielded query by query, page by page
+        func = getattr(self, method)
+        max_workers = max_workers or self.request_handler.pool_maxsize
+        first_calls = self._margin_record_calls(method, queries, kwargs)
+        first_pages = run_concurrently(func, first_calls, max_workers)
+        remaining = self._remaining_page_calls(first_calls, first_pages)
+        pages = iter_concurrently(func, [call for _, call in remaining], max_workers)
+        position = 0
+        for index, first_page in enumerate(first_pages):
+            yield from first_page.get('rows', [])
+            while (position < len(remaining)) and (remaining[position][0] == index):
+                yield from next(pages).get('rows', [])
+                position += 1
+
+    def get_margin_records(self,
+                           method: str,
+                           queries: list = None,
+                           max_workers: int = None,
+                           **kwargs) -> list:
+        return list(self.iter_margin_records(method, queries, max_workers, **kwargs))
+
     def cross_margin_transfer(self,
                               asset: str,
                               amount: float,
@@ -416,7 +485,7 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/transfer')
         return self.request_handler.get(uri, signed=True, **params)
@@ -436,7 +505,7 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/loan')
         return self.request_handler.get(uri, signed=True, **params)
@@ -456,7 +525,7 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/repay')
         return self.request_handler.get(uri, signed=True, **params)
@@ -476,7 +545,7 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/interestHistory')
         return self.request_handler.get(uri, signed=True, **params)
@@ -494,7 +563,7 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/forceLiquidationRec')
         return self.request_handler.get(uri, signed=True, **params)
@@ -545,7 +614,7 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/allOrders')
         return self.request_handler.get(uri, signed=True, **params)
@@ -555,16 +624,18 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
                                         isIsolated: bool = False,
                                         startTime: int = None,
                                         endTime: int = None,
-                                        formId: int = None,
+                                        fromId: int = None,
                                         limit: int = 500,
-                                        recvWindow: int = None):
+                                        recvWindow: int = None,
+                                        formId: int = None):
         params = locals()
         del params['self']
+        rename_deprecated_param(params, 'formId', 'fromId')
         params['isIsolated'] = 'TRUE' if (params['isIsolated'] == True) else 'FALSE'
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/myTrades')
         return self.request_handler.get(uri, signed=True, **params)
@@ -617,16 +688,19 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
-            params['endtTime'] = format_time(params['endTime'])
+            params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/isolated/transfer')
         return self.request_handler.get(uri, signed=True, **params)
 
     def query_isolated_margin_account_info(self,
-                                           symbol: str,
+                                           symbol: str = None,
                                            recvWindow: int = None):
+        # without a symbol all isolated margin accounts are returned. The
+        # endpoint takes the symbol as symbols, a comma separated list
         params = locals()
         del params['self']
+        params['symbols'] = params.pop('symbol')
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_margin_api_uri('margin/isolated/account')
         return self.request_handler.get(uri, signed=True, **params)
@@ -656,6 +730,30 @@ class MarginAccountEndpoints(metaclass = ABCMeta):
         uri = self._create_margin_api_uri('margin/isolated/allpairs')
         return self.request_handler.get(uri, signed=True, **params)
  
+    def create_margin_listen_key(self) -> dict:
+        uri = self._create_margin_api_uri('userDataStream')
+        return self.request_handler.post(uri)
+
+    def keepalive_margin_listen_key(self, listenKey: str) -> dict:
+        uri = self._create_margin_api_uri('userDataStream')
+        return self.request_handler.put(uri, listenKey=listenKey)
+
+    def close_margin_listen_key(self, listenKey: str) -> dict:
+        uri = self._create_margin_api_uri('userDataStream')
+        return self.request_handler.delete(uri, listenKey=listenKey)
+
+    def create_isolated_margin_listen_key(self, symbol: str) -> dict:
+        uri = self._create_margin_api_uri('userDataStream/isolated')
+        return self.request_handler.post(uri, symbol=symbol)
+
+    def keepalive_isolated_margin_listen_key(self, symbol: str, listenKey: str) -> dict:
+        uri = self._create_margin_api_uri('userDataStream/isolated')
+        return self.request_handler.put(uri, symbol=symbol, listenKey=listenKey)
+
+    def close_isolated_margin_listen_key(self, symbol: str, listenKey: str) -> dict:
+        uri = self._create_margin_api_uri('userDataStream/isolated')
+        return self.request_handler.delete(uri, symbol=symbol, listenKey=listenKey)
+
     def toggle_bnb_burn(self,
                         spotBNBBurn: bool = None,
                         interestBNBBurn: bool = None,
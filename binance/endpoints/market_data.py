@@ -1,6 +1,12 @@
 from abc import ABCMeta, abstractmethod
-from typing import Union
-from binance.utils import format_time, interval_to_ms
+from typing import Iterator, Union
+from binance.clock import ServerClock
+from binance.klines import concatenate_kline_arrays, format_klines
+from binance.klines import klines_to_array
+from binance.order_filters import SymbolFilters
+from binance.retry import RetryPolicy
+from binance.utils import format_time, interval_to_ms, rename_deprecated_param, run_concurrently
+from binance.utils import BatchResult, run_batch_concurrently
 import time
 
 
@@ -16,29 +22,100 @@ class MarketDataEndpoints(metaclass = ABCMeta):
     def KLINE_INTERVAL(self):
         pass
     
+    @property
+    @abstractmethod
+    def exchange_info_cache(self):
+        pass
+
     @abstractmethod
     def _create_api_uri(self, path: str, version: str) -> str:
         pass
         
+    def set_market_data_retry_policy(self, retry_policy: RetryPolicy) -> None:
+        self.request_handler.set_retry_policy(
+            retry_policy,
+            self._create_api_uri(''),
+            self._create_api_uri('avgPrice', version='v3'))
+
     def ping(self) -> dict:
         uri = self._create_api_uri('ping')
-        return self.request_handler.get(uri)
+        return self.request_handler.get(uri, coalesce=False)
+
+    def warm_up(self, connections: int = None) -> dict:
+        # opens pooled connections ahead of time so that the first real
+        # request does not pay for dns, tcp and tls setup
+        return self.request_handler.warm_up(self._create_api_uri('ping'),
+                                            connections)
 
     def get_server_time(self) -> dict:
         uri = self._create_api_uri('time')
-        return self.request_handler.get(uri)
+        return self.request_handler.get(uri, coalesce=False)
+
+    def start_clock_sync(self, interval: float = 60.0, samples: int = 3) -> ServerClock:
+        clock = ServerClock(self.get_server_time, interval, samples)
+        clock.sync()
+        clock.start()
+        self.request_handler.clock = clock
+        return clock
 
     def get_exchange_info(self) -> dict:
+        if self.exchange_info_cache is not None:
+            return self.exchange_info_cache.get()
+        return self._get_exchange_info()
+
+    def _get_exchange_info(self) -> dict:
         uri = self._create_api_uri('exchangeInfo')
-        return self.request_handler.get(uri)
+        exchange_info = self.request_handler.get(uri)
+        if self.request_handler.rate_limiter is not None:
+            self.request_handler.rate_limiter.update_limits(
+                exchange_info['rateLimits'])
+        return exchange_info
 
     def get_symbol_info(self, symbol: str) -> dict:
+        if self.exchange_info_cache is not None:
+            return self.exchange_info_cache.get_symbol(symbol)
         resp_data = self.get_exchange_info()
         for sym_data in resp_data['symbols']:
             if(sym_data['symbol'] == symbol.upper()):
                 return sym_data
         return None
 
+    def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        if self.exchange_info_cache is not None:
+            return self.exchange_info_cache.get_symbol_filters(symbol)
+        symbol_info = self.get_symbol_info(symbol)
+        if symbol_info is None:
+            return None
+        return SymbolFilters.from_symbol_info(symbol_info)
+
+    def _get_batch_calls(self, calls: list) -> list:
+        batch_calls = []
+        for method, kwargs in calls:
+            if method.startswith('_') or not callable(getattr(self, method, None)):
+                raise ValueError('{} is not an endpoint method'.format(method))
+            batch_calls.append((getattr(self, method), kwargs))
+        return batch_calls
+
+    def run_batch(self, calls: list, max_workers: int = None) -> BatchResult:
+        # calls are (method name, kwargs) pairs, results and errors are keyed
+        # by the position of the call. Every request still passes the rate
+        # limiter, the pool size bounds the number of calls in flight
+        outcomes = run_batch_concurrently(self._get_batch_calls(calls),
+                                          max_workers or self.request_handler.pool_maxsize)
+        return BatchResult(range(len(calls)), outcomes)
+
+    def map_symbols(self,
+                    method: str,
+                    symbols: list,
+                    max_workers: int = None,
+                    **kwargs) -> BatchResult:
+        # e.g. map_symbols('get_klines', symbols, interval='1h', limit=24),
+        # results and errors are keyed by symbol
+        calls = [(method, dict(kwargs, symbol=symbol)) for symbol in symbols]
+        outcomes = run_batch_concurrently(self._get_batch_calls(calls),
+                                          max_workers or self.request_handler.pool_maxsize)
+        return BatchResult(symbols, outcomes)
+
     def get_order_book(self, symbol: str, limit: int = 100):
         uri = self._create_api_uri('depth')
         return self.request_handler.get(uri, symbol=symbol, limit=limit)
@@ -71,12 +148,14 @@ class MarketDataEndpoints(metaclass = ABCMeta):
         return self.request_handler.get(uri, symbol=symbol, limit=limit)
 
     def get_agg_trades(self, symbol: str,
-                       formId: int = None,
+                       fromId: int = None,
                        startTime: int = None,
                        endTime: int = None,
-                       limit: int = 500):
+                       limit: int = 500,
+                       formId: int = None):
         params = locals()
         del params['self']
+        rename_deprecated_param(params, 'formId', 'fromId')
         if(params['startTime'] is not None):
             params['startTime'] = format_time(params['startTime'])
         if(params['endTime'] is not None):
@@ -90,17 +169,20 @@ class MarketDataEndpoints(metaclass = ABCMeta):
                    interval: str,
                    startTime: Union[int, str] = None,
                    endTime: Union[int, str] = None,
-                   limit: int = None) -> dict:
+                   limit: int = None,
+                   output_format: str = None) -> dict:
         
         params = locals()
         del params['self']
+        del params['output_format']
         if(params['startTime'] is not None):
             params['startTime'] = format_time(params['startTime'])
         if(params['endTime'] is not None):
             params['endTime'] = format_time(params['endTime'])
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_api_uri('klines')
-        return self.request_handler.get(uri, **params)
+        klines = self.request_handler.get(uri, **params)
+        return format_klines(klines, output_format)
 
     def _get_earliest_valid_timestamp(self, symbol: str, interval: str):
                 
@@ -112,16 +194,19 @@ class MarketDataEndpoints(metaclass = ABCMeta):
             endTime=None)
         return kline[0][0]
 
-    def get_historical_klines(self,
-                              symbol: str,
-                              interval: str,
-                              startTime: Union[int, str],
-                              endTime: Union[int, str] = None) -> dict:
+    def _get_historical_kline_params(self,
+                                     symbol: str,
+                                     interval: str,
+                                     startTime: Union[int, str],
+                                     endTime: Union[int, str] = None) -> dict:
         params = locals()
         del params['self']
         earliest_timestamp = self._get_earliest_valid_timestamp(symbol,
                                                                 interval)
-        
+        return self._check_historical_kline_params(earliest_timestamp, **params)
+
+    @staticmethod
+    def _check_historical_kline_params(earliest_timestamp: int, **params) -> dict:
         params['startTime'] = format_time(params['startTime'])
         params['startTime'] = max(earliest_timestamp, params[
             'startTime'])
@@ -129,18 +214,94 @@ class MarketDataEndpoints(metaclass = ABCMeta):
             params['endTime'] = format_time(params['endTime'])
         if(params['endTime'] is not None) and (params['startTime'] > params['endTime']):
             raise ValueError('startTime entered is greater than endTime')
-        params = {k: v for k, v in params.items() if v is not None}
-        params['limit'] = 500
-        data = []
+        return {k: v for k, v in params.items() if v is not None}
+
+    def get_historical_klines(self,
+                              symbol: str,
+                              interval: str,
+                              startTime: Union[int, str],
+                              endTime: Union[int, str] = None,
+                              max_workers: int = None,
+                              output_format: str = None) -> dict:
+        params = self._get_historical_kline_params(symbol, interval,
+                                                   startTime, endTime)
+        if(max_workers is not None) and (interval != self.KLINE_INTERVAL.ONEMONTH):
+            windows = self._get_kline_windows(**params)
+            pages = run_concurrently(self._get_kline_page,
+                                     [dict(window, output_format=output_format)
+                                      for window in windows],
+                                     max_workers)
+        else:
+            pages = list(self._iter_kline_pages(params, output_format))
+        return self._merge_kline_pages(pages, output_format)
+
+    def iter_historical_klines(self,
+                               symbol: str,
+                               interval: str,
+                               startTime: Union[int, str],
+                               endTime: Union[int, str] = None,
+                               output_format: str = None) -> Iterator:
+        # yields one page at a time, to resume an interrupted iteration
+        # pass the last yielded open time + 1 as startTime
+        params = self._get_historical_kline_params(symbol, interval,
+                                                   startTime, endTime)
+        yield from self._iter_kline_pages(params, output_format)
+
+    def _iter_kline_pages(self, params: dict, output_format: str = None) -> Iterator:
+        params = dict(params, limit=500)
         api_call_count = 0
         while(True):
             fetched_data = self.get_klines(**params)
             api_call_count+=1
-            data.extend(fetched_data)
+            if fetched_data:
+                yield self._decode_kline_page(fetched_data, output_format)
             if(len(fetched_data) < params['limit']):
                 break
-            params['startTime'] = fetched_data[-1][0] + interval_to_ms(interval)
+            params['startTime'] = fetched_data[-1][0] + interval_to_ms(params['interval'])
             if (api_call_count) == 3:
-                time.sleep(0.5)
+                if self.request_handler.rate_limiter is None:
+                    time.sleep(0.5)
                 api_call_count = 0
+
+    def _get_kline_page(self, output_format: str = None, **params):
+        return self._decode_kline_page(self.get_klines(**params), output_format)
+
+    @staticmethod
+    def _decode_kline_page(klines: list, output_format: str = None):
+        # pages are decoded as they arrive so raw rows never pile up
+        if output_format is None:
+            return klines
+        return klines_to_array(klines)
+
+    @staticmethod
+    def _get_kline_windows(symbol: str,
+                           interval: str,
+                           startTime: int,
+                           endTime: int = None,
+                           limit: int = 1000) -> list:
+        # every window holds exactly limit klines, so all windows are known
+        # upfront and can be fetched independently of each other
+        if endTime is None:
+            endTime = int(time.time() * 1000)
+        window_ms = interval_to_ms(interval) * limit
+        windows = []
+        for window_start in range(int(startTime), int(endTime) + 1, window_ms):
+            windows.append({'symbol': symbol,
+                            'interval': interval,
+                            'startTime': window_start,
+                            'endTime': min(window_start + window_ms - 1, endTime),
+                            'limit': limit})
+        return windows
+
+    @staticmethod
+    def _merge_kline_pages(pages: list, output_format: str = None):
+        if output_format is not None:
+            return format_klines(concatenate_kline_arrays(pages), output_format)
+        data = []
+        last_open_time = None
+        for page in pages:
+            for kline in page:
+                if (last_open_time is None) or (kline[0] > last_open_time):
+                    data.append(kline)
+                    last_open_time = kline[0]
         return data
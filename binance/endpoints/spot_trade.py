@@ -1,7 +1,8 @@
 from abc import ABCMeta, abstractmethod
-from typing import Union, Callable
-from binance.utils import format_time
+from typing import Union, Callable, Iterator
+from binance.utils import BatchResult, format_time, rename_deprecated_param
 from binance.exceptions import SpotTradingError
+from binance.retry import RetryPolicy
 import time
 
 
@@ -46,6 +47,32 @@ class SpotAccountTradeEndpoints(metaclass=ABCMeta):
     def _create_api_uri(self, path: str, version: str) -> str:
         pass
 
+    def set_spot_retry_policy(self, retry_policy: RetryPolicy) -> None:
+        # order POSTs are only retried when they carry a newClientOrderId
+        self.request_handler.set_retry_policy(
+            retry_policy,
+            self._create_api_uri('', version=self.API_VERSION.PRIVATE))
+
+    def _order_params(self,
+                      symbol: str,
+                      side: str,
+                      type: str,
+                      timeInForce: str = None,
+                      quantity: float = None,
+                      quoteOrderQty: float = None,
+                      price: float = None,
+                      newClientOrderId: str = None,
+                      stopPrice: float = None,
+                      icebergQty: float = None,
+                      newOrderRespType: str = None,
+                      recvWindow: int = None) -> dict:
+
+        params = locals()
+        del params['self']
+        if(params['icebergQty'] is not None):
+            params['timeInForce'] = self.TIME_IN_FORCE.GTC
+        return {k: v for k, v in params.items() if v is not None}
+
     def create_order(self,
                      symbol: str,
                      side: str,
@@ -62,12 +89,22 @@ class SpotAccountTradeEndpoints(metaclass=ABCMeta):
 
         params = locals()
         del params['self']
-        if(params['icebergQty'] is not None):
-            params['timeInForce'] = self.TIME_IN_FORCE.GTC
-        params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_api_uri('order',
                                    version=self.API_VERSION.PRIVATE)
-        return self.request_handler.post(uri, signed=True, **params)
+        return self.request_handler.post(uri, signed=True, **self._order_params(**params))
+
+    def _create_orders(self, orders: list, max_workers: int = None):
+        uri = self._create_api_uri('order',
+                                   version=self.API_VERSION.PRIVATE)
+        return self.request_handler.post_batch(
+            uri, [self._order_params(**order) for order in orders], max_workers)
+
+    def create_orders(self, orders: list, max_workers: int = None) -> BatchResult:
+        # orders are create_order kwargs, e.g. the levels of a grid. All
+        # orders are signed up front and sent concurrently within the ORDERS
+        # rate limits, results and errors are keyed by the order position
+        outcomes = self._create_orders(orders, max_workers)
+        return BatchResult(range(len(orders)), outcomes)
 
     def create_test_order(self,
                           symbol: str,
@@ -475,6 +512,16 @@ class SpotAccountTradeEndpoints(metaclass=ABCMeta):
         params = {k: v for k, v in params.items() if v is not None}
         return self._get_historical_data(self._get_all_orders, **params)
 
+    def iter_all_orders(self,
+                        symbol: str,
+                        orderId: int = None,
+                        startTime: Union[int, str] = 0,
+                        endTime: Union[int, str] = None) -> Iterator:
+
+        params = locals()
+        del params['self']
+        params = {k: v for k, v in params.items() if v is not None}
+        return self._iter_historical_data(self._get_all_orders, **params)
     
     def get_oco_order(self,
                       symbol: str,
@@ -503,17 +550,19 @@ class SpotAccountTradeEndpoints(metaclass=ABCMeta):
         return self.request_handler.get(uri, signed=True, **params)
     
     def get_all_oco_orders(self,
-                           formId: int = None,
+                           fromId: int = None,
                            startTime: Union[int, str] = None,
                            endTime: Union[int, str] = None,
                            limit: int = None,
-                           recvWindow: int = None) -> dict:
+                           recvWindow: int = None,
+                           formId: int = None) -> dict:
 
         params = locals()
         del params['self']
-        if(params['formId'] is not None) and (
+        rename_deprecated_param(params, 'formId', 'fromId')
+        if(params['fromId'] is not None) and (
                 (params['startTime'] is not None) or (params['endTime'] is not None)):
-            raise SpotTradingError("All OCO orders called with both formId and startTime/endTime ")
+            raise SpotTradingError("All OCO orders called with both fromId and startTime/endTime ")
         if params['startTime'] is not None:
             params['startTime'] = format_time(params['startTime'])
         if params['endTime'] is not None:
@@ -533,31 +582,61 @@ class SpotAccountTradeEndpoints(metaclass=ABCMeta):
                                    version=self.API_VERSION.PRIVATE)
         return self.request_handler.get(uri, signed=True, **params)
 
+    def create_listen_key(self) -> dict:
+        uri = self._create_api_uri('userDataStream',
+                                   version=self.API_VERSION.PRIVATE)
+        return self.request_handler.post(uri)
+
+    def keepalive_listen_key(self, listenKey: str) -> dict:
+        uri = self._create_api_uri('userDataStream',
+                                   version=self.API_VERSION.PRIVATE)
+        return self.request_handler.put(uri, listenKey=listenKey)
+
+    def close_listen_key(self, listenKey: str) -> dict:
+        uri = self._create_api_uri('userDataStream',
+                                   version=self.API_VERSION.PRIVATE)
+        return self.request_handler.delete(uri, listenKey=listenKey)
+
     def get_trade_list(self,
                        symbol: str,
-                       formId: int = None,
+                       fromId: int = None,
                        startTime: Union[int, str] = 0,
-                       endTime: Union[int, str] = None) -> dict:
+                       endTime: Union[int, str] = None,
+                       formId: int = None) -> dict:
         
         params = locals()
         del params['self']
+        rename_deprecated_param(params, 'formId', 'fromId')
         params = {k: v for k, v in params.items() if v is not None}
-        return self._get_historical_data(self._get_trade_list, **params)
-        
-    def _get_trade_list(self,
+        return self._get_historical_data(self.get_trade_page, **params)
+
+    def iter_trade_list(self,
                         symbol: str,
-                        startTime: int = None,
-                        endTime: int = None,
-                        formId: int = None,
-                        limit: int = None,
-                        recvWindow: int = None) -> dict:
+                        fromId: int = None,
+                        startTime: Union[int, str] = 0,
+                        endTime: Union[int, str] = None,
+                        formId: int = None) -> Iterator:
+
+        params = locals()
+        del params['self']
+        rename_deprecated_param(params, 'formId', 'fromId')
+        params = {k: v for k, v in params.items() if v is not None}
+        return self._iter_historical_data(self.get_trade_page, **params)
+
+    def get_trade_page(self,
+                       symbol: str,
+                       startTime: int = None,
+                       endTime: int = None,
+                       fromId: int = None,
+                       limit: int = None,
+                       recvWindow: int = None) -> dict:
+        # one request to myTrades, get_trade_list and iter_trade_list page with it
 
         params = locals()
         del params['self']
         params = {k: v for k, v in params.items() if v is not None}
         uri = self._create_api_uri('myTrades',
                                    version=self.API_VERSION.PRIVATE)
-        print(params)
         return self.request_handler.get(uri, signed=True, **params)
 
     def _get_historical_data(self,
@@ -567,16 +646,29 @@ class SpotAccountTradeEndpoints(metaclass=ABCMeta):
                              endTime: Union[int, str] = None,
                              **kwargs) -> dict:
 
-        earliest_timestamp = func(symbol,
-                                  startTime=0,
-                                  limit=1)[0]['time']
+        data = []
+        for page in self._iter_historical_data(func, symbol, startTime,
+                                               endTime, **kwargs):
+            data.extend(page)
+        return data
+
+    def _iter_historical_data(self,
+                              func: Callable,
+                              symbol,
+                              startTime: Union[int, str] = 0,
+                              endTime: Union[int, str] = None,
+                              **kwargs) -> Iterator:
+        # yields one page at a time, to resume an interrupted iteration
+        # pass the last yielded time + 1 as startTime
+        earliest_data = func(symbol, startTime=0, limit=1)
+        if not earliest_data:
+            return
         startTime = format_time(startTime)
-        startTime = max(earliest_timestamp, startTime)
+        startTime = max(earliest_data[0]['time'], startTime)
         if(endTime is not None):
             endTime = format_time(endTime)
             if(startTime > endTime):
                 raise ValueError('startTime entered is greater than endTime')
-        data = []
         limit = 500
         api_call_count = 0
         while(True):
@@ -586,14 +678,15 @@ class SpotAccountTradeEndpoints(metaclass=ABCMeta):
                                 limit=limit,
                                 **kwargs)
             api_call_count += 1
-            data.extend(fetched_data)
+            if fetched_data:
+                yield fetched_data
             if(len(fetched_data) < limit):
                 break
             startTime = fetched_data[-1]['time'] + 1
             if (api_call_count) == 3:
-                time.sleep(0.5)  # sleep to prevent overload of api calls
+                if self.request_handler.rate_limiter is None:
+                    time.sleep(0.5)  # sleep to prevent overload of api calls
                 api_call_count = 0
-        return data
 
 if __name__ == '__main__':
     pass
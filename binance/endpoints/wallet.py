@@ -1,10 +1,17 @@
 from abc import ABCMeta, abstractmethod
-from typing import Union
+from typing import Callable, Iterator, Union
 from binance.utils import format_time, interval_to_ms
+from binance.utils import iter_concurrently, run_concurrently
 from binance.exceptions import WalletError
+from binance.retry import RetryPolicy
 import time
 
 
+# longest range a single deposit or withdraw history request may span
+HISTORY_WINDOW_MS = 90 * 24 * 3600 * 1000
+HISTORY_PAGE_LIMIT = 1000
+
+
 class WalletEndpoints(metaclass = ABCMeta):
 
     @property
@@ -40,6 +47,15 @@ class WalletEndpoints(metaclass = ABCMeta):
     def _create_wallet_v3_api_uri(self, path: str):
         pass
 
+    def set_wallet_retry_policy(self, retry_policy: RetryPolicy) -> None:
+        self.request_handler.set_retry_policy(
+            retry_policy,
+            self._create_wallet_v1_api_uri('capital/'),
+            self._create_wallet_v1_api_uri('asset/'),
+            self._create_wallet_v1_api_uri('account/'),
+            self._create_wallet_v1_api_uri('accountSnapshot'),
+            self._create_wallet_v3_api_uri(''))
+
     def get_system_status(self) -> dict:
         uri = self._create_wallet_v3_api_uri('systemStatus.html')
         return self.request_handler.get(uri)
@@ -147,6 +163,118 @@ class WalletEndpoints(metaclass = ABCMeta):
         uri = self._create_wallet_v1_api_uri('capital/withdraw/history')
         return self.request_handler.get(uri, signed=True, **params)
 
+    def get_deposit_history_range(self,
+                                  startTime: Union[int, str],
+                                  endTime: Union[int, str] = None,
+                                  coin: str = None,
+                                  status: int = None,
+                                  max_workers: int = None) -> list:
+        # any range is split into 90 day windows fetched concurrently, the
+        # merged deposits are deduplicated by txId and ordered by insertTime
+        return self._get_history_range(self.get_deposit_history, 'txId', 'insertTime',
+                                       startTime, endTime, max_workers,
+                                       coin=coin, status=status)
+
+    def iter_deposit_history_range(self,
+                                   startTime: Union[int, str],
+                                   endTime: Union[int, str] = None,
+                                   coin: str = None,
+                                   status: int = None,
+                                   max_workers: int = None) -> Iterator:
+        # yields deposits in time order while later windows are still fetched
+        return self._iter_history_range(self.get_deposit_history, 'txId', 'insertTime',
+                                        startTime, endTime, max_workers,
+                                        coin=coin, status=status)
+
+    def get_withdraw_history_range(self,
+                                   startTime: Union[int, str],
+                                   endTime: Union[int, str] = None,
+                                   coin: str = None,
+                                   status: int = None,
+                                   max_workers: int = None) -> list:
+        return self._get_history_range(self.get_withdraw_history, 'id', 'applyTime',
+                                       startTime, endTime, max_workers,
+                                       coin=coin, status=status)
+
+    def iter_withdraw_history_range(self,
+                                    startTime: Union[int, str],
+                                    endTime: Union[int, str] = None,
+                                    coin: str = None,
+                                    status: int = None,
+                                    max_workers: int = None) -> Iterator:
+        return self._iter_history_range(self.get_withdraw_history, 'id', 'applyTime',
+                                        startTime, endTime, max_workers,
+                                        coin=coin, status=status)
+
+    @staticmethod
+    def _history_windows(startTime: Union[int, str],
+                         endTime: Union[int, str] = None) -> list:
+        startTime = format_time(startTime)
+        endTime = int(time.time() * 1000) if endTime is None else format_time(endTime)
+        if(startTime > endTime):
+            raise ValueError('startTime entered is greater than endTime')
+        return [(start, min(start + HISTORY_WINDOW_MS - 1, endTime))
+                for start in range(startTime, endTime + 1, HISTORY_WINDOW_MS)]
+
+    def _history_calls(self,
+                       func: Callable,
+                       startTime: Union[int, str],
+                       endTime: Union[int, str],
+                       **params) -> list:
+        params = {k: v for k, v in params.items() if v is not None}
+        return [dict(params, func=func, startTime=start, endTime=end)
+                for start, end in self._history_windows(startTime, endTime)]
+
+    def _get_history_window(self, func: Callable, **params) -> list:
+        # offset paging within a single window
+        records = []
+        offset = 0
+        while(True):
+            page = func(offset=offset, limit=HISTORY_PAGE_LIMIT, **params)
+            records.extend(page)
+            if len(page) < HISTORY_PAGE_LIMIT:
+                return records
+            offset += HISTORY_PAGE_LIMIT
+
+    @staticmethod
+    def _merge_history(windows: list, key: str, time_key: str, seen: set = None) -> list:
+        # records on a window boundary may be returned by both windows
+        seen = set() if seen is None else seen
+        merged = []
+        for records in windows:
+            for record in records:
+                if record[key] not in seen:
+                    seen.add(record[key])
+                    merged.append(record)
+        return sorted(merged, key=lambda record: record[time_key])
+
+    def _get_history_range(self,
+                           func: Callable,
+                           key: str,
+                           time_key: str,
+                           startTime: Union[int, str],
+                           endTime: Union[int, str] = None,
+                           max_workers: int = None,
+                           **params) -> list:
+        windows = run_concurrently(self._get_history_window,
+                                   self._history_calls(func, startTime, endTime, **params),
+                                   max_workers or self.request_handler.pool_maxsize)
+        return self._merge_history(windows, key, time_key)
+
+    def _iter_history_range(self,
+                            func: Callable,
+                            key: str,
+                            time_key: str,
+                            startTime: Union[int, str],
+                            endTime: Union[int, str] = None,
+                            max_workers: int = None,
+                            **params) -> Iterator:
+        seen = set()
+        for records in iter_concurrently(self._get_history_window,
+                                         self._history_calls(func, startTime, endTime, **params),
+                                         max_workers or self.request_handler.pool_maxsize):
+            yield from self._merge_history([records], key, time_key, seen)
+
     @classmethod
     def _check_history_timeline(cls,
                                 startTime: int = None,
@@ -15,7 +15,7 @@ class BinanceAPIError(Exception):
         self.request = getattr(response, 'request', None)
 
     def __str__(self):
-        return 'Binance API Error(code={}): {}'.format(self.code, self.messaage)
+        return 'Binance API Error(code={}): {}'.format(self.code, self.message)
 
     
 class BinanceResponseError(Exception):
@@ -71,6 +71,28 @@ class FuturesTradingError(Exception):
         return 'FuturesTradingError, {}'.format(self.message)
 
     
+class OrderFilterError(Exception):
+
+    def __init__(self, message:str = None):
+        self.message = message
+
+    def __str__(self):
+        if self.message is None:
+            return 'OrderFilterError has been raised'
+        return 'OrderFilterError, {}'.format(self.message)
+
+    
+class OrderBookError(Exception):
+
+    def __init__(self, message:str = None):
+        self.message = message
+
+    def __str__(self):
+        if self.message is None:
+            return 'OrderBookError has been raised'
+        return 'OrderBookError, {}'.format(self.message)
+
+    
 class WalletError(Exception):
 
     def __init__(self, message:str = None):
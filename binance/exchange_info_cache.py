@@ -0,0 +1,153 @@
+from typing import Callable
+from .order_filters import SymbolFilters
+import asyncio
+import threading
+import time
+
+
+class ExchangeInfoCache(object):
+    def __init__(self,
+                 fetch: Callable,
+                 ttl: float = 300.0,
+                 background_refresh: bool = True):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.background_refresh = background_refresh
+        self._data = None
+        self._expires_at = 0.0
+        self._symbols = {}
+        self._symbols_by_base_asset = {}
+        self._symbols_by_quote_asset = {}
+        self._symbol_filters = {}
+        self._refresh_lock = threading.Lock()
+        self._background_lock = threading.Lock()
+        self._refreshing = False
+
+    def _is_fresh(self) -> bool:
+        return (self._data is not None) and (time.monotonic() < self._expires_at)
+
+    def _update(self, data: dict) -> None:
+        symbols = {}
+        by_base_asset = {}
+        by_quote_asset = {}
+        for sym_data in data['symbols']:
+            symbols[sym_data['symbol']] = sym_data
+            by_base_asset.setdefault(sym_data['baseAsset'], []).append(sym_data)
+            by_quote_asset.setdefault(sym_data['quoteAsset'], []).append(sym_data)
+        # indexes are swapped in at once so readers never see a partial index
+        self._symbols = symbols
+        self._symbols_by_base_asset = by_base_asset
+        self._symbols_by_quote_asset = by_quote_asset
+        self._symbol_filters = {}
+        self._data = data
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    def refresh(self) -> dict:
+        # concurrent callers share one request, late callers find it fresh
+        with self._refresh_lock:
+            if not self._is_fresh():
+                self._update(self.fetch())
+            return self._data
+
+    def _refresh_in_background(self) -> None:
+        def refresh():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+        with self._background_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def get(self) -> dict:
+        if self._is_fresh():
+            return self._data
+        if self.background_refresh and (self._data is not None):
+            # serve the stale copy while a single background refresh runs
+            self._refresh_in_background()
+            return self._data
+        return self.refresh()
+
+    def get_symbol(self, symbol: str) -> dict:
+        self.get()
+        return self._symbols.get(symbol.upper())
+
+    def _compile_symbol_filters(self, symbol: str) -> SymbolFilters:
+        symbol = symbol.upper()
+        if symbol not in self._symbols:
+            return None
+        if symbol not in self._symbol_filters:
+            self._symbol_filters[symbol] = SymbolFilters.from_symbol_info(
+                self._symbols[symbol])
+        return self._symbol_filters[symbol]
+
+    def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        self.get()
+        return self._compile_symbol_filters(symbol)
+
+    def get_symbols_by_base_asset(self, asset: str) -> list:
+        self.get()
+        return self._symbols_by_base_asset.get(asset.upper(), [])
+
+    def get_symbols_by_quote_asset(self, asset: str) -> list:
+        self.get()
+        return self._symbols_by_quote_asset.get(asset.upper(), [])
+
+
+class AsyncExchangeInfoCache(ExchangeInfoCache):
+    def __init__(self,
+                 fetch: Callable,
+                 ttl: float = 300.0,
+                 background_refresh: bool = True):
+        super().__init__(fetch, ttl, background_refresh)
+        self._refresh_task = None
+
+    def _start_refresh(self) -> asyncio.Future:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+            self._refresh_task.add_done_callback(self._clear_refresh_task)
+        return self._refresh_task
+
+    def _clear_refresh_task(self, task: asyncio.Future) -> None:
+        if self._refresh_task is task:
+            self._refresh_task = None
+        if not task.cancelled():
+            # a failed background refresh is retried by the next caller
+            task.exception()
+
+    async def _refresh(self) -> dict:
+        if not self._is_fresh():
+            self._update(await self.fetch())
+        return self._data
+
+    async def refresh(self) -> dict:
+        return await asyncio.shield(self._start_refresh())
+
+    async def get(self) -> dict:
+        if self._is_fresh():
+            return self._data
+        if self.background_refresh and (self._data is not None):
+            self._start_refresh()
+            return self._data
+        return await self.refresh()
+
+    async def get_symbol(self, symbol: str) -> dict:
+        await self.get()
+        return self._symbols.get(symbol.upper())
+
+    async def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        await self.get()
+        return self._compile_symbol_filters(symbol)
+
+    async def get_symbols_by_base_asset(self, asset: str) -> list:
+        await self.get()
+        return self._symbols_by_base_asset.get(asset.upper(), [])
+
+    async def get_symbols_by_quote_asset(self, asset: str) -> list:
+        await self.get()
+        return self._symbols_by_quote_asset.get(asset.upper(), [])
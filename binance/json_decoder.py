@@ -0,0 +1,35 @@
+from typing import Callable
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+# all decoders take the raw response bytes, so requests never has to guess
+# the charset of the body before decoding it
+JSON_DECODERS = {'json': json.loads}
+if orjson is not None:
+    JSON_DECODERS['orjson'] = orjson.loads
+if ujson is not None:
+    JSON_DECODERS['ujson'] = ujson.loads
+
+# order in which decoders are picked when none is requested
+DECODER_PREFERENCE = ('orjson', 'ujson', 'json')
+
+
+def get_json_decoder(name: str = None) -> Callable:
+    if name is None:
+        name = next(name for name in DECODER_PREFERENCE if name in JSON_DECODERS)
+    if name not in JSON_DECODERS:
+        raise ValueError('JSON decoder {} is not available, installed decoders: {}'.format(
+            name, ', '.join(JSON_DECODERS)))
+    return JSON_DECODERS[name]
+
+
+if __name__ == '__main__':
+    pass
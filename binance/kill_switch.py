@@ -0,0 +1,98 @@
+from .exceptions import BinanceAPIError
+from .user_data import SPOT, MARGIN, ISOLATED_MARGIN
+from .utils import BatchResult, gather_batch_concurrently, run_batch_concurrently
+import time
+
+
+# error code returned when cancelling on a symbol without open orders
+NO_OPEN_ORDERS = -2011
+
+
+class KillSwitchResult(BatchResult):
+    # results and errors are keyed by (account, symbol), a failed open
+    # orders lookup is keyed by (account, None)
+    def __init__(self, keys: list, outcomes: list, elapsed: float):
+        super().__init__(keys, outcomes)
+        self.elapsed = elapsed
+
+
+class KillSwitch(object):
+    # cancels every open order of the spot, cross margin and isolated margin
+    # accounts. The symbols with open orders are found with one request per
+    # account, all symbols are then cancelled concurrently, so the time to
+    # flat is two round trips whatever the number of symbols
+
+    def __init__(self,
+                 client,
+                 spot: bool = True,
+                 margin: bool = True,
+                 isolated_margin: bool = True,
+                 max_workers: int = None):
+        self.client = client
+        self.accounts = [account for account, enabled in ((SPOT, spot),
+                                                          (MARGIN, margin),
+                                                          (ISOLATED_MARGIN, isolated_margin))
+                         if enabled]
+        self.max_workers = max_workers or client.request_handler.pool_maxsize
+
+    def _lookup_calls(self) -> list:
+        lookups = {SPOT: (self.client.get_open_orders, {}),
+                   MARGIN: (self.client.query_margin_account_open_orders, {}),
+                   # isolated open orders can only be queried per symbol, so
+                   # the isolated symbols come from the account info instead
+                   ISOLATED_MARGIN: (self.client.query_isolated_margin_account_info, {})}
+        return [lookups[account] for account in self.accounts]
+
+    @staticmethod
+    def _symbols(account: str, lookup: dict) -> list:
+        if account == ISOLATED_MARGIN:
+            return [asset['symbol'] for asset in lookup['assets']]
+        return list(dict.fromkeys(order['symbol'] for order in lookup))
+
+    def _cancel_calls(self, lookups: list) -> tuple:
+        # keys of the failed lookups come first, then those of the calls
+        keys, outcomes, calls, call_keys = [], [], [], []
+        for account, (lookup, error) in zip(self.accounts, lookups):
+            if error is not None:
+                keys.append((account, None))
+                outcomes.append((None, error))
+                continue
+            for symbol in self._symbols(account, lookup):
+                if account == SPOT:
+                    call = (self.client.cancel_all_orders, {'symbol': symbol})
+                else:
+                    call = (self.client.cancel_all_margin_order,
+                            {'symbol': symbol, 'isIsolated': account == ISOLATED_MARGIN})
+                call_keys.append((account, symbol))
+                calls.append(call)
+        return keys + call_keys, outcomes, calls
+
+    @staticmethod
+    def _cancel_outcome(outcome: tuple) -> tuple:
+        _, error = outcome
+        if isinstance(error, BinanceAPIError) and (error.code == NO_OPEN_ORDERS):
+            return ([], None)
+        return outcome
+
+    def trigger(self) -> KillSwitchResult:
+        start = time.monotonic()
+        lookups = run_batch_concurrently(self._lookup_calls(), self.max_workers)
+        keys, outcomes, calls = self._cancel_calls(lookups)
+        cancels = run_batch_concurrently(calls, self.max_workers)
+        outcomes += [self._cancel_outcome(outcome) for outcome in cancels]
+        return KillSwitchResult(keys, outcomes, time.monotonic() - start)
+
+
+class AsyncKillSwitch(KillSwitch):
+
+    async def trigger(self) -> KillSwitchResult:
+        start = time.monotonic()
+        lookups = await gather_batch_concurrently(self._lookup_calls(), self.max_workers)
+        keys, outcomes, calls = self._cancel_calls(lookups)
+        cancels = await gather_batch_concurrently(calls, self.max_workers)
+        outcomes += [self._cancel_outcome(outcome) for outcome in cancels]
+        return KillSwitchResult(keys, outcomes, time.monotonic() - start)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,184 @@
+from typing import Union
+from .api_def import KlineInterval, KlineOutputFormat
+from .klines import KLINE_DTYPE, _check_numpy
+from .utils import format_time, interval_to_ms
+import asyncio
+import inspect
+import os
+import threading
+import time
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class KlineStore(object):
+    # klines are kept per (symbol, interval) as flat binary files of
+    # KLINE_DTYPE records sorted by open time, which are memory mapped on read
+
+    def __init__(self, path: str, client=None, page_limit: int = 1000):
+        _check_numpy()
+        self.path = path
+        self.client = client
+        self.page_limit = page_limit
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _get_file(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.path,
+                            '{}_{}.klines'.format(symbol.upper(), interval))
+
+    def _get_lock(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault((symbol.upper(), interval),
+                                          threading.Lock())
+
+    def load(self, symbol: str, interval: str) -> 'np.ndarray':
+        file_name = self._get_file(symbol, interval)
+        if not os.path.exists(file_name):
+            return np.empty(0, dtype=KLINE_DTYPE)
+        count = os.path.getsize(file_name) // KLINE_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.memmap(file_name, dtype=KLINE_DTYPE, mode='r', shape=(count,))
+
+    def last_open_time(self, symbol: str, interval: str) -> int:
+        klines = self.load(symbol, interval)
+        if len(klines) == 0:
+            return None
+        return int(klines['open_time'][-1])
+
+    def read(self,
+             symbol: str,
+             interval: str,
+             startTime: Union[int, str] = None,
+             endTime: Union[int, str] = None) -> 'np.ndarray':
+        klines = self.load(symbol, interval)
+        open_time = klines['open_time']
+        start = 0
+        end = len(klines)
+        if startTime is not None:
+            start = np.searchsorted(open_time, format_time(startTime), side='left')
+        if endTime is not None:
+            end = np.searchsorted(open_time, format_time(endTime), side='right')
+        return klines[start:end]
+
+    def append(self, symbol: str, interval: str, klines: 'np.ndarray') -> int:
+        last_open_time = self.last_open_time(symbol, interval)
+        if last_open_time is not None:
+            klines = klines[klines['open_time'] > last_open_time]
+        if len(klines) == 0:
+            return 0
+        with open(self._get_file(symbol, interval), 'ab') as f:
+            f.write(np.ascontiguousarray(klines, dtype=KLINE_DTYPE).tobytes())
+        return len(klines)
+
+    def _repair(self, symbol: str, interval: str) -> None:
+        # drop a partially written record left behind by an interrupted sync
+        file_name = self._get_file(symbol, interval)
+        if not os.path.exists(file_name):
+            return
+        size = os.path.getsize(file_name)
+        if size % KLINE_DTYPE.itemsize:
+            with open(file_name, 'r+b') as f:
+                f.truncate(size - size % KLINE_DTYPE.itemsize)
+
+    def _check_client(self) -> None:
+        if self.client is None:
+            raise ValueError('KlineStore needs a client to sync klines')
+
+    @staticmethod
+    def _check_blocking(result):
+        # an async client hands back coroutines, which only AsyncKlineStore awaits
+        if inspect.isawaitable(result):
+            result.close()
+            raise TypeError('KlineStore needs a blocking client, '
+                            'use AsyncKlineStore with an async client')
+        return result
+
+    def _start_time(self, symbol: str, interval: str,
+                    startTime: Union[int, str], earliest: int) -> int:
+        # syncing resumes after the last stored kline
+        last_open_time = self.last_open_time(symbol, interval)
+        if last_open_time is not None:
+            return last_open_time + 1
+        if startTime is not None:
+            return max(format_time(startTime), earliest)
+        return earliest
+
+    def _append_closed(self, symbol: str, interval: str, klines: 'np.ndarray') -> tuple:
+        # (appended, next start time or None when the sync is done). Only
+        # closed klines are stored, the open one is still changing
+        now = int(time.time() * 1000)
+        closed = klines[klines['close_time'] < now]
+        appended = self.append(symbol, interval, closed)
+        if(len(klines) < self.page_limit) or (len(closed) < len(klines)):
+            return appended, None
+        return appended, int(klines['open_time'][-1]) + self._interval_ms(interval)
+
+    def sync(self,
+             symbol: str,
+             interval: str,
+             startTime: Union[int, str] = None) -> int:
+        self._check_client()
+        with self._get_lock(symbol, interval):
+            self._repair(symbol, interval)
+            earliest = None
+            if self.last_open_time(symbol, interval) is None:
+                earliest = self._check_blocking(
+                    self.client._get_earliest_valid_timestamp(symbol, interval))
+            startTime = self._start_time(symbol, interval, startTime, earliest)
+            synced = 0
+            while(startTime is not None):
+                klines = self._check_blocking(self.client.get_klines(
+                    symbol=symbol,
+                    interval=interval,
+                    startTime=startTime,
+                    limit=self.page_limit,
+                    output_format=KlineOutputFormat.NUMPY))
+                appended, startTime = self._append_closed(symbol, interval, klines)
+                synced += appended
+        return synced
+
+    @staticmethod
+    def _interval_ms(interval: str) -> int:
+        if interval == KlineInterval.ONEMONTH:
+            return 1
+        return interval_to_ms(interval)
+
+
+class AsyncKlineStore(KlineStore):
+    # the same store synced with an async client. Syncs of a (symbol,
+    # interval) are serialized with asyncio locks, the file reads and
+    # writes stay blocking
+
+    def __init__(self, path: str, client=None, page_limit: int = 1000):
+        super().__init__(path, client, page_limit)
+        self._async_locks = {}
+
+    def _get_async_lock(self, symbol: str, interval: str) -> asyncio.Lock:
+        return self._async_locks.setdefault((symbol.upper(), interval), asyncio.Lock())
+
+    async def sync(self,
+                   symbol: str,
+                   interval: str,
+                   startTime: Union[int, str] = None) -> int:
+        self._check_client()
+        async with self._get_async_lock(symbol, interval):
+            self._repair(symbol, interval)
+            earliest = None
+            if self.last_open_time(symbol, interval) is None:
+                earliest = await self.client._get_earliest_valid_timestamp(symbol, interval)
+            startTime = self._start_time(symbol, interval, startTime, earliest)
+            synced = 0
+            while(startTime is not None):
+                klines = await self.client.get_klines(symbol=symbol,
+                                                      interval=interval,
+                                                      startTime=startTime,
+                                                      limit=self.page_limit,
+                                                      output_format=KlineOutputFormat.NUMPY)
+                appended, startTime = self._append_closed(symbol, interval, klines)
+                synced += appended
+        return synced
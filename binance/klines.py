@@ -0,0 +1,76 @@
+from .api_def import KlineOutputFormat
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+KLINE_FIELDS = [('open_time', 'i8'),
+                ('open', 'f8'),
+                ('high', 'f8'),
+                ('low', 'f8'),
+                ('close', 'f8'),
+                ('volume', 'f8'),
+                ('close_time', 'i8'),
+                ('quote_volume', 'f8'),
+                ('trades', 'i4'),
+                ('taker_buy_base_volume', 'f8'),
+                ('taker_buy_quote_volume', 'f8')]
+
+# positions of the fields in a raw kline, the trailing ignore field is dropped
+INT_COLUMNS = [0, 6, 8]
+FLOAT_COLUMNS = [1, 2, 3, 4, 5, 7, 9, 10]
+
+KLINE_DTYPE = np.dtype(KLINE_FIELDS) if np is not None else None
+
+
+def _check_numpy() -> None:
+    if np is None:
+        raise ImportError('numpy is required for columnar kline output, '
+                          'install it with pip install numpy')
+
+
+def klines_to_array(klines: list) -> 'np.ndarray':
+    _check_numpy()
+    array = np.empty(len(klines), dtype=KLINE_DTYPE)
+    if len(klines) == 0:
+        return array
+    # mixed ints and strings become one unicode array, which is then
+    # converted with a single vectorized cast per column group
+    raw = np.array(klines)[:, :len(KLINE_FIELDS)]
+    floats = raw[:, FLOAT_COLUMNS].astype(np.float64)
+    ints = raw[:, INT_COLUMNS].astype(np.int64)
+    for i, column in enumerate(FLOAT_COLUMNS):
+        array[KLINE_FIELDS[column][0]] = floats[:, i]
+    for i, column in enumerate(INT_COLUMNS):
+        array[KLINE_FIELDS[column][0]] = ints[:, i]
+    return array
+
+
+def array_to_columns(array: 'np.ndarray') -> dict:
+    return {name: np.ascontiguousarray(array[name]) for name, _ in KLINE_FIELDS}
+
+
+def concatenate_kline_arrays(arrays: list) -> 'np.ndarray':
+    _check_numpy()
+    arrays = [array for array in arrays if len(array)]
+    if not arrays:
+        return np.empty(0, dtype=KLINE_DTYPE)
+    array = np.concatenate(arrays)
+    # drop klines which do not advance the open time, i.e. page overlaps
+    open_time = array['open_time']
+    keep = np.ones(len(array), dtype=bool)
+    keep[1:] = open_time[1:] > np.maximum.accumulate(open_time)[:-1]
+    return array[keep] if not keep.all() else array
+
+
+def format_klines(klines, output_format: str = None):
+    if output_format is None:
+        return klines
+    if output_format not in (KlineOutputFormat.NUMPY, KlineOutputFormat.COLUMNS):
+        raise ValueError('Unknown kline output format: {}'.format(output_format))
+    _check_numpy()
+    array = klines if isinstance(klines, np.ndarray) else klines_to_array(klines)
+    if output_format == KlineOutputFormat.COLUMNS:
+        return array_to_columns(array)
+    return array
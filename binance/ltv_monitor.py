@@ -0,0 +1,239 @@
+from typing import Callable
+from .streams import call_client
+import asyncio
+import threading
+
+
+# levels of a loan in increasing order of risk, None when below all of them
+WARNING = 'warning'
+MARGIN_CALL = 'margin_call'
+LIQUIDATION = 'liquidation'
+LEVELS = (WARNING, MARGIN_CALL, LIQUIDATION)
+
+
+class LtvMonitor(object):
+    # watches the LTV of every cross-collateral loan. The loan wallet is
+    # polled at an interval shrinking from max_interval to min_interval as
+    # the riskiest loan gets closer to its liquidation LTV, between polls the
+    # LTV is recomputed from the polled loan and collateral amounts with the
+    # prices of the ticker stream. on_level is called with (loan, level,
+    # previous level) whenever a loan moves to another level, a rise seen in
+    # the prices also polls the wallet at once to confirm it. Loans are keyed
+    # by (loanCoin, collateralCoin)
+
+    def __init__(self,
+                 client,
+                 min_interval: float = 5,
+                 max_interval: float = 300,
+                 safe_distance: float = 0.5,
+                 warning_ratio: float = 0.8,
+                 on_level: Callable = None):
+        # safe_distance is the distance to the liquidation LTV, as a fraction
+        # of it, from which on the wallet is polled every max_interval. The
+        # warning level is at warning_ratio times the liquidation LTV
+        if not 0 < min_interval <= max_interval:
+            raise ValueError('min_interval has to be positive and at most max_interval')
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.safe_distance = safe_distance
+        self.warning_ratio = warning_ratio
+        self.on_level = on_level
+        self.polls = 0
+        self.last_error = None
+        self._configs = {}
+        self._loans = {}
+        self._prices = {}
+        self._lock = threading.Lock()
+        self._wake = None
+        self._closed = False
+        self._loop = None
+        self._thread = None
+
+    @staticmethod
+    def _key(loan: dict) -> tuple:
+        return (loan['loanCoin'], loan['collateralCoin'])
+
+    def _thresholds(self, key: tuple) -> dict:
+        # empty for a loan without a config, which never changes level
+        config = self._configs.get(key)
+        if config is None:
+            return {}
+        liquidation = float(config['liquidationCollateralRate'])
+        return {WARNING: liquidation * self.warning_ratio,
+                MARGIN_CALL: float(config['marginCallCollateralRate']),
+                LIQUIDATION: liquidation}
+
+    def _level(self, key: tuple, ltv: float) -> str:
+        level = None
+        for name, threshold in self._thresholds(key).items():
+            if ltv >= threshold:
+                level = name
+        return level
+
+    @staticmethod
+    def _rank(level: str) -> int:
+        return -1 if level is None else LEVELS.index(level)
+
+    def _price(self, loan_coin: str, collateral_coin: str) -> float:
+        # collateral price in the loan coin, None without a ticker for it
+        price = self._prices.get(collateral_coin + loan_coin)
+        if price:
+            return price
+        price = self._prices.get(loan_coin + collateral_coin)
+        if price:
+            return 1.0 / price
+        return None
+
+    def _update(self, key: tuple, ltv: float, changes: list) -> None:
+        loan = self._loans[key]
+        loan['ltv'] = ltv
+        level = self._level(key, ltv)
+        if level != loan['level']:
+            changes.append((dict(loan, level=level), level, loan['level']))
+            loan['level'] = level
+
+    def _fire(self, changes: list) -> None:
+        if self.on_level is None:
+            return
+        for loan, level, previous in changes:
+            self.on_level(loan, level, previous)
+
+    def _apply_wallet(self, wallet: dict) -> list:
+        # the polled LTV replaces the local estimate of every loan
+        changes = []
+        with self._lock:
+            loans, ltvs = {}, {}
+            for collateral in wallet['crossCollaterals']:
+                key = self._key(collateral)
+                loans[key] = {'loanCoin': key[0],
+                              'collateralCoin': key[1],
+                              'loan': (float(collateral['loanAmount'])
+                                       + float(collateral.get('interest', 0))),
+                              'collateral': float(collateral['locked']),
+                              'level': self._loans.get(key, {}).get('level')}
+                ltvs[key] = float(collateral['currentCollateralRate'])
+            self._loans = loans
+            for key, ltv in ltvs.items():
+                self._update(key, ltv, changes)
+        return changes
+
+    def on_ticker(self, event) -> None:
+        # callback for the miniTicker and ticker streams, also as an array
+        events = event if isinstance(event, list) else [event]
+        changes = []
+        with self._lock:
+            for ticker in events:
+                self._prices[ticker['s']] = float(ticker['c'])
+            for key, loan in self._loans.items():
+                price = self._price(*key)
+                if (price is None) or (loan['collateral'] == 0):
+                    continue
+                self._update(key, loan['loan'] / (loan['collateral'] * price), changes)
+        self._fire(changes)
+        rising = any(self._rank(level) > self._rank(previous)
+                     for _, level, previous in changes)
+        if rising:
+            self._wake_up()
+
+    def subscribe(self, stream_client) -> str:
+        # keeps the LTVs current from a MarketStreamClient
+        return stream_client.subscribe_mini_ticker(self.on_ticker)
+
+    def get_loan(self, loan_coin: str, collateral_coin: str) -> dict:
+        with self._lock:
+            loan = self._loans.get((loan_coin.upper(), collateral_coin.upper()))
+            return None if loan is None else dict(loan)
+
+    @property
+    def loans(self) -> dict:
+        with self._lock:
+            return {key: dict(loan) for key, loan in self._loans.items()}
+
+    def next_interval(self) -> float:
+        # linear in the distance of the riskiest loan to its liquidation LTV
+        distances = []
+        with self._lock:
+            for key, loan in self._loans.items():
+                liquidation = self._thresholds(key).get(LIQUIDATION)
+                if liquidation:
+                    distances.append((liquidation - loan['ltv']) / liquidation)
+        if not distances:
+            return self.max_interval
+        fraction = min(max(min(distances) / self.safe_distance, 0.0), 1.0)
+        return self.min_interval + (self.max_interval - self.min_interval) * fraction
+
+    async def poll(self) -> None:
+        # the loan configs are only requested again for a new loan
+        wallet = await call_client(self.client.cross_collateral_wallet)
+        if any(self._key(collateral) not in self._configs
+               for collateral in wallet['crossCollaterals']):
+            configs = await call_client(self.client.cross_collateral_info)
+            self._configs = {self._key(config): config for config in configs}
+        self._fire(self._apply_wallet(wallet))
+        self.polls += 1
+
+    async def run(self) -> None:
+        # a failed poll is kept in last_error and retried after min_interval.
+        # Runs until close() or stop(), also when those came before it
+        self._loop = asyncio.get_event_loop()
+        self._wake = asyncio.Event()
+        try:
+            while not self._closed:
+                try:
+                    await self.poll()
+                    self.last_error = None
+                    interval = self.next_interval()
+                except Exception as e:
+                    self.last_error = e
+                    interval = self.min_interval
+                if self._closed:
+                    break
+                try:
+                    await asyncio.wait_for(self._wake.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            self._wake = None
+
+    def _set_wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    def _wake_up(self) -> None:
+        # ends the wait for the next poll from any thread
+        if (self._loop is None) or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._set_wake)
+        except RuntimeError:
+            # the loop was closed in the meantime
+            pass
+
+    async def close(self) -> None:
+        self._closed = True
+        self._set_wake()
+
+    def start(self) -> None:
+        # runs the polling on its own event loop in a daemon thread, for use
+        # with the blocking clients. The loop exists before the thread starts
+        # so stop() always reaches it
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.run())
+            self._loop.close()
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        # the flag ends a run() not started yet, the wake up one waiting
+        self._closed = True
+        self._wake_up()
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,397 @@
+from typing import Callable
+from .api_def import DepthUpdateSpeed
+from .exceptions import OrderBookError
+from .streams import StreamConnection, call_client
+import asyncio
+import random
+import threading
+
+
+BIDS = 'bids'
+ASKS = 'asks'
+
+
+class _Level(object):
+    # treap node, total is the quantity of the node and all its descendants
+    __slots__ = ('key', 'quantity', 'priority', 'left', 'right', 'total')
+
+    def __init__(self, key: float, quantity: float):
+        self.key = key
+        self.quantity = quantity
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.total = quantity
+
+
+def _pull(node: _Level) -> None:
+    node.total = node.quantity
+    if node.left is not None:
+        node.total += node.left.total
+    if node.right is not None:
+        node.total += node.right.total
+
+
+def _split(node: _Level, key: float) -> tuple:
+    # (levels with keys below key, levels with keys from key on)
+    if node is None:
+        return (None, None)
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        _pull(node)
+        return (node, right)
+    left, node.left = _split(node.left, key)
+    _pull(node)
+    return (left, node)
+
+
+def _merge(left: _Level, right: _Level) -> _Level:
+    # every key of left is below every key of right
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _pull(left)
+        return left
+    right.left = _merge(left, right.left)
+    _pull(right)
+    return right
+
+
+def _delete(node: _Level, key: float) -> _Level:
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _delete(node.left, key)
+    else:
+        node.right = _delete(node.right, key)
+    _pull(node)
+    return node
+
+
+class OrderBookSide(object):
+    # levels are kept in a price -> quantity dict plus a treap of price keys
+    # where every node holds the total quantity of its subtree. Bid keys are
+    # negated prices so the leftmost level is always the best of either
+    # side. Updates, cumulative volumes and prices for a volume all walk a
+    # single root to level path, O(log n) for a book of n levels
+
+    def __init__(self, descending: bool):
+        self._sign = -1 if descending else 1
+        self._root = None
+        self._levels = {}
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def clear(self) -> None:
+        self._root = None
+        self._levels = {}
+
+    def _path(self, key: float) -> list:
+        path, node = [], self._root
+        while node.key != key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        path.append(node)
+        return path
+
+    def update(self, price: float, quantity: float) -> None:
+        key = self._sign * price
+        if quantity == 0:
+            if price in self._levels:
+                del self._levels[price]
+                self._root = _delete(self._root, key)
+        elif price in self._levels:
+            # totals are recomputed from the children so they never drift
+            self._levels[price] = quantity
+            path = self._path(key)
+            path[-1].quantity = quantity
+            for node in reversed(path):
+                _pull(node)
+        else:
+            self._levels[price] = quantity
+            left, right = _split(self._root, key)
+            self._root = _merge(_merge(left, _Level(key, quantity)), right)
+
+    def best(self) -> tuple:
+        node = self._root
+        if node is None:
+            return None
+        while node.left is not None:
+            node = node.left
+        return (self._sign * node.key, node.quantity)
+
+    def quantity(self, price: float) -> float:
+        return self._levels.get(price, 0.0)
+
+    def cumulative_volume(self, price: float) -> float:
+        # quantity of all levels at price or better
+        key = self._sign * price
+        volume, node = 0.0, self._root
+        while node is not None:
+            if node.key <= key:
+                volume += node.quantity
+                if node.left is not None:
+                    volume += node.left.total
+                node = node.right
+            else:
+                node = node.left
+        return volume
+
+    def price_for_volume(self, volume: float) -> float:
+        # worst price reached when volume is taken from the best level on
+        node = self._root
+        if (node is None) or (node.total < volume):
+            return None
+        while True:
+            left = 0.0 if node.left is None else node.left.total
+            if (node.left is not None) and (volume <= left):
+                node = node.left
+            elif (volume <= left + node.quantity) or (node.right is None):
+                return self._sign * node.key
+            else:
+                volume -= left + node.quantity
+                node = node.right
+
+    def levels(self, limit: int = None) -> list:
+        # in order walk stopping after limit levels
+        levels, stack, node = [], [], self._root
+        while (stack or (node is not None)) and ((limit is None) or (len(levels) < limit)):
+            if node is not None:
+                stack.append(node)
+                node = node.left
+                continue
+            node = stack.pop()
+            levels.append((self._sign * node.key, node.quantity))
+            node = node.right
+        return levels
+
+
+class OrderBook(object):
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+        self.bids = OrderBookSide(descending=True)
+        self.asks = OrderBookSide(descending=False)
+        self.last_update_id = None
+        self.last_event_time = None
+        self._lock = threading.Lock()
+
+    @property
+    def synced(self) -> bool:
+        return self.last_update_id is not None
+
+    def _side(self, side: str) -> OrderBookSide:
+        if side == BIDS:
+            return self.bids
+        if side == ASKS:
+            return self.asks
+        raise ValueError('side has to be {} or {}'.format(BIDS, ASKS))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            self.last_update_id = None
+
+    def apply_snapshot(self, snapshot: dict) -> None:
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for price, quantity in snapshot['bids']:
+                self.bids.update(float(price), float(quantity))
+            for price, quantity in snapshot['asks']:
+                self.asks.update(float(price), float(quantity))
+            self.last_update_id = snapshot['lastUpdateId']
+
+    def apply_diff(self, event: dict) -> bool:
+        # returns False for an event the book already contains and raises
+        # OrderBookError when events between the book and the event are missing
+        with self._lock:
+            if self.last_update_id is None:
+                raise OrderBookError('{} order book has no snapshot'.format(self.symbol))
+            if event['u'] <= self.last_update_id:
+                return False
+            if event['U'] > self.last_update_id + 1:
+                raise OrderBookError('{} depth events {} to {} are missing'.format(
+                    self.symbol, self.last_update_id + 1, event['U'] - 1))
+            for price, quantity in event['b']:
+                self.bids.update(float(price), float(quantity))
+            for price, quantity in event['a']:
+                self.asks.update(float(price), float(quantity))
+            self.last_update_id = event['u']
+            self.last_event_time = event['E']
+            return True
+
+    def best_bid(self) -> tuple:
+        with self._lock:
+            return self.bids.best()
+
+    def best_ask(self) -> tuple:
+        with self._lock:
+            return self.asks.best()
+
+    def mid_price(self) -> float:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if (bid is None) or (ask is None):
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def get_quantity(self, side: str, price: float) -> float:
+        with self._lock:
+            return self._side(side).quantity(price)
+
+    def cumulative_volume(self, side: str, price: float) -> float:
+        with self._lock:
+            return self._side(side).cumulative_volume(price)
+
+    def price_for_volume(self, side: str, volume: float) -> float:
+        with self._lock:
+            return self._side(side).price_for_volume(volume)
+
+    def get_depth(self, limit: int = None) -> dict:
+        with self._lock:
+            return {'lastUpdateId': self.last_update_id,
+                    BIDS: self.bids.levels(limit),
+                    ASKS: self.asks.levels(limit)}
+
+
+class OrderBookManager(object):
+    # keeps an OrderBook in sync from a REST snapshot and the diff depth
+    # stream. Events are buffered while the snapshot loads, a gap in the
+    # event ids (including one caused by a reconnect) triggers a resync. A
+    # failed snapshot request is repeated after a jittered exponential
+    # backoff, its error is kept in last_error
+
+    def __init__(self,
+                 client,
+                 symbol: str,
+                 limit: int = 1000,
+                 update_speed: str = DepthUpdateSpeed.MS100,
+                 stream_url: str = None,
+                 on_update: Callable = None,
+                 snapshot_backoff: float = 0.5,
+                 max_snapshot_backoff: float = 30.0):
+        self.client = client
+        self.symbol = symbol.upper()
+        self.limit = limit
+        self.on_update = on_update
+        self.book = OrderBook(symbol)
+        self.stream = StreamConnection(
+            stream_url or client.API_URL.STREAM,
+            ['{}@depth@{}'.format(symbol.lower(), update_speed)])
+        self.snapshot_backoff = snapshot_backoff
+        self.max_snapshot_backoff = max_snapshot_backoff
+        self.resyncs = 0
+        self.last_error = None
+        self._buffer = []
+        self._snapshot_failures = 0
+        self._snapshot_task = None
+        self._synced = None
+        self._loop = None
+        self._thread = None
+
+    def _snapshot_delay(self, attempt: int) -> float:
+        # no delay for the first request, then at least half of the
+        # exponential backoff so failed requests are never repeated at once
+        if attempt == 0:
+            return 0
+        delay = min(self.max_snapshot_backoff, self.snapshot_backoff * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    async def _fetch_snapshot(self, delay: float = 0) -> dict:
+        # the blocking client runs in an executor so the stream keeps being read
+        if delay:
+            await asyncio.sleep(delay)
+        return await call_client(self.client.get_order_book, self.symbol, self.limit)
+
+    def _start_snapshot(self) -> None:
+        # the snapshot is applied as soon as it arrives, not with the next event
+        self._snapshot_task = asyncio.ensure_future(
+            self._fetch_snapshot(self._snapshot_delay(self._snapshot_failures)))
+        self._snapshot_task.add_done_callback(self._on_snapshot)
+
+    def _on_snapshot(self, task: asyncio.Task) -> None:
+        # a task no longer current was replaced or cancelled on close
+        if task is self._snapshot_task:
+            self._sync()
+
+    def _process(self, event: dict) -> None:
+        self._buffer.append(event)
+        self._sync()
+
+    def _sync(self) -> None:
+        if not self.book.synced:
+            if self._snapshot_task is None:
+                self._start_snapshot()
+                return
+            if not self._snapshot_task.done():
+                return
+            snapshot_task, self._snapshot_task = self._snapshot_task, None
+            if snapshot_task.cancelled() or (snapshot_task.exception() is not None):
+                if not snapshot_task.cancelled():
+                    self.last_error = snapshot_task.exception()
+                self._snapshot_failures += 1
+                self._start_snapshot()
+                return
+            self._snapshot_failures = 0
+            self.book.apply_snapshot(snapshot_task.result())
+        events, self._buffer = self._buffer, []
+        for index, event in enumerate(events):
+            try:
+                applied = self.book.apply_diff(event)
+            except OrderBookError:
+                self.resyncs += 1
+                self._synced_event().clear()
+                self.book.reset()
+                self._buffer = events[index:]
+                self._start_snapshot()
+                return
+            if applied and (self.on_update is not None):
+                self.on_update(self.book)
+        self._synced_event().set()
+
+    def _synced_event(self) -> asyncio.Event:
+        # created on first use inside the running loop, by run() or by a
+        # wait_synced() called before it, and dropped when run() ends
+        if self._synced is None:
+            self._synced = asyncio.Event()
+        return self._synced
+
+    async def run(self) -> None:
+        self._synced_event()
+        try:
+            async for _, event in self.stream.messages():
+                self._process(event)
+        finally:
+            snapshot_task, self._snapshot_task = self._snapshot_task, None
+            if snapshot_task is not None:
+                snapshot_task.cancel()
+            self._synced = None
+
+    async def wait_synced(self, timeout: float = None) -> None:
+        await asyncio.wait_for(self._synced_event().wait(), timeout)
+
+    async def close(self) -> None:
+        await self.stream.close()
+
+    def start(self) -> None:
+        # runs the manager on its own event loop in a daemon thread, for use
+        # with the blocking clients
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.run())
+            self._loop.close()
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if (self._loop is not None) and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.close(), self._loop)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,320 @@
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP
+from typing import Union
+from .api_def import OrderType
+from .exceptions import OrderFilterError
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+ROUND_DOWN = 'down'
+ROUND_UP = 'up'
+ROUND_NEAREST = 'nearest'
+
+_DECIMAL_ROUNDING = {ROUND_DOWN: ROUND_FLOOR,
+                     ROUND_UP: ROUND_CEILING,
+                     ROUND_NEAREST: ROUND_HALF_UP}
+
+MARKET_ORDER_TYPES = (OrderType.MARKET,)
+
+# scale of the batch units of a price or quantity without a filter, the
+# exchange has at most 8 decimals
+DEFAULT_SCALE = 8
+
+# int64 products below this bound can't overflow
+_INT64_SAFE = 2 ** 62
+
+
+def _to_decimal(value: Union[int, float, str, Decimal]) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _decimals(*values: Decimal) -> int:
+    return max([max(0, -value.normalize().as_tuple().exponent) for value in values])
+
+
+def _units_array(values, scale: int) -> tuple:
+    # (scaled values, nearest units, exact) where exact marks the values
+    # within float error of a whole unit, i.e. values whose decimal form
+    # has at most scale decimals. Only those are taken as whole units, so
+    # 0.3 with a step of 0.1 is 3 units and never 2
+    scaled = np.asarray(values, dtype=np.float64) * 10 ** scale
+    nearest = np.rint(scaled)
+    exact = np.abs(scaled - nearest) <= 4 * np.finfo(np.float64).eps * np.abs(scaled)
+    return scaled, nearest.astype(np.int64), exact
+
+
+def _exact_product(units: 'np.ndarray', factor) -> 'np.ndarray':
+    # units * factor without int64 overflow, in Python ints (object dtype)
+    # only when some product could leave the int64 range
+    if np.any(np.abs(np.asarray(factor, dtype=np.float64)) >= _INT64_SAFE) or np.any(
+            np.abs(units.astype(np.float64) * factor) >= _INT64_SAFE):
+        return np.asarray(units, dtype=object) * np.asarray(factor, dtype=object)
+    return units * factor
+
+
+def _compare(units: 'np.ndarray', bound: int, above: bool) -> 'np.ndarray':
+    # units >= bound, or units <= bound when not above. A bound beyond the
+    # int64 range compares like the nearest safe value
+    if units.dtype != object:
+        bound = min(max(bound, -_INT64_SAFE), _INT64_SAFE)
+    valid = (units >= bound) if above else (units <= bound)
+    return np.asarray(valid, dtype=bool)
+
+
+class FilterGrid(object):
+    # a min/max/step filter expressed as integers in units of 10 ** -scale,
+    # a step of 0 or a max of 0 disables that part of the filter
+
+    def __init__(self, name: str, minimum: str, maximum: str, step: str):
+        self.name = name
+        minimum, maximum, step = (_to_decimal(minimum), _to_decimal(maximum),
+                                  _to_decimal(step))
+        self.scale = _decimals(minimum, maximum, step)
+        self.minimum = self._units(minimum)
+        self.maximum = self._units(maximum)
+        self.step = self._units(step)
+
+    def _units(self, value: Decimal, rounding: str = ROUND_FLOOR) -> int:
+        return int(value.scaleb(self.scale).to_integral_value(rounding))
+
+    def _value(self, units: int) -> Decimal:
+        return Decimal(units).scaleb(-self.scale)
+
+    def snap(self, value, rounding: str = ROUND_DOWN) -> Decimal:
+        value = _to_decimal(value)
+        units = self._units(value, _DECIMAL_ROUNDING[rounding])
+        if self.step:
+            offset, remainder = divmod(units - self.minimum, self.step)
+            if (rounding == ROUND_UP) and remainder:
+                offset += 1
+            elif (rounding == ROUND_NEAREST) and (2 * remainder >= self.step):
+                offset += 1
+            units = self.minimum + offset * self.step
+        return self._value(units)
+
+    def check(self, value) -> str:
+        value = _to_decimal(value)
+        units = value.scaleb(self.scale)
+        if units != units.to_integral_value():
+            return '{} {} has more decimals than allowed'.format(self.name, value)
+        units = int(units)
+        if units < self.minimum:
+            return '{} {} is below the minimum {}'.format(
+                self.name, value, self._value(self.minimum))
+        if self.maximum and (units > self.maximum):
+            return '{} {} is above the maximum {}'.format(
+                self.name, value, self._value(self.maximum))
+        if self.step and (units - self.minimum) % self.step:
+            return '{} {} is not a multiple of the step {}'.format(
+                self.name, value, self._value(self.step))
+        return None
+
+    def _units_array(self, values) -> tuple:
+        return _units_array(values, self.scale)
+
+    def snap_array(self, values, rounding: str = ROUND_DOWN) -> 'np.ndarray':
+        # values are converted to int64 units once, the snapping to the
+        # step is exact integer arithmetic like the Decimal path
+        scaled, units, exact = self._units_array(values)
+        if rounding == ROUND_UP:
+            rounded = np.ceil(scaled)
+        elif rounding == ROUND_NEAREST:
+            rounded = np.floor(scaled + 0.5)
+        else:
+            rounded = np.floor(scaled)
+        units = np.where(exact, units, rounded.astype(np.int64))
+        if self.step:
+            offset, remainder = np.divmod(units - self.minimum, self.step)
+            if rounding == ROUND_UP:
+                offset += (remainder > 0)
+            elif rounding == ROUND_NEAREST:
+                offset += (2 * remainder >= self.step)
+            units = self.minimum + offset * self.step
+        return units
+
+    def check_array(self, values) -> 'np.ndarray':
+        _, units, valid = self._units_array(values)
+        valid &= units >= self.minimum
+        if self.maximum:
+            valid &= units <= self.maximum
+        if self.step:
+            valid &= (units - self.minimum) % self.step == 0
+        return valid
+
+    def to_float(self, units: 'np.ndarray') -> 'np.ndarray':
+        return units / 10 ** self.scale
+
+
+class SymbolFilters(object):
+    def __init__(self, symbol: str, filters: list):
+        self.symbol = symbol
+        self.price_filter = None
+        self.lot_size = None
+        self.market_lot_size = None
+        self.min_notional = None
+        self.max_notional = None
+        self.min_notional_to_market = True
+        self.multiplier_up = None
+        self.multiplier_down = None
+        for symbol_filter in filters:
+            self._compile(symbol_filter)
+
+    @classmethod
+    def from_symbol_info(cls, symbol_info: dict) -> 'SymbolFilters':
+        return cls(symbol_info['symbol'], symbol_info['filters'])
+
+    def _compile(self, symbol_filter: dict) -> None:
+        filter_type = symbol_filter['filterType']
+        if filter_type == 'PRICE_FILTER':
+            self.price_filter = FilterGrid('price',
+                                           symbol_filter['minPrice'],
+                                           symbol_filter['maxPrice'],
+                                           symbol_filter['tickSize'])
+        elif filter_type == 'LOT_SIZE':
+            self.lot_size = FilterGrid('quantity',
+                                       symbol_filter['minQty'],
+                                       symbol_filter['maxQty'],
+                                       symbol_filter['stepSize'])
+        elif filter_type == 'MARKET_LOT_SIZE':
+            self.market_lot_size = FilterGrid('market quantity',
+                                              symbol_filter['minQty'],
+                                              symbol_filter['maxQty'],
+                                              symbol_filter['stepSize'])
+        elif filter_type == 'MIN_NOTIONAL':
+            self.min_notional = _to_decimal(symbol_filter['minNotional'])
+            self.min_notional_to_market = symbol_filter.get('applyToMarket', True)
+        elif filter_type == 'NOTIONAL':
+            self.min_notional = _to_decimal(symbol_filter['minNotional'])
+            self.min_notional_to_market = symbol_filter.get('applyMinToMarket', True)
+            if _to_decimal(symbol_filter.get('maxNotional', 0)):
+                self.max_notional = _to_decimal(symbol_filter['maxNotional'])
+        elif filter_type == 'PERCENT_PRICE':
+            self.multiplier_up = _to_decimal(symbol_filter['multiplierUp'])
+            self.multiplier_down = _to_decimal(symbol_filter['multiplierDown'])
+
+    def _lot_filter(self, type: str) -> FilterGrid:
+        if (type in MARKET_ORDER_TYPES) and (self.market_lot_size is not None) \
+                and self.market_lot_size.step:
+            return self.market_lot_size
+        return self.lot_size
+
+    def round_price(self, price, rounding: str = ROUND_DOWN) -> Decimal:
+        if self.price_filter is None:
+            return _to_decimal(price)
+        return self.price_filter.snap(price, rounding)
+
+    def round_quantity(self, quantity, type: str = OrderType.LIMIT,
+                       rounding: str = ROUND_DOWN) -> Decimal:
+        lot_filter = self._lot_filter(type)
+        if lot_filter is None:
+            return _to_decimal(quantity)
+        return lot_filter.snap(quantity, rounding)
+
+    def check(self,
+              quantity=None,
+              price=None,
+              type: str = OrderType.LIMIT,
+              avg_price=None) -> list:
+        errors = []
+        if (price is not None) and (self.price_filter is not None):
+            errors.append(self.price_filter.check(price))
+        lot_filter = self._lot_filter(type)
+        if (quantity is not None) and (lot_filter is not None):
+            errors.append(lot_filter.check(quantity))
+        notional_price = avg_price if type in MARKET_ORDER_TYPES else price
+        if (quantity is not None) and (notional_price is not None):
+            notional = _to_decimal(quantity) * _to_decimal(notional_price)
+            apply_min = (type not in MARKET_ORDER_TYPES) or self.min_notional_to_market
+            if apply_min and (self.min_notional is not None) and (notional < self.min_notional):
+                errors.append('notional {} is below the minimum {}'.format(
+                    notional, self.min_notional))
+            if (self.max_notional is not None) and (notional > self.max_notional):
+                errors.append('notional {} is above the maximum {}'.format(
+                    notional, self.max_notional))
+        if (price is not None) and (avg_price is not None) and (self.multiplier_up is not None):
+            price, avg_price = _to_decimal(price), _to_decimal(avg_price)
+            if price > avg_price * self.multiplier_up:
+                errors.append('price {} is above {} x average price {}'.format(
+                    price, self.multiplier_up, avg_price))
+            if price < avg_price * self.multiplier_down:
+                errors.append('price {} is below {} x average price {}'.format(
+                    price, self.multiplier_down, avg_price))
+        return [error for error in errors if error is not None]
+
+    def validate(self,
+                 quantity=None,
+                 price=None,
+                 type: str = OrderType.LIMIT,
+                 avg_price=None) -> None:
+        errors = self.check(quantity, price, type, avg_price)
+        if errors:
+            raise OrderFilterError('{} order rejected locally: {}'.format(
+                self.symbol, '; '.join(errors)))
+
+    def round_batch(self, prices, quantities, type: str = OrderType.LIMIT,
+                    price_rounding: str = ROUND_DOWN,
+                    quantity_rounding: str = ROUND_DOWN) -> tuple:
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        if self.price_filter is not None:
+            prices = self.price_filter.to_float(
+                self.price_filter.snap_array(prices, price_rounding))
+        lot_filter = self._lot_filter(type)
+        if lot_filter is not None:
+            quantities = lot_filter.to_float(
+                lot_filter.snap_array(quantities, quantity_rounding))
+        return prices, quantities
+
+    def check_batch(self, prices, quantities, type: str = OrderType.LIMIT,
+                    avg_price: float = None) -> 'np.ndarray':
+        # the same rules as check, prices may be None for market orders. The
+        # notional and the price multipliers are compared exactly in int64
+        # units of the price and lot filter scales, like the Decimal path
+        quantities = np.asarray(quantities, dtype=np.float64)
+        if prices is not None:
+            prices = np.asarray(prices, dtype=np.float64)
+            valid = np.ones(np.broadcast(prices, quantities).shape, dtype=bool)
+        else:
+            valid = np.ones(quantities.shape, dtype=bool)
+        price_scale = DEFAULT_SCALE
+        if prices is not None:
+            if self.price_filter is not None:
+                valid &= self.price_filter.check_array(prices)
+                price_scale = self.price_filter.scale
+            _, price_units, _ = _units_array(prices, price_scale)
+        lot_filter = self._lot_filter(type)
+        quantity_scale = DEFAULT_SCALE
+        if lot_filter is not None:
+            valid &= lot_filter.check_array(quantities)
+            quantity_scale = lot_filter.scale
+        _, quantity_units, _ = _units_array(quantities, quantity_scale)
+        if avg_price is not None:
+            avg_price = _to_decimal(avg_price)
+        notional_units = None
+        if type in MARKET_ORDER_TYPES:
+            if avg_price is not None:
+                avg_scale = _decimals(avg_price)
+                notional_units = _exact_product(quantity_units,
+                                                int(avg_price.scaleb(avg_scale)))
+                notional_scale = quantity_scale + avg_scale
+        elif prices is not None:
+            notional_units = _exact_product(quantity_units, price_units)
+            notional_scale = quantity_scale + price_scale
+        if notional_units is not None:
+            apply_min = (type not in MARKET_ORDER_TYPES) or self.min_notional_to_market
+            if apply_min and (self.min_notional is not None):
+                bound = self.min_notional.scaleb(notional_scale).to_integral_value(ROUND_CEILING)
+                valid &= _compare(notional_units, int(bound), True)
+            if self.max_notional is not None:
+                bound = self.max_notional.scaleb(notional_scale).to_integral_value(ROUND_FLOOR)
+                valid &= _compare(notional_units, int(bound), False)
+        if (prices is not None) and (avg_price is not None) and (self.multiplier_up is not None):
+            highest = (avg_price * self.multiplier_up).scaleb(price_scale)
+            lowest = (avg_price * self.multiplier_down).scaleb(price_scale)
+            valid &= _compare(price_units, int(highest.to_integral_value(ROUND_FLOOR)), False)
+            valid &= _compare(price_units, int(lowest.to_integral_value(ROUND_CEILING)), True)
+        return valid
@@ -0,0 +1,254 @@
+from .user_data import SPOT, MARGIN, ISOLATED_MARGIN
+from .utils import gather_batch_concurrently, run_batch_concurrently
+import threading
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# assets prices are routed through when there is no direct pair
+DEFAULT_BRIDGES = ('USDT', 'BUSD', 'BTC')
+
+
+def _check_numpy() -> None:
+    if np is None:
+        raise ImportError('numpy is required for portfolio valuation, '
+                          'install it with pip install numpy')
+
+
+class _RateVector(object):
+    # conversion rates of a list of assets into one quote asset. Every rate
+    # is the product of two legs, a leg is a slot of the price array which
+    # is inverted for a pair quoted the other way round. legs_by_slot lists
+    # the positions whose route uses each price slot
+
+    def __init__(self, assets: list, legs: list):
+        self.assets = list(assets)
+        self.positions = {asset: position for position, asset in enumerate(self.assets)}
+        self.slots = np.array([[leg[0] for leg in route] for route in legs],
+                              dtype=np.int64).reshape(-1, 2)
+        self.inverted = np.array([[leg[1] for leg in route] for route in legs],
+                                 dtype=bool).reshape(-1, 2)
+        self.rates = np.empty(len(self.assets), dtype=float)
+        self.legs_by_slot = {}
+        for position, route in enumerate(self.slots):
+            for slot in set(route.tolist()):
+                self.legs_by_slot.setdefault(slot, []).append(position)
+
+    def compute(self, prices: 'np.ndarray', positions=slice(None)) -> None:
+        legs = prices[self.slots[positions]]
+        with np.errstate(divide='ignore'):
+            legs = np.where(self.inverted[positions], 1.0 / legs, legs)
+        self.rates[positions] = legs[:, 0] * legs[:, 1]
+
+
+class PriceGraph(object):
+    # last prices of all symbols with the assets as nodes. An asset is
+    # converted with a direct or inverse pair, else through the first bridge
+    # asset with a pair to it. Prices are kept in one array, the rates into
+    # each quote asset in a vector of routes over it, so a price update only
+    # recomputes the rates whose route uses that symbol. The routes are only
+    # rebuilt when a symbol gains or loses its price
+
+    def __init__(self, symbols: list, bridges: tuple = DEFAULT_BRIDGES):
+        # symbols as in the exchangeInfo symbols list
+        _check_numpy()
+        self.bridges = bridges
+        self._pairs = {}
+        self._slots = {}
+        for symbol in symbols:
+            self._pairs[(symbol['baseAsset'], symbol['quoteAsset'])] = symbol['symbol']
+            self._slots[symbol['symbol']] = len(self._slots)
+        # the two last slots are the constant legs 1.0 and nan
+        self._one, self._none = len(self._slots), len(self._slots) + 1
+        self._prices = np.full(len(self._slots) + 2, np.nan)
+        self._prices[self._one] = 1.0
+        self._vectors = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _priced(price: float) -> bool:
+        return (price > 0) and np.isfinite(price)
+
+    def update_prices(self, tickers: list) -> None:
+        # tickers as returned by get_price_ticker() without a symbol
+        with self._lock:
+            for ticker in tickers:
+                slot = self._slots.get(ticker['symbol'])
+                if slot is not None:
+                    self._prices[slot] = float(ticker['price'])
+            self._vectors = {}
+
+    def update_price(self, symbol: str, price: float) -> None:
+        with self._lock:
+            slot = self._slots.get(symbol)
+            if slot is None:
+                return
+            was_priced = self._priced(self._prices[slot])
+            self._prices[slot] = price = float(price)
+            if was_priced != self._priced(price):
+                self._vectors = {}
+                return
+            for vector in self._vectors.values():
+                positions = vector.legs_by_slot.get(slot)
+                if positions:
+                    vector.compute(self._prices, positions)
+
+    def _direct_leg(self, asset: str, quote: str) -> tuple:
+        if asset == quote:
+            return (self._one, False)
+        slot = self._slots.get(self._pairs.get((asset, quote)))
+        if (slot is not None) and self._priced(self._prices[slot]):
+            return (slot, False)
+        slot = self._slots.get(self._pairs.get((quote, asset)))
+        if (slot is not None) and self._priced(self._prices[slot]):
+            return (slot, True)
+        return None
+
+    def _route(self, asset: str, quote: str) -> tuple:
+        leg = self._direct_leg(asset, quote)
+        if leg is not None:
+            return (leg, (self._one, False))
+        for bridge in self.bridges:
+            to_bridge = self._direct_leg(asset, bridge)
+            if to_bridge is None:
+                continue
+            from_bridge = self._direct_leg(bridge, quote)
+            if from_bridge is not None:
+                return (to_bridge, from_bridge)
+        return ((self._none, False), (self._one, False))
+
+    def _vector(self, assets: list, quote: str) -> _RateVector:
+        # built for the assets first asked for, rebuilt once for new ones
+        vector = self._vectors.get(quote)
+        if (vector is None) or any(asset not in vector.positions for asset in assets):
+            known = [] if vector is None else vector.assets
+            assets = known + [asset for asset in dict.fromkeys(assets)
+                              if asset not in known]
+            vector = _RateVector(assets, [self._route(asset, quote) for asset in assets])
+            vector.compute(self._prices)
+            self._vectors[quote] = vector
+        return vector
+
+    def rates(self, assets: list, quote: str) -> 'np.ndarray':
+        # nan for assets which cannot be converted
+        with self._lock:
+            vector = self._vector(assets, quote)
+            return vector.rates[[vector.positions[asset] for asset in assets]]
+
+    def rate(self, asset: str, quote: str) -> float:
+        # None when the asset cannot be converted
+        rate = float(self.rates([asset], quote)[0])
+        return None if np.isnan(rate) else rate
+
+
+class PortfolioValuation(object):
+    # marks the spot, cross margin and isolated margin balances to market
+    # from a single get_price_ticker() snapshot of all symbols. Balances are
+    # kept as asset and amount arrays per account, the valuation is one
+    # vectorized multiplication with the conversion rates. Prices can be
+    # kept current from the all market mini ticker stream
+
+    def __init__(self,
+                 client,
+                 quote: str = 'USDT',
+                 bridges: tuple = DEFAULT_BRIDGES,
+                 accounts: tuple = (SPOT, MARGIN, ISOLATED_MARGIN)):
+        _check_numpy()
+        self.client = client
+        self.quote = quote.upper()
+        self.bridges = bridges
+        self.accounts = accounts
+        self.graph = None
+        self._balances = {}
+
+    @staticmethod
+    def _parse_balances(account: str, response: dict) -> tuple:
+        # (assets, amounts) with the net amount of every asset of the account
+        amounts = {}
+        if account == SPOT:
+            for balance in response['balances']:
+                amounts[balance['asset']] = float(balance['free']) + float(balance['locked'])
+        elif account == MARGIN:
+            for balance in response['userAssets']:
+                amounts[balance['asset']] = float(balance['netAsset'])
+        else:
+            for pair in response['assets']:
+                for balance in (pair['baseAsset'], pair['quoteAsset']):
+                    amounts[balance['asset']] = (amounts.get(balance['asset'], 0.0)
+                                                 + float(balance['netAsset']))
+        assets = [asset for asset, amount in amounts.items() if amount != 0]
+        return (assets, np.array([amounts[asset] for asset in assets], dtype=float))
+
+    def _refresh_calls(self) -> list:
+        # the symbols of the exchange are only loaded for the first refresh
+        calls = {SPOT: (self.client.get_account_info, {}),
+                 MARGIN: (self.client.query_cross_margin_account_details, {}),
+                 ISOLATED_MARGIN: (self.client.query_isolated_margin_account_info, {})}
+        calls = [calls[account] for account in self.accounts]
+        calls.append((self.client.get_price_ticker, {}))
+        if self.graph is None:
+            calls.append((self.client.get_exchange_info, {}))
+        return calls
+
+    def _apply_refresh(self, outcomes: list) -> None:
+        for _, error in outcomes:
+            if error is not None:
+                raise error
+        results = [result for result, _ in outcomes]
+        for account, response in zip(self.accounts, results):
+            self._balances[account] = self._parse_balances(account, response)
+        if self.graph is None:
+            self.graph = PriceGraph(results[-1]['symbols'], self.bridges)
+        self.graph.update_prices(results[len(self.accounts)])
+
+    def refresh(self) -> None:
+        # the account balances and all prices are fetched concurrently
+        calls = self._refresh_calls()
+        self._apply_refresh(run_batch_concurrently(calls, len(calls)))
+
+    def on_ticker(self, event) -> None:
+        # callback for the miniTicker and ticker streams, also as an array.
+        # Ticks before the first refresh are dropped, its price snapshot
+        # holds all prices anyway
+        if self.graph is None:
+            return
+        events = event if isinstance(event, list) else [event]
+        for ticker in events:
+            self.graph.update_price(ticker['s'], ticker['c'])
+
+    def subscribe(self, stream_client) -> str:
+        # keeps the prices current from a MarketStreamClient
+        return stream_client.subscribe_mini_ticker(self.on_ticker)
+
+    def value(self, quote: str = None) -> dict:
+        # values are in the quote asset, assets without a conversion route
+        # are listed in unpriced and left out of the totals
+        if self.graph is None:
+            raise ValueError('PortfolioValuation has no prices, call refresh() first')
+        quote = self.quote if quote is None else quote.upper()
+        valuation = {'quote': quote, 'total': 0.0, 'accounts': {}, 'assets': {},
+                     'unpriced': []}
+        for account in self.accounts:
+            assets, amounts = self._balances.get(account, ([], np.empty(0)))
+            values = amounts * self.graph.rates(assets, quote)
+            priced = ~np.isnan(values)
+            valuation['accounts'][account] = float(values[priced].sum())
+            valuation['total'] += valuation['accounts'][account]
+            valuation['assets'][account] = {asset: float(value) for asset, value, ok
+                                            in zip(assets, values, priced) if ok}
+            valuation['unpriced'] += [(account, asset) for asset, ok
+                                      in zip(assets, priced) if not ok]
+        return valuation
+
+
+class AsyncPortfolioValuation(PortfolioValuation):
+
+    async def refresh(self) -> None:
+        calls = self._refresh_calls()
+        self._apply_refresh(await gather_batch_concurrently(calls, len(calls)))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,198 @@
+from typing import Union
+from requests.structures import CaseInsensitiveDict
+import re
+import threading
+import time
+
+
+INTERVAL_SECONDS = {'S': 1, 'M': 60, 'H': 60*60, 'D': 60*60*24}
+INTERVAL_LETTERS = {'SECOND': 'S', 'MINUTE': 'M', 'HOUR': 'H', 'DAY': 'D'}
+
+# default limits used until rateLimits from exchangeInfo are loaded
+DEFAULT_RATE_LIMITS = [
+    {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE',
+     'intervalNum': 1, 'limit': 1200},
+    {'rateLimitType': 'ORDERS', 'interval': 'SECOND',
+     'intervalNum': 10, 'limit': 100},
+    {'rateLimitType': 'ORDERS', 'interval': 'DAY',
+     'intervalNum': 1, 'limit': 200000},
+    {'rateLimitType': 'SAPI_IP_WEIGHT', 'interval': 'MINUTE',
+     'intervalNum': 1, 'limit': 12000},
+]
+
+# request weights of /api endpoints, callables get the request params
+API_ENDPOINT_WEIGHTS = {
+    'ping': 1,
+    'time': 1,
+    'exchangeInfo': 10,
+    'depth': lambda method, params: _depth_weight(params.get('limit', 100)),
+    'trades': 1,
+    'historicalTrades': 5,
+    'aggTrades': 1,
+    'klines': 1,
+    'avgPrice': 1,
+    'ticker/24hr': lambda method, params: 1 if 'symbol' in params else 40,
+    'ticker/price': lambda method, params: 1 if 'symbol' in params else 2,
+    'ticker/bookTicker': lambda method, params: 1 if 'symbol' in params else 2,
+    'order': lambda method, params: 2 if method == 'get' else 1,
+    'order/test': 1,
+    'order/oco': 1,
+    'openOrders': lambda method, params: (
+        1 if method == 'delete' else (3 if 'symbol' in params else 40)),
+    'allOrders': 10,
+    'orderList': 2,
+    'allOrderList': 10,
+    'openOrderList': 3,
+    'account': 10,
+    'myTrades': 10,
+}
+
+# request weights of /sapi and /wapi endpoints, counted against the ip weight
+SAPI_ENDPOINT_WEIGHTS = {
+    'accountSnapshot': 2400,
+    'capital/config/getall': 10,
+    'margin/allOrders': 200,
+    'margin/myTrades': 10,
+    'margin/openOrders': lambda method, params: (
+        1 if method == 'delete' else (10 if 'symbol' in params else 40)),
+    'margin/account': 10,
+    'margin/isolated/account': 10,
+}
+
+# endpoints which count against the ORDERS rate limits when posted
+ORDER_ENDPOINTS = ('order', 'order/oco', 'margin/order')
+
+API_URI_PATTERN = re.compile(r'/(api|sapi|wapi)/v\d+/(.+?)(\.html)?$')
+WEIGHT_HEADER_PATTERN = re.compile(
+    r'^x-(mbx-used-weight|mbx-order-count|sapi-used-ip-weight)-(\d+)([smhd])$')
+HEADER_LIMIT_TYPES = {'mbx-used-weight': 'REQUEST_WEIGHT',
+                      'mbx-order-count': 'ORDERS',
+                      'sapi-used-ip-weight': 'SAPI_IP_WEIGHT'}
+
+
+def _depth_weight(limit: int) -> int:
+    limit = int(limit)
+    if limit <= 100:
+        return 1
+    if limit <= 500:
+        return 5
+    if limit <= 1000:
+        return 10
+    return 50
+
+
+class TokenBucket(object):
+    def __init__(self, limit: int, interval_seconds: float, headroom: float = 0.0):
+        self.limit = limit
+        self.interval_seconds = interval_seconds
+        self.capacity = max(1.0, limit * (1.0 - headroom))
+        self.rate = self.capacity / interval_seconds
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def reserve(self, cost: float, now: float) -> float:
+        # tokens may go negative, callers queue behind earlier reservations
+        self._refill(now)
+        self.tokens -= cost
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def correct(self, used: float, now: float) -> None:
+        # the exchange usage is authoritative but ignores requests in flight
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter(object):
+    def __init__(self,
+                 rate_limits: list = None,
+                 headroom: float = 0.05):
+        self.headroom = headroom
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._blocked_until = 0.0
+        self.update_limits(rate_limits or DEFAULT_RATE_LIMITS)
+
+    @staticmethod
+    def _bucket_key(limit_type: str, interval_num: int, interval_letter: str) -> tuple:
+        return (limit_type, '{}{}'.format(interval_num, interval_letter.upper()))
+
+    def update_limits(self, rate_limits: list) -> None:
+        with self._lock:
+            for rate_limit in rate_limits:
+                letter = INTERVAL_LETTERS[rate_limit['interval']]
+                key = self._bucket_key(rate_limit['rateLimitType'],
+                                       rate_limit['intervalNum'],
+                                       letter)
+                bucket = self._buckets.get(key)
+                if (bucket is not None) and (bucket.limit == rate_limit['limit']):
+                    continue
+                self._buckets[key] = TokenBucket(
+                    rate_limit['limit'],
+                    rate_limit['intervalNum'] * INTERVAL_SECONDS[letter],
+                    self.headroom)
+
+    @property
+    def buckets(self) -> dict:
+        return self._buckets
+
+    def request_costs(self, method: str, uri: str, params: Union[dict, list] = None) -> dict:
+        match = API_URI_PATTERN.search(uri)
+        if match is None:
+            return {}
+        params = dict(params or {})
+        api, path = match.group(1), match.group(2)
+        if api == 'api':
+            weight_type, weights = 'REQUEST_WEIGHT', API_ENDPOINT_WEIGHTS
+        else:
+            weight_type, weights = 'SAPI_IP_WEIGHT', SAPI_ENDPOINT_WEIGHTS
+        weight = weights.get(path, 1)
+        if callable(weight):
+            weight = weight(method, params)
+        costs = {weight_type: weight, 'RAW_REQUESTS': 1}
+        if (method == 'post') and (path in ORDER_ENDPOINTS):
+            costs['ORDERS'] = 1
+        return costs
+
+    def reserve(self, method: str, uri: str, params: Union[dict, list] = None) -> float:
+        costs = self.request_costs(method, uri, params)
+        now = time.monotonic()
+        with self._lock:
+            wait = max(0.0, self._blocked_until - now)
+            for (limit_type, _), bucket in self._buckets.items():
+                if limit_type in costs:
+                    wait = max(wait, bucket.reserve(costs[limit_type], now))
+        return wait
+
+    def acquire(self, method: str, uri: str, params: Union[dict, list] = None) -> None:
+        wait = self.reserve(method, uri, params)
+        if wait > 0:
+            time.sleep(wait)
+
+    def update_from_headers(self, status_code: int, headers: dict) -> None:
+        headers = CaseInsensitiveDict(headers)
+        now = time.monotonic()
+        with self._lock:
+            for name, value in headers.items():
+                match = WEIGHT_HEADER_PATTERN.match(name.lower())
+                if match is None:
+                    continue
+                key = self._bucket_key(HEADER_LIMIT_TYPES[match.group(1)],
+                                       int(match.group(2)),
+                                       match.group(3))
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.correct(float(value), now)
+            if status_code in (418, 429):
+                retry_after = float(headers.get('Retry-After', 60))
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+
+if __name__ == '__main__':
+    pass
@@ -1,58 +1,239 @@
+from .coalescer import RequestCoalescer
 from .exceptions import BinanceAPIError, BinanceResponseError
 from .exceptions import RequestHandlerError
+from .json_decoder import get_json_decoder
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy, NO_SUCH_ORDER
 from .utils import create_query_string, create_sorted_list, generate_signature
+from .utils import run_batch_concurrently, run_concurrently
 from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
 from requests.models import Response
+from urllib3.connection import HTTPConnection
+import socket
 import time
 
 
+KEEPALIVE_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, 'TCP_KEEPIDLE'):
+    KEEPALIVE_SOCKET_OPTIONS += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30),
+                                 (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)]
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    # tcp keep-alive probes stop idle pooled connections from being
+    # silently dropped by NATs and firewalls during quiet periods
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = (HTTPConnection.default_socket_options
+                                    + KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
 class RequestHandler(object):
+
+    _retry_exceptions = (ConnectionError, Timeout)
+    _coalescer_class = RequestCoalescer
+
     def __init__(self,
                  api_key: str = None,
                  api_secret: str = None,
-                 request_params: dict = None):
+                 request_params: dict = None,
+                 rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 json_decoder: str = None,
+                 coalesce_ttl: float = None):
         
         self.api_key = api_key
         self.api_secret = api_secret
         self.request_params = request_params
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self._retry_policies = {}
+        self.clock = None
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.set_json_decoder(json_decoder)
+        # None disables coalescing, 0 only shares requests in flight
+        self.coalescer = None if coalesce_ttl is None else self._coalescer_class(coalesce_ttl)
         self.authenticated = False if((api_key is None) or (api_secret is None)) else True
         self.session = self._init_session()
         
+    def set_json_decoder(self, json_decoder: str = None) -> None:
+        # json_decoder is one of 'orjson', 'ujson' or 'json', the fastest
+        # installed decoder is used when it is None
+        self.json_decoder = json_decoder
+        self._json_loads = get_json_decoder(json_decoder)
+
+    def _session_headers(self) -> dict:
+        headers = {'Accept': 'application/json',
+                   'User-Agent': 'binance/python'}
+        if self.authenticated:
+            headers['X-MBX-APIKEY'] = self.api_key
+        return headers
+
     def _init_session(self) -> Session:
         session = Session()
-        session.headers.update({'Accept': 'application/json',
-                                'User-Agent': 'binance/python'})
-        if self.authenticated:
-            session.headers.update({'X-MBX-APIKEY': self.api_key})
+        session.headers.update(self._session_headers())
+        session.mount('https://', self._create_adapter())
+        session.mount('http://', self._create_adapter())
         return session
 
+    def _create_adapter(self) -> HTTPAdapter:
+        return KeepAliveAdapter(pool_maxsize=self.pool_maxsize,
+                                pool_block=self.pool_block)
+
+    def mount_pools(self, *uri_prefixes: str) -> None:
+        # each prefix gets its own connection pool so a burst on one api
+        # family cannot starve the others of connections
+        for prefix in dict.fromkeys(uri_prefixes):
+            self.session.mount(prefix, self._create_adapter())
+
+    def warm_up(self, uri: str, connections: int = None) -> dict:
+        # concurrent requests force the pool to open that many connections,
+        # which are then kept alive for the following requests
+        connections = connections or self.pool_maxsize
+        run_concurrently(self.get, [{'path': uri, 'coalesce': False}] * connections,
+                         max_workers=connections)
+        return self.pool_stats()
+
+    def pool_stats(self) -> dict:
+        stats = {}
+        for prefix, adapter in self.session.adapters.items():
+            opened = requests = 0
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools[key]
+                opened += pool.num_connections
+                requests += pool.num_requests
+            if requests:
+                stats[prefix] = {'requests': requests,
+                                 'connections_opened': opened,
+                                 'connections_reused': max(0, requests - opened)}
+        return stats
+
+    def _request_kwargs(self) -> dict:
+        kwargs = {}
+        kwargs['timeout'] = 10
+        if self.request_params:
+            kwargs.update(self.request_params)
+        return kwargs
+
+    def _get_timestamp(self) -> int:
+        if self.clock is not None:
+            return self.clock.now_ms()
+        return int(time.time() * 1000)
+
+    def _prepare_params(self, signed: bool, params: dict):
+        if not signed:
+            return params
+        params = create_sorted_list(params)
+        params.append(('timestamp', self._get_timestamp()))
+        query_string = create_query_string(params)
+        params.append(('signature', generate_signature(
+            query_string=query_string,
+            api_secret=self.api_secret)))
+        return params
+
+    def set_retry_policy(self, retry_policy: RetryPolicy, *uri_prefixes: str) -> None:
+        # without prefixes the policy becomes the default for all requests
+        if not uri_prefixes:
+            self.retry_policy = retry_policy
+        for prefix in uri_prefixes:
+            self._retry_policies[prefix] = retry_policy
+
+    def get_retry_policy(self, uri: str) -> RetryPolicy:
+        prefixes = [prefix for prefix in self._retry_policies if uri.startswith(prefix)]
+        if not prefixes:
+            return self.retry_policy
+        return self._retry_policies[max(prefixes, key=len)]
+
+    def _prepare_request(self, method: str, uri: str, signed: bool, params: dict) -> tuple:
+        # reserves the rate limit budget and signs the params. A request
+        # which has to wait for the budget is signed after the wait, so its
+        # timestamp is still fresh when it is sent
+        wait = 0.0
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve(method, uri, params)
+        if wait > 0:
+            return (wait, None)
+        return (0.0, self._prepare_params(signed, params))
+
+    def _send(self,
+              method: str,
+              uri: str,
+              signed: bool,
+              params: dict,
+              prepared: tuple = None) -> Response:
+        kwargs = self._request_kwargs()
+        wait, query_params = prepared or self._prepare_request(method, uri, signed, params)
+        if wait > 0:
+            time.sleep(wait)
+        if query_params is None:
+            query_params = self._prepare_params(signed, params)
+        kwargs['params'] = query_params
+        response = getattr(self.session, method)(uri, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_headers(response.status_code,
+                                                  response.headers)
+        return response
+
+    def _lookup_order(self, uri: str, params: dict) -> dict:
+        # an order POST that failed in flight may still have been placed,
+        # it is only resent once the exchange confirms it does not exist
+        try:
+            return self._request('get', uri, signed=True,
+                                 **RetryPolicy.order_lookup_params(params))
+        except BinanceAPIError as e:
+            if e.code == NO_SUCH_ORDER:
+                return None
+            raise
+
     def _request(self,
                  method: str,
                  uri: str,
                  signed: bool = False,
                  forced_params=False,
+                 prepared: tuple = None,
                  **params):
-        
-        kwargs = {}
-        kwargs['timeout'] = 10
-        if self.request_params:
-            kwargs.update(self.response_params)
-
-        if signed:
-            params = create_sorted_list(params)
-            params.append(('timestamp', int(time.time() * 1000)))
-            query_string = create_query_string(params)
-            params.append(('signature', generate_signature(
-                query_string=query_string,
-                api_secret=self.api_secret)))
-        kwargs['params'] = params
-        response = getattr(self.session, method)(uri, **kwargs)
-        return self._handle_response(response)
 
-    def get(self, path, signed=False, **kwargs):
+        retry_policy = self.get_retry_policy(uri)
+        attempt = 0
+        while(True):
+            try:
+                # retries are signed again with a new timestamp
+                response = self._send(method, uri, signed, params, prepared)
+                prepared = None
+            except self._retry_exceptions:
+                prepared = None
+                if retry_policy is None:
+                    raise
+                delay = retry_policy.get_delay(attempt, method, uri, params)
+                if delay is None:
+                    raise
+            else:
+                if (retry_policy is None) or (200 <= response.status_code < 300):
+                    return self._handle_response(response)
+                delay = retry_policy.get_delay(attempt, method, uri, params, response)
+                if delay is None:
+                    return self._handle_response(response)
+            time.sleep(delay)
+            attempt += 1
+            if retry_policy.requires_lookup(method, uri, params):
+                order = self._lookup_order(uri, params)
+                if order is not None:
+                    return order
+
+    def get(self, path, signed=False, coalesce=True, **kwargs):
+        # coalesce=False always sends the request, for pings and server time
+        # samples which are only useful when they reach the server
         if not self.authenticated and signed is True:
             raise RequestHandlerError(
                 "Unauthenticated client issued a signed GET http request")
+        if (self.coalescer is not None) and coalesce and not signed:
+            return self.coalescer.call(self.coalescer.make_key(path, kwargs),
+                                       lambda: self._request('get', path, signed, **kwargs))
         return self._request('get', path, signed, **kwargs)
 
     def post(self, path, signed=False, **kwargs):
@@ -61,6 +242,25 @@ class RequestHandler(object):
                 "Unauthenticated client issued a POST http request")
         return self._request('post', path, signed, **kwargs)
 
+    def _prepare_batch(self, method: str, path: str, params_list: list) -> list:
+        # budgets are reserved and signatures computed for the whole batch
+        # in one pass before any request is sent
+        calls = []
+        for params in params_list:
+            prepared = self._prepare_request(method, path, True, params)
+            calls.append((self._request, dict(params, method=method, uri=path,
+                                              signed=True, prepared=prepared)))
+        return calls
+
+    def post_batch(self, path, params_list: list, max_workers: int = None) -> list:
+        # signed POSTs sent concurrently, returns (result, error) pairs in
+        # the order of params_list
+        if not self.authenticated:
+            raise RequestHandlerError(
+                "Unauthenticated client issued a POST http request")
+        return run_batch_concurrently(self._prepare_batch('post', path, params_list),
+                                      max_workers or self.pool_maxsize)
+
     def put(self, path, signed=False, **kwargs):
         if not self.authenticated:
             raise RequestHandlerError(
@@ -73,15 +273,14 @@ class RequestHandler(object):
                 "Unauthenticated client issued a DELETE http request")
         return self._request('delete', path, signed, **kwargs)
 
-    @classmethod
-    def _handle_response(cls, response: Response) -> dict:
+    def _handle_response(self, response: Response) -> dict:
         if(type(response) != Response):
             raise RequestHandlerError(
                 " _handle_response called with an argument  which is not of type Response")
         if not (200 <= response.status_code < 300):
             raise BinanceAPIError(response)
         try:
-            return response.json()
+            return self._json_loads(response.content)
         except ValueError:
             raise BinanceResponseError("Invalid Response: {}".format(response.text))
 
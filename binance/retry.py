@@ -0,0 +1,88 @@
+from requests.models import Response
+from .rate_limiter import API_URI_PATTERN
+import random
+
+
+RETRY_AFTER_STATUSES = (418, 429)
+
+# order endpoints that can be looked up by origClientOrderId before a retry
+LOOKUP_ORDER_ENDPOINTS = ('order', 'margin/order')
+
+# error code returned when an order lookup finds no order
+NO_SUCH_ORDER = -2013
+
+
+class RetryPolicy(object):
+    # retries failed requests with jittered exponential backoff. Only
+    # requests in retry_methods are retried, plus order POSTs that carry a
+    # newClientOrderId since those can be looked up before they are resent
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff: float = 0.5,
+                 max_backoff: float = 30.0,
+                 max_retry_after: float = 120.0,
+                 retry_statuses: tuple = (500, 502, 503, 504),
+                 retry_methods: tuple = ('get',),
+                 jitter: bool = True):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = retry_statuses
+        self.retry_methods = retry_methods
+        self.jitter = jitter
+
+    @staticmethod
+    def requires_lookup(method: str, uri: str, params: dict) -> bool:
+        if (method != 'post') or (params.get('newClientOrderId') is None):
+            return False
+        match = API_URI_PATTERN.search(uri)
+        return (match is not None) and (match.group(2) in LOOKUP_ORDER_ENDPOINTS)
+
+    def is_retryable(self, method: str, uri: str, params: dict) -> bool:
+        return (method in self.retry_methods) or self.requires_lookup(method, uri, params)
+
+    def backoff_delay(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        if self.jitter:
+            # full jitter keeps clients that failed together from retrying together
+            delay = random.uniform(0, delay)
+        return delay
+
+    def get_delay(self,
+                  attempt: int,
+                  method: str,
+                  uri: str,
+                  params: dict,
+                  response: Response = None) -> float:
+        # returns the seconds to wait before the next attempt, or None if the
+        # request must not be retried. A missing response is a connection error
+        if (attempt >= self.max_retries) or not self.is_retryable(method, uri, params):
+            return None
+        if response is None:
+            return self.backoff_delay(attempt)
+        if response.status_code in RETRY_AFTER_STATUSES:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is None:
+                return self.backoff_delay(attempt)
+            retry_after = float(retry_after)
+            if retry_after > self.max_retry_after:
+                return None
+            return retry_after
+        if response.status_code in self.retry_statuses:
+            return self.backoff_delay(attempt)
+        return None
+
+    @staticmethod
+    def order_lookup_params(params: dict) -> dict:
+        lookup_params = {'symbol': params['symbol'],
+                         'origClientOrderId': params['newClientOrderId']}
+        for key in ('isIsolated', 'recvWindow'):
+            if key in params:
+                lookup_params[key] = params[key]
+        return lookup_params
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,224 @@
+from typing import Union
+from .api_def import WalletType
+from .utils import BatchResult, format_time, run_batch_concurrently
+import json
+import sqlite3
+import threading
+import time
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DAY_MS = 24 * 3600 * 1000
+
+# most days a single accountSnapshot request may return
+SNAPSHOT_CHUNK_DAYS = 30
+
+# a day without a snapshot is only taken as having none once it is this
+# many days old, snapshots are published some time after the day is over
+SNAPSHOT_LAG_DAYS = 2
+
+# key of the per asset balances in the snapshot data of each wallet type
+BALANCE_KEYS = {WalletType.SPOT: 'balances',
+                WalletType.MARGIN: 'userAssets',
+                WalletType.FUTURES: 'assets'}
+
+CREATE_TABLES = ('''
+CREATE TABLE IF NOT EXISTS snapshots (
+    type TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    updateTime INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (type, day)
+)''', '''
+CREATE TABLE IF NOT EXISTS fetched_days (
+    type TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    PRIMARY KEY (type, day)
+)''', '''
+CREATE TABLE IF NOT EXISTS balances (
+    type TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    field TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    updateTime INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (type, asset, field, day)
+)''')
+
+
+def _check_numpy() -> None:
+    if np is None:
+        raise ImportError('numpy is required for balance series, '
+                          'install it with pip install numpy')
+
+
+def _balance_rows(wallet_type: str, day: int, snapshot: dict) -> list:
+    # every numeric field of every asset becomes its own row, so a balance
+    # series is read by a single primary key range scan
+    rows = []
+    for balance in snapshot['data'].get(BALANCE_KEYS[wallet_type], []):
+        for field, value in balance.items():
+            if field == 'asset':
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            rows.append((wallet_type, balance['asset'], field, day,
+                         snapshot['updateTime'], value))
+    return rows
+
+
+class SnapshotArchive(object):
+    # daily account snapshots are kept per wallet type and day in a sqlite
+    # database. A sync only requests the days not fetched before, in chunks
+    # of up to 30 days with the wallet types fetched concurrently, so every
+    # accountSnapshot request (weight 2400) is made only once
+
+    def __init__(self, path: str, client=None):
+        self.path = path
+        self.client = client
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            for statement in CREATE_TABLES:
+                self._connection.execute(statement)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _day_range(startTime: Union[int, str], endTime: Union[int, str] = None) -> range:
+        endTime = int(time.time() * 1000) if endTime is None else format_time(endTime)
+        return range(format_time(startTime) // DAY_MS, endTime // DAY_MS + 1)
+
+    def missing_days(self,
+                     wallet_type: str,
+                     startTime: Union[int, str],
+                     endTime: Union[int, str] = None) -> list:
+        days = self._day_range(startTime, endTime)
+        with self._lock:
+            fetched = {row[0] for row in self._connection.execute(
+                'SELECT day FROM fetched_days WHERE type = ? AND day BETWEEN ? AND ?',
+                (wallet_type, days.start, days.stop - 1))}
+        return [day for day in days if day not in fetched]
+
+    @staticmethod
+    def _chunks(days: list) -> list:
+        # consecutive days are grouped into (first day, last day) chunks
+        chunks = []
+        for day in days:
+            if chunks and (day == chunks[-1][1] + 1) and (
+                    day - chunks[-1][0] < SNAPSHOT_CHUNK_DAYS):
+                chunks[-1][1] = day
+            else:
+                chunks.append([day, day])
+        return [tuple(chunk) for chunk in chunks]
+
+    def store(self, wallet_type: str, snapshots: list, fetched_days: list = ()) -> int:
+        # days with a snapshot are marked fetched, days without one only once
+        # they are SNAPSHOT_LAG_DAYS old, before that they are requested again
+        today = int(time.time() * 1000) // DAY_MS
+        rows, balance_rows, snapshot_days = [], [], set()
+        for snapshot in snapshots:
+            day = snapshot['updateTime'] // DAY_MS
+            snapshot_days.add(day)
+            rows.append((wallet_type, day, snapshot['updateTime'], json.dumps(snapshot)))
+            balance_rows += _balance_rows(wallet_type, day, snapshot)
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO snapshots VALUES (?, ?, ?, ?)', rows)
+            stored = self._connection.total_changes - before
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO balances VALUES (?, ?, ?, ?, ?, ?)', balance_rows)
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO fetched_days VALUES (?, ?)',
+                [(wallet_type, day) for day in fetched_days
+                 if (day in snapshot_days) or (day <= today - SNAPSHOT_LAG_DAYS)])
+        return stored
+
+    def _fetch_chunk(self, wallet_type: str, first_day: int, last_day: int) -> int:
+        response = self.client.get_daily_account_snapshot(
+            type=wallet_type,
+            startTime=first_day * DAY_MS,
+            endTime=(last_day + 1) * DAY_MS - 1,
+            limit=SNAPSHOT_CHUNK_DAYS)
+        return self.store(wallet_type, response['snapshotVos'],
+                          range(first_day, last_day + 1))
+
+    def sync(self,
+             startTime: Union[int, str],
+             endTime: Union[int, str] = None,
+             wallet_types: tuple = (WalletType.SPOT, WalletType.MARGIN, WalletType.FUTURES),
+             max_workers: int = None) -> BatchResult:
+        # the number of new snapshots and the first error are keyed by type
+        if self.client is None:
+            raise ValueError('SnapshotArchive needs a client to sync snapshots')
+        calls, call_types = [], []
+        for wallet_type in wallet_types:
+            for first_day, last_day in self._chunks(
+                    self.missing_days(wallet_type, startTime, endTime)):
+                calls.append((self._fetch_chunk, {'wallet_type': wallet_type,
+                                                  'first_day': first_day,
+                                                  'last_day': last_day}))
+                call_types.append(wallet_type)
+        outcomes = run_batch_concurrently(calls, max_workers or len(wallet_types))
+        synced = dict.fromkeys(wallet_types, 0)
+        errors = {}
+        for wallet_type, (stored, error) in zip(call_types, outcomes):
+            if error is None:
+                synced[wallet_type] += stored
+            else:
+                errors.setdefault(wallet_type, error)
+        return BatchResult(wallet_types, [(synced[wallet_type], errors.get(wallet_type))
+                                          for wallet_type in wallet_types])
+
+    def read(self,
+             wallet_type: str,
+             startTime: Union[int, str] = None,
+             endTime: Union[int, str] = None) -> list:
+        # snapshots ordered by day, as returned in snapshotVos
+        query = 'SELECT data FROM snapshots WHERE type = ?'
+        args = [wallet_type]
+        if startTime is not None:
+            query += ' AND updateTime >= ?'
+            args.append(format_time(startTime))
+        if endTime is not None:
+            query += ' AND updateTime <= ?'
+            args.append(format_time(endTime))
+        with self._lock:
+            rows = self._connection.execute(query + ' ORDER BY day', args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def balance_series(self,
+                       wallet_type: str,
+                       asset: str,
+                       field: str = 'free',
+                       startTime: Union[int, str] = None,
+                       endTime: Union[int, str] = None) -> tuple:
+        # (update times, values) arrays of one balance field, e.g. 'free' or
+        # 'netAsset' for MARGIN and 'walletBalance' for FUTURES
+        _check_numpy()
+        query = ('SELECT updateTime, value FROM balances '
+                 'WHERE type = ? AND asset = ? AND field = ?')
+        args = [wallet_type, asset.upper(), field]
+        if startTime is not None:
+            query += ' AND updateTime >= ?'
+            args.append(format_time(startTime))
+        if endTime is not None:
+            query += ' AND updateTime <= ?'
+            args.append(format_time(endTime))
+        with self._lock:
+            rows = self._connection.execute(query + ' ORDER BY day', args).fetchall()
+        times = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        return (times, values)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,276 @@
+from typing import AsyncIterator, Callable
+from .api_def import ApiUrl, DepthUpdateSpeed
+from .json_decoder import get_json_decoder
+import asyncio
+import functools
+import inspect
+import random
+import time
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+# streams a single connection may carry
+MAX_STREAMS_PER_CONNECTION = 1024
+
+
+def _check_websockets() -> None:
+    if websockets is None:
+        raise ImportError('websockets is required for streams, '
+                          'install it with pip install websockets')
+
+
+async def call_client(func: Callable, *args, **kwargs):
+    # blocking client methods run in an executor so that the streams keep
+    # being read, async client methods hand back a coroutine awaited here
+    loop = asyncio.get_event_loop()
+    result = await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class StreamConnection(object):
+    # a websocket connection to one or more combined streams. A lost
+    # connection is re-established with jittered backoff, consumers detect
+    # the missed events from the sequence ids of the events themselves
+
+    def __init__(self,
+                 base_url: str,
+                 streams: list,
+                 reconnect_backoff: float = 0.5,
+                 max_reconnect_backoff: float = 30.0,
+                 json_decoder: str = None,
+                 on_connect: Callable = None):
+        _check_websockets()
+        self.base_url = base_url
+        self.streams = list(streams)
+        self.reconnect_backoff = reconnect_backoff
+        self.max_reconnect_backoff = max_reconnect_backoff
+        self.on_connect = on_connect
+        self.reconnects = 0
+        self._loads = get_json_decoder(json_decoder)
+        self._websocket = None
+        self._closed = False
+
+    @property
+    def url(self) -> str:
+        return '{}/stream?streams={}'.format(self.base_url, '/'.join(self.streams))
+
+    def _reconnect_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_reconnect_backoff,
+                                     self.reconnect_backoff * 2 ** attempt))
+
+    async def messages(self) -> AsyncIterator[tuple]:
+        # yields (stream name, event) pairs until close() is called
+        attempt = 0
+        while not self._closed:
+            try:
+                async with websockets.connect(self.url, max_size=None) as websocket:
+                    self._websocket = websocket
+                    attempt = 0
+                    if self.on_connect is not None:
+                        await self.on_connect()
+                    async for message in websocket:
+                        message = self._loads(message)
+                        yield message['stream'], message['data']
+            except (websockets.WebSocketException, OSError, asyncio.TimeoutError):
+                pass
+            finally:
+                self._websocket = None
+            if self._closed:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(self._reconnect_delay(attempt))
+            attempt += 1
+
+    async def reconnect(self) -> None:
+        # drops the current connection, e.g. after the streams were changed
+        if self._websocket is not None:
+            await self._websocket.close()
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._websocket is not None:
+            await self._websocket.close()
+
+
+class MarketStreamClient(object):
+    # multiplexes market data streams onto combined stream connections of at
+    # most max_streams_per_connection streams each. After a reconnect the
+    # klines and aggregate trades missed in between are fetched through the
+    # REST client and delivered as stream events before the live ones.
+    # Subscriptions have to be made before run() is started
+
+    def __init__(self,
+                 client=None,
+                 stream_url: str = None,
+                 max_streams_per_connection: int = MAX_STREAMS_PER_CONNECTION,
+                 reconnect_backoff: float = 0.5,
+                 json_decoder: str = None,
+                 on_error: Callable = None):
+        # an exception raised by a callback or a backfill is passed to
+        # on_error with the stream name and kept in last_error, the other
+        # subscriptions and connections keep running
+        _check_websockets()
+        self.client = client
+        self.on_error = on_error
+        self.callback_errors = 0
+        self.last_error = None
+        if stream_url is None:
+            stream_url = ApiUrl().STREAM if client is None else client.API_URL.STREAM
+        self.stream_url = stream_url
+        self.max_streams_per_connection = max_streams_per_connection
+        self.reconnect_backoff = reconnect_backoff
+        self.json_decoder = json_decoder
+        self.connections = []
+        self._callbacks = {}
+        self._backfill_streams = {}
+        self._last_agg_trade_ids = {}
+        self._last_kline_open_times = {}
+
+    def subscribe(self, stream: str, callback: Callable) -> str:
+        self._callbacks.setdefault(stream, []).append(callback)
+        return stream
+
+    def subscribe_trades(self, symbol: str, callback: Callable) -> str:
+        return self.subscribe('{}@trade'.format(symbol.lower()), callback)
+
+    def subscribe_agg_trades(self, symbol: str, callback: Callable) -> str:
+        stream = self.subscribe('{}@aggTrade'.format(symbol.lower()), callback)
+        self._backfill_streams[stream] = (self._backfill_agg_trades, symbol.upper())
+        return stream
+
+    def subscribe_klines(self, symbol: str, interval: str, callback: Callable) -> str:
+        stream = self.subscribe('{}@kline_{}'.format(symbol.lower(), interval), callback)
+        self._backfill_streams[stream] = (functools.partial(self._backfill_klines,
+                                                            interval=interval),
+                                          symbol.upper())
+        return stream
+
+    def subscribe_book_ticker(self, symbol: str, callback: Callable) -> str:
+        return self.subscribe('{}@bookTicker'.format(symbol.lower()), callback)
+
+    def subscribe_depth(self,
+                        symbol: str,
+                        callback: Callable,
+                        levels: str = None,
+                        update_speed: str = DepthUpdateSpeed.MS100) -> str:
+        # levels is one of the WEBSOCKET_DEPTH values for partial book
+        # snapshots, without it the stream carries diff events
+        return self.subscribe('{}@depth{}@{}'.format(symbol.lower(), levels or '',
+                                                     update_speed), callback)
+
+    def subscribe_mini_ticker(self, callback: Callable, symbol: str = None) -> str:
+        if symbol is None:
+            return self.subscribe('!miniTicker@arr', callback)
+        return self.subscribe('{}@miniTicker'.format(symbol.lower()), callback)
+
+    def _shards(self) -> list:
+        streams = list(self._callbacks)
+        size = self.max_streams_per_connection
+        return [streams[i:i + size] for i in range(0, len(streams), size)]
+
+    def _is_new(self, stream: str, event) -> bool:
+        # drops events already delivered by a backfill, array payloads such
+        # as !miniTicker@arr are never backfilled and always new
+        if not isinstance(event, dict):
+            return True
+        if event.get('e') == 'aggTrade':
+            if event['a'] <= self._last_agg_trade_ids.get(stream, -1):
+                return False
+            self._last_agg_trade_ids[stream] = event['a']
+        elif event.get('e') == 'kline':
+            if event['k']['t'] < self._last_kline_open_times.get(stream, -1):
+                return False
+            self._last_kline_open_times[stream] = event['k']['t']
+        return True
+
+    def _record_error(self, stream: str, error: Exception) -> None:
+        self.callback_errors += 1
+        self.last_error = error
+        if self.on_error is not None:
+            self.on_error(stream, error)
+
+    async def _dispatch(self, stream: str, event) -> None:
+        if not self._is_new(stream, event):
+            return
+        for callback in self._callbacks.get(stream, []):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self._record_error(stream, e)
+
+    async def _backfill_agg_trades(self, stream: str, symbol: str) -> None:
+        if stream not in self._last_agg_trade_ids:
+            return
+        while(True):
+            trades = await call_client(self.client.get_agg_trades, symbol,
+                                       fromId=self._last_agg_trade_ids[stream] + 1,
+                                       limit=1000)
+            for trade in trades:
+                await self._dispatch(stream, dict(trade, e='aggTrade', E=trade['T'],
+                                                  s=symbol))
+            if len(trades) < 1000:
+                break
+
+    async def _backfill_klines(self, stream: str, symbol: str, interval: str) -> None:
+        # pages from the last kline seen, which is sent again in its final
+        # state, until a page is not full
+        if stream not in self._last_kline_open_times:
+            return
+        startTime = self._last_kline_open_times[stream]
+        while(True):
+            klines = await call_client(self.client.get_klines, symbol, interval,
+                                       startTime=startTime, limit=1000)
+            now = int(time.time() * 1000)
+            for kline in klines:
+                await self._dispatch(stream, {
+                    'e': 'kline', 'E': now, 's': symbol,
+                    'k': {'t': kline[0], 'T': kline[6], 's': symbol, 'i': interval,
+                          'o': kline[1], 'c': kline[4], 'h': kline[2], 'l': kline[3],
+                          'v': kline[5], 'n': kline[8], 'x': kline[6] < now,
+                          'q': kline[7], 'V': kline[9], 'Q': kline[10]}})
+            if len(klines) < 1000:
+                break
+            startTime = klines[-1][0] + 1
+
+    async def _backfill(self, streams: list) -> None:
+        if self.client is None:
+            return
+        for stream in streams:
+            if stream in self._backfill_streams:
+                backfill, symbol = self._backfill_streams[stream]
+                await backfill(stream, symbol)
+
+    async def _consume(self, connection: StreamConnection) -> None:
+        reconnects = connection.reconnects
+        # a failing backfill or malformed event is recorded like a callback
+        # error, it must not end the consumer of the connection
+        async for stream, event in connection.messages():
+            try:
+                if connection.reconnects != reconnects:
+                    reconnects = connection.reconnects
+                    await self._backfill(connection.streams)
+                await self._dispatch(stream, event)
+            except Exception as e:
+                self._record_error(stream, e)
+
+    async def run(self) -> None:
+        self.connections = [StreamConnection(self.stream_url, streams,
+                                             reconnect_backoff=self.reconnect_backoff,
+                                             json_decoder=self.json_decoder)
+                            for streams in self._shards()]
+        await asyncio.gather(*[self._consume(connection)
+                               for connection in self.connections])
+
+    async def close(self) -> None:
+        await asyncio.gather(*[connection.close() for connection in self.connections])
+
+
+if __name__ == '__main__':
+    pass
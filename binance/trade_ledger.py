@@ -0,0 +1,166 @@
+from typing import Union
+from .utils import BatchResult, format_time, gather_batch_concurrently
+from .utils import run_batch_concurrently
+import inspect
+import sqlite3
+import threading
+
+
+# columns of the trades table, in the field order of a myTrades trade
+TRADE_COLUMNS = ('symbol', 'id', 'orderId', 'orderListId', 'price', 'qty',
+                 'quoteQty', 'commission', 'commissionAsset', 'time',
+                 'isBuyer', 'isMaker', 'isBestMatch')
+
+BOOL_COLUMNS = ('isBuyer', 'isMaker', 'isBestMatch')
+
+CREATE_TRADES_TABLE = '''
+CREATE TABLE IF NOT EXISTS trades (
+    symbol TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    orderId INTEGER,
+    orderListId INTEGER,
+    price TEXT,
+    qty TEXT,
+    quoteQty TEXT,
+    commission TEXT,
+    commissionAsset TEXT,
+    time INTEGER,
+    isBuyer INTEGER,
+    isMaker INTEGER,
+    isBestMatch INTEGER,
+    PRIMARY KEY (symbol, id)
+)'''
+
+CREATE_TIME_INDEX = 'CREATE INDEX IF NOT EXISTS trades_time ON trades (symbol, time)'
+
+
+class TradeLedger(object):
+    # account trades are kept per symbol in a sqlite database. A sync only
+    # fetches the trades after the highest stored trade id with fromId, so
+    # the full history is downloaded once and reads never touch the network
+
+    def __init__(self, path: str, client=None, page_limit: int = 1000):
+        self.path = path
+        self.client = client
+        self.page_limit = page_limit
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(CREATE_TRADES_TABLE)
+            self._connection.execute(CREATE_TIME_INDEX)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def last_trade_id(self, symbol: str) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT MAX(id) FROM trades WHERE symbol = ?', (symbol.upper(),)).fetchone()
+        return row[0]
+
+    def append(self, trades: list) -> int:
+        # trades already in the ledger are ignored
+        rows = [tuple(trade.get(column) for column in TRADE_COLUMNS) for trade in trades]
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO trades ({}) VALUES ({})'.format(
+                    ', '.join(TRADE_COLUMNS), ', '.join('?' * len(TRADE_COLUMNS))),
+                rows)
+            return self._connection.total_changes - before
+
+    def read(self,
+             symbol: str,
+             startTime: Union[int, str] = None,
+             endTime: Union[int, str] = None) -> list:
+        # trades ordered by id, in the same format get_trade_list returns
+        query = 'SELECT {} FROM trades WHERE symbol = ?'.format(', '.join(TRADE_COLUMNS))
+        args = [symbol.upper()]
+        if startTime is not None:
+            query += ' AND time >= ?'
+            args.append(format_time(startTime))
+        if endTime is not None:
+            query += ' AND time <= ?'
+            args.append(format_time(endTime))
+        with self._lock:
+            rows = self._connection.execute(query + ' ORDER BY id', args).fetchall()
+        trades = [dict(zip(TRADE_COLUMNS, row)) for row in rows]
+        for trade in trades:
+            for column in BOOL_COLUMNS:
+                trade[column] = bool(trade[column])
+        return trades
+
+    def symbols(self) -> list:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT DISTINCT symbol FROM trades ORDER BY symbol').fetchall()
+        return [row[0] for row in rows]
+
+    def _check_client(self) -> None:
+        if self.client is None:
+            raise ValueError('TradeLedger needs a client to sync trades')
+
+    @staticmethod
+    def _check_blocking(result):
+        # an async client hands back coroutines, which only AsyncTradeLedger awaits
+        if inspect.isawaitable(result):
+            result.close()
+            raise TypeError('TradeLedger needs a blocking client, '
+                            'use AsyncTradeLedger with an async client')
+        return result
+
+    def _first_from_id(self, symbol: str) -> int:
+        last_trade_id = self.last_trade_id(symbol)
+        return 0 if last_trade_id is None else last_trade_id + 1
+
+    def sync(self, symbol: str) -> int:
+        self._check_client()
+        from_id = self._first_from_id(symbol)
+        synced = 0
+        while(True):
+            trades = self._check_blocking(self.client.get_trade_page(
+                symbol=symbol.upper(), fromId=from_id, limit=self.page_limit))
+            synced += self.append(trades)
+            if len(trades) < self.page_limit:
+                break
+            from_id = trades[-1]['id'] + 1
+        return synced
+
+    def sync_symbols(self, symbols: list, max_workers: int = None) -> BatchResult:
+        # the number of new trades and errors are keyed by symbol
+        self._check_client()
+        outcomes = run_batch_concurrently(
+            [(self.sync, {'symbol': symbol}) for symbol in symbols],
+            max_workers or self.client.request_handler.pool_maxsize)
+        return BatchResult(symbols, outcomes)
+
+
+class AsyncTradeLedger(TradeLedger):
+    # the same ledger synced with an async client, the sqlite reads and
+    # writes stay blocking
+
+    async def sync(self, symbol: str) -> int:
+        self._check_client()
+        from_id = self._first_from_id(symbol)
+        synced = 0
+        while(True):
+            trades = await self.client.get_trade_page(symbol=symbol.upper(),
+                                                      fromId=from_id,
+                                                      limit=self.page_limit)
+            synced += self.append(trades)
+            if len(trades) < self.page_limit:
+                break
+            from_id = trades[-1]['id'] + 1
+        return synced
+
+    async def sync_symbols(self, symbols: list, max_workers: int = None) -> BatchResult:
+        self._check_client()
+        outcomes = await gather_batch_concurrently(
+            [(self.sync, {'symbol': symbol}) for symbol in symbols],
+            max_workers or self.client.request_handler.pool_maxsize)
+        return BatchResult(symbols, outcomes)
+
+
+if __name__ == '__main__':
+    pass
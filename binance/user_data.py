@@ -0,0 +1,245 @@
+from decimal import Decimal
+from typing import Callable
+from .api_def import OrderStatus
+from .exceptions import BinanceAPIError
+from .streams import StreamConnection, call_client
+import asyncio
+import threading
+
+
+SPOT = 'spot'
+MARGIN = 'margin'
+ISOLATED_MARGIN = 'isolated_margin'
+
+# order states after which an order is no longer open
+CLOSED_ORDER_STATUSES = (OrderStatus.FILLED, OrderStatus.CANCELED,
+                         OrderStatus.REJECTED, OrderStatus.EXPIRED)
+
+# error code returned when renewing a listenKey that no longer exists
+LISTEN_KEY_NOT_FOUND = -1125
+
+
+def execution_report_to_order(event: dict) -> dict:
+    # the same fields get_open_orders returns for an order
+    return {'symbol': event['s'],
+            'orderId': event['i'],
+            'orderListId': event['g'],
+            'clientOrderId': event['C'] or event['c'],
+            'price': event['p'],
+            'origQty': event['q'],
+            'executedQty': event['z'],
+            'cummulativeQuoteQty': event['Z'],
+            'status': event['X'],
+            'timeInForce': event['f'],
+            'type': event['o'],
+            'side': event['S'],
+            'stopPrice': event['P'],
+            'icebergQty': event['F'],
+            'time': event['O'],
+            'updateTime': event['T'],
+            'isWorking': event['w'],
+            'origQuoteOrderQty': event['Q']}
+
+
+class UserDataStream(object):
+    # keeps a listenKey alive and an in-memory cache of the open orders and
+    # balances of a spot, cross margin or isolated margin account, read
+    # without any network cost. The cache is loaded once and then kept up to
+    # date from the stream, after a reconnect the open orders and balances
+    # are reloaded. Events the reload already contains are dropped by the
+    # update times of the REST responses, never by the local clock
+
+    def __init__(self,
+                 client,
+                 account: str = SPOT,
+                 symbol: str = None,
+                 keepalive_interval: float = 30 * 60,
+                 stream_url: str = None,
+                 on_event: Callable = None):
+        if account not in (SPOT, MARGIN, ISOLATED_MARGIN):
+            raise ValueError('account has to be one of {}, {}, {}'.format(
+                SPOT, MARGIN, ISOLATED_MARGIN))
+        if (account == ISOLATED_MARGIN) and (symbol is None):
+            raise ValueError('an isolated margin user data stream needs a symbol')
+        self.client = client
+        self.account = account
+        self.symbol = symbol
+        self.keepalive_interval = keepalive_interval
+        self.on_event = on_event
+        self.listen_key = None
+        self.reconciles = 0
+        self.stream = StreamConnection(stream_url or client.API_URL.STREAM, [],
+                                       on_connect=self._on_connect)
+        self._open_orders = {}
+        self._balances = {}
+        self._balance_times = {}
+        self._balances_at = 0
+        self._lock = threading.Lock()
+        self._keepalive_task = None
+        self._loop = None
+        self._thread = None
+
+    def _listen_key_calls(self) -> tuple:
+        if self.account == SPOT:
+            return (self.client.create_listen_key, self.client.keepalive_listen_key, {})
+        if self.account == MARGIN:
+            return (self.client.create_margin_listen_key,
+                    self.client.keepalive_margin_listen_key, {})
+        return (self.client.create_isolated_margin_listen_key,
+                self.client.keepalive_isolated_margin_listen_key, {'symbol': self.symbol})
+
+    async def _create_listen_key(self) -> str:
+        create, _, kwargs = self._listen_key_calls()
+        response = await call_client(create, **kwargs)
+        self.listen_key = response['listenKey']
+        self.stream.streams = [self.listen_key]
+        return self.listen_key
+
+    async def _keepalive(self) -> None:
+        _, keepalive, kwargs = self._listen_key_calls()
+        while(True):
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await call_client(keepalive, listenKey=self.listen_key, **kwargs)
+            except BinanceAPIError as e:
+                if e.code != LISTEN_KEY_NOT_FOUND:
+                    continue
+                await self._create_listen_key()
+                await self.stream.reconnect()
+
+    async def _fetch_open_orders(self) -> list:
+        if self.account == SPOT:
+            return await call_client(self.client.get_open_orders)
+        if self.account == MARGIN:
+            return await call_client(self.client.query_margin_account_open_orders)
+        return await call_client(self.client.query_margin_account_open_orders,
+                                 symbol=self.symbol, isIsolated=True)
+
+    async def _fetch_balances(self) -> tuple:
+        # (balances, update time). The margin accounts have no update time,
+        # the server time taken before the request is a lower bound of it
+        if self.account == SPOT:
+            account = await call_client(self.client.get_account_info)
+            return account['balances'], account['updateTime']
+        updated_at = (await call_client(self.client.get_server_time))['serverTime']
+        if self.account == MARGIN:
+            account = await call_client(self.client.query_cross_margin_account_details)
+            return account['userAssets'], updated_at
+        account = await call_client(self.client.query_isolated_margin_account_info,
+                                    symbol=self.symbol)
+        assets = account['assets'][0]
+        return [assets['baseAsset'], assets['quoteAsset']], updated_at
+
+    async def reconcile_orders(self) -> None:
+        open_orders = await self._fetch_open_orders()
+        with self._lock:
+            self._open_orders = {order['orderId']: order for order in open_orders}
+        self.reconciles += 1
+
+    async def refresh_balances(self) -> None:
+        balances, updated_at = await self._fetch_balances()
+        with self._lock:
+            self._balances = {balance['asset']: dict(balance) for balance in balances}
+            self._balance_times = {}
+            self._balances_at = updated_at
+
+    async def _on_connect(self) -> None:
+        # the stream is connected before the cache is loaded, so no event
+        # between the cache snapshot and the stream can be missed, the events
+        # received meanwhile wait in the connection until the reload is done.
+        # Both open orders and balances are reloaded after a reconnect, the
+        # events of the outage are lost. The balances go first, an order
+        # missing from the later open orders and updated before the account
+        # was closed before the reload
+        await self.refresh_balances()
+        await self.reconcile_orders()
+
+    def _is_stale_order(self, order: dict) -> bool:
+        # older than the cached order, or than the reload for an order the
+        # reload did not find open
+        cached = self._open_orders.get(order['orderId'])
+        if cached is not None:
+            return order['updateTime'] < cached['updateTime']
+        return order['updateTime'] < self._balances_at
+
+    def _apply(self, event: dict) -> None:
+        event_type = event.get('e')
+        with self._lock:
+            if event_type == 'executionReport':
+                order = execution_report_to_order(event)
+                if self._is_stale_order(order):
+                    return
+                if order['status'] in CLOSED_ORDER_STATUSES:
+                    self._open_orders.pop(order['orderId'], None)
+                else:
+                    self._open_orders[order['orderId']] = order
+            elif event_type == 'outboundAccountPosition':
+                if event['u'] < self._balances_at:
+                    return
+                for balance in event['B']:
+                    cached = self._balances.setdefault(balance['a'], {'asset': balance['a']})
+                    cached['free'] = balance['f']
+                    cached['locked'] = balance['l']
+                    self._balance_times[balance['a']] = event['u']
+            elif event_type == 'balanceUpdate':
+                # the reload or a position update stamped later already
+                # contains the delta
+                if event['T'] > self._balance_times.get(event['a'], self._balances_at):
+                    cached = self._balances.setdefault(
+                        event['a'], {'asset': event['a'], 'free': '0', 'locked': '0'})
+                    cached['free'] = str(Decimal(cached['free']) + Decimal(event['d']))
+                    self._balance_times[event['a']] = event['T']
+
+    async def _handle_event(self, event: dict) -> None:
+        if event.get('e') == 'listenKeyExpired':
+            await self._create_listen_key()
+            await self.stream.reconnect()
+            return
+        self._apply(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def get_open_orders(self, symbol: str = None) -> list:
+        with self._lock:
+            return [dict(order) for order in self._open_orders.values()
+                    if (symbol is None) or (order['symbol'] == symbol.upper())]
+
+    def get_balance(self, asset: str) -> dict:
+        with self._lock:
+            balance = self._balances.get(asset.upper())
+            return None if balance is None else dict(balance)
+
+    @property
+    def balances(self) -> dict:
+        with self._lock:
+            return {asset: dict(balance) for asset, balance in self._balances.items()}
+
+    async def run(self) -> None:
+        await self._create_listen_key()
+        self._keepalive_task = asyncio.ensure_future(self._keepalive())
+        try:
+            async for _, event in self.stream.messages():
+                await self._handle_event(event)
+        finally:
+            self._keepalive_task.cancel()
+
+    async def close(self) -> None:
+        await self.stream.close()
+
+    def start(self) -> None:
+        # runs the stream on its own event loop in a daemon thread, for use
+        # with the blocking clients
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.run())
+            self._loop.close()
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if (self._loop is not None) and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.close(), self._loop)
+
+
+if __name__ == '__main__':
+    pass
@@ -1,10 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from  datetime import datetime
 from operator import itemgetter
-from typing import Union
+from typing import Callable, Iterator, Union
+import asyncio
 import dateparser
 import hashlib
 import hmac
 import pytz
+import warnings
 
 
 def create_sorted_list(data: dict) -> list:
@@ -12,6 +15,19 @@ def create_sorted_list(data: dict) -> list:
     data_list.sort(key=itemgetter(0))
     return data_list
 
+def rename_deprecated_param(params: dict, old: str, new: str) -> dict:
+    # moves the value of a renamed keyword argument to its new name and
+    # warns the caller, params are the locals() of the public method
+    value = params.pop(old, None)
+    if value is None:
+        return params
+    warnings.warn('{} is deprecated, use {} instead'.format(old, new),
+                  DeprecationWarning, stacklevel=3)
+    if params.get(new) is not None:
+        raise TypeError('both {} and the deprecated {} were passed'.format(new, old))
+    params[new] = value
+    return params
+
 def generate_signature(query_string: str, api_secret: str) -> str:
     h = hmac.new(api_secret.encode('utf-8'),
                  query_string.encode('utf-8'), hashlib.sha256)
@@ -46,3 +62,80 @@ def interval_to_ms(interval: str) -> int:
         'w': 60*60*24*7
     }
     return value * seconds_per_unit[unit] * 1000
+
+def run_concurrently(func: Callable, kwargs_list: list, max_workers: int = 10) -> list:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, **kwargs) for kwargs in kwargs_list]
+        return [future.result() for future in futures]
+
+
+def iter_concurrently(func: Callable, kwargs_list: list, max_workers: int = 10) -> Iterator:
+    # yields the results in the order of kwargs_list as soon as each one
+    # and all before it are done, while the later calls keep running. When
+    # the consumer stops early the calls not started yet are cancelled and
+    # the running ones are not waited for
+    # the futures are cancelled one by one, shutdown(cancel_futures=True)
+    # only exists from python 3.9 on
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = []
+    try:
+        futures = [executor.submit(func, **kwargs) for kwargs in kwargs_list]
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _call_collecting_error(func: Callable, kwargs: dict) -> tuple:
+    try:
+        return (func(**kwargs), None)
+    except Exception as e:
+        return (None, e)
+
+
+def run_batch_concurrently(calls: list, max_workers: int = 10) -> list:
+    # calls are (func, kwargs) pairs, a failing call returns its exception
+    # as (None, error) instead of aborting the other calls
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_call_collecting_error, func, kwargs)
+                   for func, kwargs in calls]
+        return [future.result() for future in futures]
+
+
+async def gather_batch_concurrently(calls: list, max_workers: int = 10) -> list:
+    # the coroutine counterpart of run_batch_concurrently
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def run(func, kwargs):
+        async with semaphore:
+            try:
+                return (await func(**kwargs), None)
+            except Exception as e:
+                return (None, e)
+    return await asyncio.gather(*[run(func, kwargs) for func, kwargs in calls])
+
+
+def raise_first_error(outcomes: list) -> list:
+    # the results of (result, error) pairs, for batches where any error
+    # fails the whole call like run_concurrently does
+    for _, error in outcomes:
+        if error is not None:
+            raise error
+    return [result for result, _ in outcomes]
+
+
+class BatchResult(object):
+    def __init__(self, keys: list, outcomes: list):
+        self.results = {}
+        self.errors = {}
+        for key, (result, error) in zip(keys, outcomes):
+            if error is None:
+                self.results[key] = result
+            else:
+                self.errors[key] = error
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
@@ -16,6 +16,10 @@ setup(
                           'ujson',
                           'dateparser',
                           'pytz'],
+        extras_require={'async': ['aiohttp'],
+                        'numpy': ['numpy'],
+                        'orjson': ['orjson'],
+                        'streams': ['websockets']},
         keywords='binance exchange rest api bitcoin ethereum btc eth neo',
         classifiers=[
                     'Intended Audience :: Developers',
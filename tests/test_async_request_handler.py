@@ -0,0 +1,147 @@
+import asyncio
+import unittest
+from collections.abc import Mapping
+from aiohttp import web
+from binance.async_request_handler import AsyncRequestHandler
+from binance.async_client import AsyncAuthenticatedClient, AsyncPublicClient
+from binance.exceptions import BinanceAPIError, BinanceResponseError
+from binance.exceptions import RequestHandlerError
+
+
+class TestAsyncRequestHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+
+    async def handler_ok(self, request):
+        self.requests.append(request)
+        return web.json_response({"msg": "testbody"})
+
+    async def handler_api_error(self, request):
+        return web.json_response({"msg": "Invalid binance api call",
+                                  "code": 1124}, status=404)
+
+    async def handler_faulty(self, request):
+        return web.Response(text="This is a faulty binance response")
+
+    async def handler_klines(self, request):
+        self.requests.append(request)
+        return web.json_response([[1, "1.0"], [2, "2.0"]])
+
+    def run_with_server(self, coro_func):
+        async def runner():
+            app = web.Application()
+            app.router.add_route('*', '/ok', self.handler_ok)
+            app.router.add_route('*', '/error', self.handler_api_error)
+            app.router.add_route('*', '/faulty', self.handler_faulty)
+            app.router.add_get('/api/v1/klines', self.handler_klines)
+            app_runner = web.AppRunner(app)
+            await app_runner.setup()
+            site = web.TCPSite(app_runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                return await coro_func('http://127.0.0.1:{}'.format(port))
+            finally:
+                await app_runner.cleanup()
+        return asyncio.run(runner())
+
+    def test_unauthenticated_attr(self):
+        req_handle = AsyncRequestHandler()
+        self.assertEqual(req_handle.authenticated, False)
+        self.assertEqual(req_handle.session, None)
+
+    def test_request_get(self):
+        async def test(base):
+            req_handle = AsyncRequestHandler()
+            response = await req_handle.get(base + '/ok', archived=False)
+            with self.assertRaises(RequestHandlerError):
+                await req_handle.get(base + '/ok', signed=True)
+            await req_handle.close()
+            return response
+        response = self.run_with_server(test)
+        self.assertTrue(isinstance(response, Mapping))
+        self.assertEqual(response, {"msg": "testbody"})
+        self.assertEqual(self.requests[0].headers.get('User-Agent'),
+                         'binance/python')
+        self.assertEqual(self.requests[0].query['archived'], 'False')
+
+    def test_request_signed_post(self):
+        async def test(base):
+            req_handle = AsyncRequestHandler('TestAPIKey', 'TestAPISecret')
+            response = await req_handle.post(base + '/ok', signed=True,
+                                             symbol='ETHBTC')
+            await req_handle.close()
+            return response
+        self.assertEqual(self.run_with_server(test), {"msg": "testbody"})
+        request = self.requests[0]
+        self.assertEqual(request.method, 'POST')
+        self.assertEqual(request.headers.get('X-MBX-APIKEY'), 'TestAPIKey')
+        self.assertEqual(request.query['symbol'], 'ETHBTC')
+        self.assertIn('timestamp', request.query)
+        self.assertIn('signature', request.query)
+
+    def test_request_binance_api_error(self):
+        async def test(base):
+            req_handle = AsyncRequestHandler('TestAPIKey', 'TestAPISecret')
+            try:
+                await req_handle.get(base + '/error')
+            finally:
+                await req_handle.close()
+        with self.assertRaises(BinanceAPIError) as cm:
+            self.run_with_server(test)
+        self.assertEqual(cm.exception.message, "Invalid binance api call")
+        self.assertEqual(cm.exception.code, 1124)
+
+    def test_request_binance_response_error(self):
+        async def test(base):
+            req_handle = AsyncRequestHandler()
+            try:
+                await req_handle.get(base + '/faulty')
+            finally:
+                await req_handle.close()
+        with self.assertRaises(BinanceResponseError) as cm:
+            self.run_with_server(test)
+        self.assertEqual(cm.exception.message,
+                         "Invalid Response: This is a faulty binance response")
+
+    def test_warm_up(self):
+        async def test(base):
+            req_handle = AsyncRequestHandler(pool_maxsize=3)
+            try:
+                await req_handle.warm_up(base + '/ok')
+                await req_handle.get(base + '/ok')
+                return req_handle.pool_stats()['https://']
+            finally:
+                await req_handle.close()
+        stats = self.run_with_server(test)
+        self.assertEqual(stats['requests'], 4)
+        self.assertEqual(stats['connections_opened'], 3)
+        self.assertEqual(stats['connections_reused'], 1)
+
+    def test_async_public_client(self):
+        async def test(base):
+            async with AsyncPublicClient() as client:
+                client.API_URL.DEFAULT = base + '/api'
+                return await client.get_klines('ETHBTC', '1m', limit=2)
+        self.assertEqual(self.run_with_server(test), [[1, "1.0"], [2, "2.0"]])
+        self.assertEqual(self.requests[0].query['symbol'], 'ETHBTC')
+
+    def test_async_client_iterators(self):
+        # the paging helpers of the async client are async iterators
+        async def test():
+            async with AsyncAuthenticatedClient('TestAPIKey', 'TestAPISecret') as client:
+                iterators = [client.iter_trade_list('ETHBTC'),
+                             client.iter_all_orders('ETHBTC'),
+                             client.iter_deposit_history_range(0, 1),
+                             client.iter_withdraw_history_range(0, 1),
+                             client.iter_margin_records('get_margin_interest_history'),
+                             client.iter_historical_klines('ETHBTC', '1m', 0)]
+                for iterator in iterators:
+                    self.assertTrue(hasattr(iterator, '__anext__'))
+                    await iterator.aclose()
+        asyncio.run(test())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+import unittest
+import httpretty
+from binance.client import PublicClient
+from binance.coalescer import AsyncRequestCoalescer, RequestCoalescer
+
+
+class TestCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        self.call_count = 0
+
+    def slow_call(self):
+        self.call_count += 1
+        time.sleep(0.1)
+        return {'price': '1.0'}
+
+    def test_single_flight(self):
+        coalescer = RequestCoalescer()
+        key = coalescer.make_key('uri', {'symbol': 'ETHBTC'})
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(coalescer.call(key, self.slow_call)))
+            for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.call_count, 1)
+        self.assertEqual(results, [{'price': '1.0'}] * 10)
+        # without a ttl finished requests are not reused
+        coalescer.call(key, self.slow_call)
+        self.assertEqual(self.call_count, 2)
+
+    def test_ttl_and_errors(self):
+        coalescer = RequestCoalescer(ttl=0.05)
+        coalescer.call('key', self.slow_call)
+        coalescer.call('key', self.slow_call)
+        self.assertEqual(self.call_count, 1)
+        time.sleep(0.06)
+        coalescer.call('key', self.slow_call)
+        self.assertEqual(self.call_count, 2)
+
+        def failing_call():
+            raise ValueError('failed')
+        with self.assertRaises(ValueError):
+            coalescer.call('error', failing_call)
+        self.assertEqual(coalescer.call('error', lambda: 'ok'), 'ok')
+
+    def test_async_single_flight(self):
+        async def slow_call():
+            self.call_count += 1
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def test():
+            coalescer = AsyncRequestCoalescer()
+            return await asyncio.gather(*[coalescer.call('key', slow_call)
+                                          for _ in range(5)])
+        self.assertEqual(asyncio.run(test()), ['result'] * 5)
+        self.assertEqual(self.call_count, 1)
+
+    def test_async_leader_cancelled(self):
+        async def slow_call():
+            self.call_count += 1
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def test():
+            coalescer = AsyncRequestCoalescer()
+            leader = asyncio.ensure_future(coalescer.call('key', slow_call))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(coalescer.call('key', slow_call))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter, leader.cancelled()
+        self.assertEqual(asyncio.run(test()), ('result', True))
+        self.assertEqual(self.call_count, 1)
+
+    @httpretty.activate
+    def test_ping_and_time_not_coalesced(self):
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/api/v1/ping",
+                               body='{}')
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/api/v1/time",
+                               body='{"serverTime": 1000000000000}')
+        client = PublicClient(coalesce_ttl=1)
+        client.warm_up(5)
+        self.assertEqual(len(httpretty.latest_requests()), 5)
+        client.start_clock_sync(samples=3).stop()
+        self.assertEqual(len(httpretty.latest_requests()), 8)
+
+    @httpretty.activate
+    def test_client_coalescing(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/ticker/price",
+                               body='[{"symbol": "ETHBTC", "price": "0.03"}]')
+        client = PublicClient(coalesce_ttl=60)
+        client.get_price_ticker()
+        client.get_price_ticker()
+        client.get_price_ticker(symbol='ETHBTC')
+        self.assertEqual(len(httpretty.latest_requests()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+import unittest
+import httpretty
+from binance.client import PublicClient
+from binance.exchange_info_cache import ExchangeInfoCache
+
+
+EXCHANGE_INFO = {
+    'rateLimits': [],
+    'symbols': [{'symbol': 'ETHBTC', 'baseAsset': 'ETH', 'quoteAsset': 'BTC'},
+                {'symbol': 'BNBBTC', 'baseAsset': 'BNB', 'quoteAsset': 'BTC'},
+                {'symbol': 'ETHUSDT', 'baseAsset': 'ETH', 'quoteAsset': 'USDT'}]
+}
+
+
+class TestExchangeInfoCache(unittest.TestCase):
+
+    def setUp(self):
+        self.fetch_count = 0
+
+    def fetch(self):
+        self.fetch_count += 1
+        time.sleep(0.05)
+        return EXCHANGE_INFO
+
+    def test_symbol_index(self):
+        cache = ExchangeInfoCache(self.fetch, ttl=60)
+        self.assertEqual(cache.get_symbol('ethbtc')['baseAsset'], 'ETH')
+        self.assertIsNone(cache.get_symbol('XRPBTC'))
+        self.assertEqual([s['symbol'] for s in cache.get_symbols_by_base_asset('ETH')],
+                         ['ETHBTC', 'ETHUSDT'])
+        self.assertEqual(len(cache.get_symbols_by_quote_asset('BTC')), 2)
+        self.assertEqual(self.fetch_count, 1)
+
+    def test_single_flight(self):
+        cache = ExchangeInfoCache(self.fetch, ttl=60)
+        threads = [threading.Thread(target=cache.get) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.fetch_count, 1)
+
+    def test_ttl_and_background_refresh(self):
+        cache = ExchangeInfoCache(self.fetch, ttl=60, background_refresh=False)
+        cache.get()
+        cache.invalidate()
+        cache.get()
+        self.assertEqual(self.fetch_count, 2)
+
+        cache = ExchangeInfoCache(self.fetch, ttl=60)
+        cache.get()
+        cache.invalidate()
+        self.assertEqual(cache.get(), EXCHANGE_INFO)
+        time.sleep(0.2)
+        self.assertEqual(self.fetch_count, 4)
+
+    @httpretty.activate
+    def test_client_get_symbol_info(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/exchangeInfo",
+                               body=json.dumps(EXCHANGE_INFO))
+        client = PublicClient(exchange_info_ttl=60)
+        self.assertEqual(client.get_symbol_info('ETHBTC')['quoteAsset'], 'BTC')
+        self.assertEqual(client.get_symbol_info('BNBBTC')['baseAsset'], 'BNB')
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
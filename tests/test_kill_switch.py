@@ -0,0 +1,90 @@
+import asyncio
+import json
+import unittest
+from requests.models import Response
+from binance.exceptions import BinanceAPIError
+from binance.kill_switch import AsyncKillSwitch, KillSwitch
+from binance.user_data import SPOT, MARGIN, ISOLATED_MARGIN
+
+
+def api_error(code, msg):
+    response = Response()
+    response.status_code = 400
+    response._content = json.dumps({'code': code, 'msg': msg}).encode()
+    return BinanceAPIError(response)
+
+
+class FakeRequestHandler(object):
+    pool_maxsize = 10
+
+
+class FakeClient(object):
+    request_handler = FakeRequestHandler()
+
+    def __init__(self):
+        self.cancelled = []
+
+    def get_open_orders(self):
+        return [{'symbol': 'ETHBTC', 'orderId': 1}, {'symbol': 'BNBBTC', 'orderId': 2},
+                {'symbol': 'ETHBTC', 'orderId': 3}]
+
+    def query_margin_account_open_orders(self):
+        raise api_error(-1003, 'Too many requests.')
+
+    def query_isolated_margin_account_info(self):
+        return {'assets': [{'symbol': 'LTCBTC'}, {'symbol': 'XRPBTC'}]}
+
+    def cancel_all_orders(self, symbol):
+        self.cancelled.append((SPOT, symbol))
+        return [{'symbol': symbol, 'status': 'CANCELED'}]
+
+    def cancel_all_margin_order(self, symbol, isIsolated):
+        self.cancelled.append((ISOLATED_MARGIN, symbol))
+        if symbol == 'XRPBTC':
+            raise api_error(-2011, 'Unknown order sent.')
+        return [{'symbol': symbol, 'status': 'CANCELED'}]
+
+
+class AsyncFakeClient(FakeClient):
+
+    def __getattribute__(self, name):
+        attr = super().__getattribute__(name)
+        if not name.startswith(('get_', 'query_', 'cancel_')):
+            return attr
+
+        async def call(**kwargs):
+            return attr(**kwargs)
+        return call
+
+
+class TestKillSwitch(unittest.TestCase):
+
+    def check_result(self, client, result):
+        self.assertEqual(sorted(client.cancelled),
+                         [(ISOLATED_MARGIN, 'LTCBTC'), (ISOLATED_MARGIN, 'XRPBTC'),
+                          (SPOT, 'BNBBTC'), (SPOT, 'ETHBTC')])
+        self.assertEqual(list(result.results), [(SPOT, 'ETHBTC'), (SPOT, 'BNBBTC'),
+                                                (ISOLATED_MARGIN, 'LTCBTC'),
+                                                (ISOLATED_MARGIN, 'XRPBTC')])
+        self.assertEqual(result.results[(ISOLATED_MARGIN, 'XRPBTC')], [])
+        self.assertEqual(list(result.errors), [(MARGIN, None)])
+        self.assertFalse(result.ok)
+        self.assertGreaterEqual(result.elapsed, 0)
+
+    def test_trigger(self):
+        client = FakeClient()
+        self.check_result(client, KillSwitch(client).trigger())
+
+    def test_async_trigger(self):
+        client = AsyncFakeClient()
+        self.check_result(client, asyncio.run(AsyncKillSwitch(client).trigger()))
+
+    def test_accounts(self):
+        client = FakeClient()
+        result = KillSwitch(client, margin=False, isolated_margin=False).trigger()
+        self.assertTrue(result.ok)
+        self.assertEqual(len(client.cancelled), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
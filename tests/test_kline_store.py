@@ -0,0 +1,93 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import unittest
+import httpretty
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from binance.client import PublicClient
+from binance.kline_store import AsyncKlineStore, KlineStore
+from binance.klines import klines_to_array
+
+
+ONE_MINUTE = 60 * 1000
+
+
+class TestKlineStore(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.last_open_time = 2499 * ONE_MINUTE
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def klines_callback(self, request, uri, response_headers):
+        self.calls += 1
+        query = parse_qs(urlparse(uri).query)
+        start = int(query['startTime'][0])
+        limit = int(query['limit'][0])
+        klines = [[open_time, "1.0", "2.0", "0.5", "1.5", "10.0",
+                   open_time + ONE_MINUTE - 1, "15.0", 3, "5.0", "7.5", "0"]
+                  for open_time in range(start, self.last_open_time + 1, ONE_MINUTE)]
+        return [200, response_headers, json.dumps(klines[:limit])]
+
+    @httpretty.activate
+    def test_sync_and_read(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/klines",
+                               body=self.klines_callback)
+        store = KlineStore(self.path, PublicClient())
+        self.assertIsNone(store.last_open_time('ETHBTC', '1m'))
+        self.assertEqual(store.sync('ETHBTC', '1m'), 2500)
+        self.assertEqual(store.last_open_time('ETHBTC', '1m'), 2499 * ONE_MINUTE)
+
+        self.last_open_time = 2599 * ONE_MINUTE
+        self.calls = 0
+        self.assertEqual(store.sync('ETHBTC', '1m'), 100)
+        self.assertEqual(self.calls, 1)
+
+        klines = store.read('ETHBTC', '1m', 10 * ONE_MINUTE, 19 * ONE_MINUTE)
+        self.assertEqual(len(klines), 10)
+        self.assertEqual(klines['open_time'][0], 10 * ONE_MINUTE)
+        self.assertTrue(isinstance(klines, np.memmap))
+        self.assertEqual(len(store.read('ETHBTC', '1m')), 2600)
+
+    def test_async_sync(self):
+        test = self
+
+        class FakeAsyncClient(object):
+            async def _get_earliest_valid_timestamp(self, symbol, interval):
+                return 0
+
+            async def get_klines(self, symbol, interval, startTime, limit, output_format):
+                klines = [[open_time, "1.0", "2.0", "0.5", "1.5", "10.0",
+                           open_time + ONE_MINUTE - 1, "15.0", 3, "5.0", "7.5", "0"]
+                          for open_time in range(startTime, test.last_open_time + 1,
+                                                 ONE_MINUTE)]
+                test.calls += 1
+                return klines_to_array(klines[:limit])
+
+        store = AsyncKlineStore(self.path, FakeAsyncClient())
+
+        async def sync():
+            # concurrent syncs of the same klines fetch them once, the
+            # second one only asks for newer klines
+            return await asyncio.gather(store.sync('ETHBTC', '1m'), store.sync('ETHBTC', '1m'))
+        self.assertEqual(sorted(asyncio.run(sync())), [0, 2500])
+        self.assertEqual(self.calls, 4)
+        self.assertEqual(store.last_open_time('ETHBTC', '1m'), 2499 * ONE_MINUTE)
+        with self.assertRaises(TypeError):
+            KlineStore(self.path, FakeAsyncClient()).sync('ETHBTC', '1m')
+
+    def test_read_empty(self):
+        store = KlineStore(self.path)
+        self.assertEqual(len(store.read('ETHBTC', '1h', 0, 100)), 0)
+        with self.assertRaises(ValueError):
+            store.sync('ETHBTC', '1h')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+import unittest
+import websockets
+from binance.client import AuthenticatedClient
+from binance.streams import MarketStreamClient
+from binance.ltv_monitor import LtvMonitor, LIQUIDATION, MARGIN_CALL, WARNING
+
+
+CONFIGS = [{'loanCoin': 'USDT', 'collateralCoin': 'BTC', 'rate': '0.65',
+            'marginCallCollateralRate': '0.9', 'liquidationCollateralRate': '1.0',
+            'currentCollateralRate': '0.4', 'interestRate': '0.0024',
+            'interestGracePeriod': '30'}]
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.calls = []
+        self.ltv = '0.4'
+
+    def cross_collateral_wallet(self):
+        self.calls.append('wallet')
+        return {'totalCrossCollateral': '50000', 'totalBorrowed': '20000',
+                'totalInterest': '0', 'interestFreeLimit': '100', 'asset': 'USDT',
+                'crossCollaterals': [{'loanCoin': 'USDT', 'collateralCoin': 'BTC',
+                                      'locked': '1.0', 'loanAmount': '19999.5',
+                                      'currentCollateralRate': self.ltv,
+                                      'interestFreeLimitUsed': '0',
+                                      'principalForInterest': '0', 'interest': '0.5'}]}
+
+    def cross_collateral_info(self):
+        self.calls.append('configs')
+        return CONFIGS
+
+
+class TestLtvMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.levels = []
+
+    def on_level(self, loan, level, previous):
+        self.levels.append((loan['collateralCoin'], level, previous))
+
+    def test_futures_endpoints(self):
+        client = AuthenticatedClient('TestAPIKey', 'TestAPISecret')
+        self.assertEqual(client._create_futures_api_uri('futures/loan/wallet'),
+                         'https://api.binance.com/sapi/v1/futures/loan/wallet')
+        self.assertEqual(client.FUTURES_TRANSFER_TYPE.SPOT_TO_USDT, 1)
+
+    def test_poll_and_ticker(self):
+        client = FakeClient()
+        monitor = LtvMonitor(client, min_interval=5, max_interval=305,
+                             on_level=self.on_level)
+        self.assertEqual(monitor.next_interval(), 305)
+        asyncio.run(monitor.poll())
+        self.assertEqual(monitor.get_loan('usdt', 'btc')['ltv'], 0.4)
+        self.assertEqual(monitor.next_interval(), 305)
+        self.assertEqual(self.levels, [])
+
+        monitor.on_ticker({'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '25000'})
+        self.assertEqual(monitor.get_loan('USDT', 'BTC')['ltv'], 0.8)
+        self.assertAlmostEqual(monitor.next_interval(), 125)
+        monitor.on_ticker([{'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '20000'}])
+        monitor.on_ticker([{'e': '24hrMiniTicker', 's': 'ETHUSDT', 'c': '2000'}])
+        self.assertEqual(monitor.next_interval(), 5)
+
+        client.ltv = '0.9'
+        asyncio.run(monitor.poll())
+        self.assertEqual(self.levels, [('BTC', WARNING, None),
+                                       ('BTC', LIQUIDATION, WARNING),
+                                       ('BTC', MARGIN_CALL, LIQUIDATION)])
+        self.assertEqual(client.calls, ['wallet', 'configs', 'wallet'])
+
+    def test_run_wakes_on_rising_level(self):
+        client = FakeClient()
+        monitor = LtvMonitor(client, min_interval=0.01, max_interval=60)
+
+        async def run():
+            task = asyncio.ensure_future(monitor.run())
+            while monitor.polls < 1:
+                await asyncio.sleep(0.01)
+            # a falling price only changes the local estimate
+            monitor.on_ticker({'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '60000'})
+            await asyncio.sleep(0.1)
+            self.assertEqual(monitor.polls, 1)
+            monitor.on_ticker({'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '21000'})
+            while monitor.polls < 2:
+                await asyncio.sleep(0.01)
+            await monitor.close()
+            await asyncio.wait_for(task, 1)
+        asyncio.run(run())
+        self.assertEqual(client.calls, ['wallet', 'configs', 'wallet'])
+
+    def test_stop_before_loop_runs(self):
+        monitor = LtvMonitor(FakeClient(), min_interval=0.01, max_interval=60)
+        monitor.start()
+        monitor.stop()
+        monitor._thread.join(2)
+        self.assertFalse(monitor._thread.is_alive())
+        # a started monitor is stopped while it waits for the next poll
+        monitor.start()
+        for _ in range(100):
+            if monitor.polls:
+                break
+            time.sleep(0.01)
+        monitor.stop()
+        monitor._thread.join(2)
+        self.assertFalse(monitor._thread.is_alive())
+        self.assertGreaterEqual(monitor.polls, 1)
+
+    def test_ticks_from_stream(self):
+        # ticks reach the monitor through the !miniTicker@arr stream
+        async def server_handler(websocket):
+            await websocket.send(json.dumps({'stream': '!miniTicker@arr', 'data': [
+                {'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '25000'}]}))
+            await websocket.wait_closed()
+
+        monitor = LtvMonitor(FakeClient(), on_level=self.on_level)
+        asyncio.run(monitor.poll())
+
+        async def test():
+            async with websockets.serve(server_handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                streams = MarketStreamClient(stream_url='ws://127.0.0.1:{}'.format(port))
+                monitor.subscribe(streams)
+                task = asyncio.ensure_future(streams.run())
+                for _ in range(100):
+                    if self.levels:
+                        break
+                    await asyncio.sleep(0.02)
+                await streams.close()
+                await task
+        asyncio.run(test())
+        self.assertEqual(self.levels, [('BTC', WARNING, None)])
+        self.assertEqual(monitor.get_loan('USDT', 'BTC')['ltv'], 0.8)
+
+    def test_failed_poll(self):
+        client = FakeClient()
+        client.cross_collateral_wallet = lambda: {}
+        monitor = LtvMonitor(client, min_interval=0.01, max_interval=60)
+
+        async def run():
+            task = asyncio.ensure_future(monitor.run())
+            while monitor.last_error is None:
+                await asyncio.sleep(0.01)
+            await monitor.close()
+            await asyncio.wait_for(task, 1)
+        asyncio.run(run())
+        self.assertIsInstance(monitor.last_error, KeyError)
+        self.assertEqual(monitor.polls, 0)
+        with self.assertRaises(ValueError):
+            LtvMonitor(client, min_interval=10, max_interval=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
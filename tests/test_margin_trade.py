@@ -0,0 +1,86 @@
+import asyncio
+import json
+import unittest
+import httpretty
+from urllib.parse import urlparse, parse_qs
+from binance.async_client import AsyncAuthenticatedClient
+from binance.client import AuthenticatedClient
+
+
+TOTALS = {'BTC': 250, 'ETH': 30, 'BNB': 0}
+
+
+def interest_page(asset, current, size, **params):
+    rows = [{'asset': asset, 'txId': i, 'interest': '0.01'}
+            for i in range((current - 1) * size, min(current * size, TOTALS[asset]))]
+    return {'rows': rows, 'total': TOTALS[asset]}
+
+
+class TestMarginTrade(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+
+    def interest_callback(self, request, uri, response_headers):
+        query = {k: v[0] for k, v in parse_qs(urlparse(uri).query).items()}
+        self.requests.append(query)
+        return [200, response_headers, json.dumps(interest_page(
+            query['asset'], int(query['current']), int(query['size'])))]
+
+    def expected_rows(self, assets):
+        return [row for asset in assets
+                for row in interest_page(asset, 1, TOTALS[asset] or 1)['rows']]
+
+    @httpretty.activate
+    def test_margin_records(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/sapi/v1/margin/interestHistory",
+                               body=self.interest_callback)
+        client = AuthenticatedClient('TestAPIKey', 'TestAPISecret')
+        assets = ['BTC', 'ETH', 'BNB']
+        rows = client.get_margin_records('get_margin_interest_history',
+                                         [{'asset': asset} for asset in assets],
+                                         startTime=1000, endTime=2000)
+        self.assertEqual(rows, self.expected_rows(assets))
+        # three first pages and two more pages of BTC
+        self.assertEqual(len(self.requests), 5)
+        self.assertTrue(all(query['endTime'] == '2000' for query in self.requests))
+        with self.assertRaises(ValueError):
+            client.get_margin_records('query_margin_account_open_orders')
+        # paging keys of a query or of the keyword arguments are replaced
+        self.requests = []
+        rows = client.get_margin_records('get_margin_interest_history',
+                                         [{'asset': 'ETH', 'current': 3, 'size': 5}],
+                                         size=7)
+        self.assertEqual(rows, self.expected_rows(['ETH']))
+        self.assertEqual([(query['current'], query['size']) for query in self.requests],
+                         [('1', '100')])
+
+    @httpretty.activate
+    def test_isolated_margin_account_symbols(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/sapi/v1/margin/isolated/account",
+                               body='{"assets": []}')
+        client = AuthenticatedClient('TestAPIKey', 'TestAPISecret')
+        client.query_isolated_margin_account_info('ETHBTC')
+        query = parse_qs(urlparse(httpretty.last_request().path).query)
+        self.assertEqual(query['symbols'], ['ETHBTC'])
+        self.assertNotIn('symbol', query)
+        client.query_isolated_margin_account_info()
+        query = parse_qs(urlparse(httpretty.last_request().path).query)
+        self.assertNotIn('symbols', query)
+
+    def test_async_margin_records(self):
+        async def get_margin_interest_history(**params):
+            return interest_page(**params)
+
+        async def get_async():
+            async with AsyncAuthenticatedClient('TestAPIKey', 'TestAPISecret') as client:
+                client.get_margin_interest_history = get_margin_interest_history
+                return await client.get_margin_records('get_margin_interest_history',
+                                                       [{'asset': 'ETH'}, {'asset': 'BTC'}])
+        self.assertEqual(asyncio.run(get_async()), self.expected_rows(['ETH', 'BTC']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import json
+import unittest
+import httpretty
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from binance.client import PublicClient
+from binance.klines import KLINE_DTYPE, klines_to_array
+
+
+ONE_MINUTE = 60 * 1000
+
+
+class TestMarketData(unittest.TestCase):
+
+    def klines_callback(self, request, uri, response_headers):
+        query = parse_qs(urlparse(uri).query)
+        start = -(-int(query['startTime'][0]) // ONE_MINUTE) * ONE_MINUTE
+        limit = int(query['limit'][0])
+        end = int(query['endTime'][0]) if 'endTime' in query else start + limit * ONE_MINUTE
+        end = min(end, self.last_open_time)
+        klines = [[open_time, "1.0", "2.0", "0.5", "1.5", "10.0",
+                   open_time + ONE_MINUTE - 1, "15.0", 3, "5.0", "7.5", "0"]
+                  for open_time in range(start, end + 1, ONE_MINUTE)][:limit]
+        return [200, response_headers, json.dumps(klines)]
+
+    def test_kline_windows(self):
+        windows = PublicClient._get_kline_windows('ETHBTC', '1m', 0,
+                                                  2500 * ONE_MINUTE - 1)
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(windows[0]['startTime'], 0)
+        self.assertEqual(windows[0]['endTime'], 1000 * ONE_MINUTE - 1)
+        self.assertEqual(windows[2]['endTime'], 2500 * ONE_MINUTE - 1)
+        self.assertEqual(windows[1]['limit'], 1000)
+
+    def test_merge_kline_pages(self):
+        pages = [[[1], [2], [3]], [[3], [4]], [], [[5]]]
+        self.assertEqual(PublicClient._merge_kline_pages(pages),
+                         [[1], [2], [3], [4], [5]])
+
+    @httpretty.activate
+    def test_historical_klines_concurrent(self):
+        self.last_open_time = 2999 * ONE_MINUTE
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/klines",
+                               body=self.klines_callback)
+        client = PublicClient()
+        sequential = client.get_historical_klines('ETHBTC', '1m', 0,
+                                                  2999 * ONE_MINUTE)
+        concurrent = client.get_historical_klines('ETHBTC', '1m', 0,
+                                                  2999 * ONE_MINUTE,
+                                                  max_workers=4)
+        self.assertEqual(len(concurrent), 3000)
+        self.assertEqual(concurrent, sequential)
+
+    @httpretty.activate
+    def test_iter_historical_klines(self):
+        self.last_open_time = 1199 * ONE_MINUTE
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/klines",
+                               body=self.klines_callback)
+        client = PublicClient()
+        pages = list(client.iter_historical_klines('ETHBTC', '1m', 0))
+        self.assertEqual([len(page) for page in pages], [500, 500, 200])
+        # resuming from the last yielded open time continues the iteration
+        cursor = pages[0][-1][0] + 1
+        resumed = list(client.iter_historical_klines('ETHBTC', '1m', cursor))
+        self.assertEqual(resumed[0][0], pages[1][0])
+        self.assertEqual(sum(len(page) for page in resumed), 700)
+
+    def test_klines_to_array(self):
+        klines = [[1000, "1.5", "2.5", "0.5", "1.0", "100.25", 1999,
+                   "150.0", 12, "40.0", "60.0", "0"]]
+        array = klines_to_array(klines)
+        self.assertEqual(array.dtype, KLINE_DTYPE)
+        self.assertEqual(array['open_time'][0], 1000)
+        self.assertEqual(array['volume'][0], 100.25)
+        self.assertEqual(array['trades'].dtype, np.int32)
+        self.assertEqual(array['trades'][0], 12)
+        self.assertEqual(len(klines_to_array([])), 0)
+
+    @httpretty.activate
+    def test_historical_klines_columns(self):
+        self.last_open_time = 1499 * ONE_MINUTE
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/klines",
+                               body=self.klines_callback)
+        client = PublicClient()
+        array = client.get_historical_klines('ETHBTC', '1m', 0,
+                                             output_format='numpy')
+        columns = client.get_historical_klines('ETHBTC', '1m', 0,
+                                               1499 * ONE_MINUTE,
+                                               max_workers=2,
+                                               output_format='columns')
+        self.assertEqual(len(array), 1500)
+        self.assertTrue(np.all(np.diff(array['open_time']) == ONE_MINUTE))
+        self.assertTrue(np.array_equal(columns['close'], array['close']))
+        self.assertTrue(columns['open_time'].flags['C_CONTIGUOUS'])
+        with self.assertRaises(ValueError):
+            client.get_klines('ETHBTC', '1m', startTime=0, limit=5,
+                              output_format='pandas')
+
+    @httpretty.activate
+    def test_map_symbols(self):
+        def avg_price_callback(request, uri, response_headers):
+            symbol = parse_qs(urlparse(uri).query)['symbol'][0]
+            if symbol == 'BADSYM':
+                return [400, response_headers,
+                        json.dumps({'code': -1121, 'msg': 'Invalid symbol.'})]
+            return [200, response_headers, json.dumps({'mins': 5, 'price': symbol})]
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v3/avgPrice",
+                               body=avg_price_callback)
+        client = PublicClient()
+        symbols = ['SYM{}'.format(i) for i in range(20)] + ['BADSYM']
+        batch = client.map_symbols('get_avg_price', symbols, max_workers=5)
+        self.assertFalse(batch.ok)
+        self.assertEqual(len(batch.results), 20)
+        self.assertEqual(batch.results['SYM7']['price'], 'SYM7')
+        self.assertEqual(batch.errors['BADSYM'].code, -1121)
+        batch = client.run_batch([('get_avg_price', {'symbol': 'SYM1'}),
+                                  ('get_avg_price', {'symbol': 'BADSYM'})])
+        self.assertEqual(list(batch.results), [0])
+        self.assertEqual(list(batch.errors), [1])
+        with self.assertRaises(ValueError):
+            client.run_batch([('_get_exchange_info', {})])
+
+    @httpretty.activate
+    def test_agg_trades_deprecated_form_id(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/aggTrades",
+                               body='[]')
+        client = PublicClient()
+        with self.assertWarns(DeprecationWarning):
+            client.get_agg_trades('ETHBTC', formId=7)
+        query = parse_qs(urlparse(httpretty.last_request().path).query)
+        self.assertEqual(query['fromId'], ['7'])
+        self.assertNotIn('formId', query)
+        client.get_agg_trades('ETHBTC', 8)
+        query = parse_qs(urlparse(httpretty.last_request().path).query)
+        self.assertEqual(query['fromId'], ['8'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import random
+import unittest
+import websockets
+from binance.exceptions import OrderBookError
+from binance.order_book import ASKS, BIDS, OrderBook, OrderBookManager, OrderBookSide
+
+
+SNAPSHOT = {'lastUpdateId': 100,
+            'bids': [['0.0310', '2.0'], ['0.0300', '5.0'], ['0.0320', '1.0']],
+            'asks': [['0.0330', '1.5'], ['0.0350', '4.0'], ['0.0340', '2.5']]}
+
+
+def depth_event(first_id, last_id, bids=(), asks=()):
+    return {'e': 'depthUpdate', 'E': last_id, 's': 'ETHBTC', 'U': first_id,
+            'u': last_id, 'b': list(bids), 'a': list(asks)}
+
+
+class FakeClient(object):
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+        self.calls = 0
+
+    def get_order_book(self, symbol, limit=100):
+        self.calls += 1
+        snapshot = self.snapshots.pop(0)
+        if isinstance(snapshot, BaseException):
+            raise snapshot
+        return snapshot
+
+
+class TestOrderBook(unittest.TestCase):
+
+    def setUp(self):
+        self.book = OrderBook('ethbtc')
+        self.book.apply_snapshot(SNAPSHOT)
+
+    def test_queries(self):
+        self.assertEqual(self.book.best_bid(), (0.032, 1.0))
+        self.assertEqual(self.book.best_ask(), (0.033, 1.5))
+        self.assertAlmostEqual(self.book.mid_price(), 0.0325)
+        self.assertEqual(self.book.get_quantity(BIDS, 0.031), 2.0)
+        self.assertEqual(self.book.get_quantity(ASKS, 0.031), 0.0)
+        self.assertEqual(self.book.cumulative_volume(BIDS, 0.031), 3.0)
+        self.assertEqual(self.book.cumulative_volume(ASKS, 0.0345), 4.0)
+        self.assertEqual(self.book.cumulative_volume(ASKS, 0.0320), 0.0)
+        self.assertEqual(self.book.price_for_volume(ASKS, 3.0), 0.034)
+        self.assertIsNone(self.book.price_for_volume(ASKS, 100.0))
+        self.assertEqual(self.book.get_depth(2)[BIDS], [(0.032, 1.0), (0.031, 2.0)])
+
+    def test_apply_diff(self):
+        self.assertFalse(self.book.apply_diff(depth_event(95, 100)))
+        self.assertTrue(self.book.apply_diff(depth_event(
+            99, 102, bids=[['0.0320', '0'], ['0.0315', '3.0']], asks=[['0.0330', '0.5']])))
+        self.assertEqual(self.book.best_bid(), (0.0315, 3.0))
+        self.assertEqual(self.book.best_ask(), (0.033, 0.5))
+        self.assertEqual(self.book.cumulative_volume(BIDS, 0.031), 5.0)
+        with self.assertRaises(OrderBookError):
+            self.book.apply_diff(depth_event(104, 105))
+        self.assertEqual(self.book.last_update_id, 102)
+
+    def test_side_against_sorted_levels(self):
+        rng = random.Random(7)
+        side = OrderBookSide(descending=True)
+        levels = {}
+        for _ in range(2000):
+            price = rng.randint(1, 200) / 100
+            quantity = rng.choice([0, 0, rng.randint(1, 50) / 10])
+            side.update(price, quantity)
+            if quantity:
+                levels[price] = quantity
+            else:
+                levels.pop(price, None)
+        expected = sorted(levels.items(), reverse=True)
+        self.assertEqual(side.levels(), expected)
+        self.assertEqual(side.levels(5), expected[:5])
+        self.assertEqual(side.best(), expected[0])
+        self.assertEqual(len(side), len(expected))
+        cumulative = 0.0
+        for price, quantity in expected:
+            cumulative += quantity
+            self.assertAlmostEqual(side.cumulative_volume(price), cumulative)
+            self.assertEqual(side.price_for_volume(cumulative - quantity / 2), price)
+        self.assertIsNone(side.price_for_volume(cumulative + 1))
+
+
+class TestOrderBookManager(unittest.TestCase):
+
+    def test_snapshot_applied_on_arrival(self):
+        # the first snapshot request is cancelled, the second one is applied
+        # without waiting for another depth event
+        client = FakeClient([asyncio.CancelledError(), SNAPSHOT])
+
+        async def test():
+            manager = OrderBookManager(client, 'ETHBTC', stream_url='ws://127.0.0.1:1',
+                                       snapshot_backoff=0.01)
+            manager._process(depth_event(99, 101, bids=[['0.0320', '4.0']]))
+            await manager.wait_synced(1)
+            return manager
+        manager = asyncio.run(test())
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(manager.book.last_update_id, 101)
+        self.assertEqual(manager.book.best_bid(), (0.032, 4.0))
+
+    def test_snapshot_backoff(self):
+        # failed snapshot requests are repeated after a growing delay
+        client = FakeClient([ValueError('first'), ValueError('second'), SNAPSHOT])
+
+        async def test():
+            manager = OrderBookManager(client, 'ETHBTC', stream_url='ws://127.0.0.1:1',
+                                       snapshot_backoff=0.1)
+            self.assertEqual(manager._snapshot_delay(0), 0)
+            loop = asyncio.get_event_loop()
+            # waiting before run() or the first event is allowed
+            waiter = asyncio.ensure_future(manager.wait_synced(2))
+            start = loop.time()
+            manager._process(depth_event(99, 101))
+            await asyncio.sleep(0.01)
+            self.assertEqual(client.calls, 1)
+            self.assertEqual(str(manager.last_error), 'first')
+            await waiter
+            return manager, loop.time() - start
+        manager, elapsed = asyncio.run(test())
+        self.assertEqual(client.calls, 3)
+        # at least half of 0.1 and of 0.2 seconds
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertEqual(manager._snapshot_failures, 0)
+        self.assertEqual(manager.book.last_update_id, 101)
+
+    def test_stream_sync_and_resync(self):
+        events = [depth_event(95, 100),
+                  depth_event(101, 103, bids=[['0.0320', '0']]),
+                  depth_event(104, 105, asks=[['0.0330', '3.0']]),
+                  # events 106 to 109 are lost, the book has to resync
+                  depth_event(110, 112, bids=[['0.0330', '0.1']]),
+                  depth_event(113, 113, asks=[['0.0350', '0']])]
+        resync_snapshot = {'lastUpdateId': 111,
+                           'bids': [['0.0300', '1.0']],
+                           'asks': [['0.0340', '1.0'], ['0.0350', '1.0']]}
+        client = FakeClient([SNAPSHOT, resync_snapshot])
+
+        async def server_handler(websocket):
+            for event in events:
+                await websocket.send(json.dumps({'stream': 'ethbtc@depth@100ms',
+                                                 'data': event}))
+                await asyncio.sleep(0.05)
+            await websocket.wait_closed()
+
+        async def test():
+            async with websockets.serve(server_handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                manager = OrderBookManager(client, 'ETHBTC',
+                                           stream_url='ws://127.0.0.1:{}'.format(port))
+                task = asyncio.ensure_future(manager.run())
+                for _ in range(100):
+                    if manager.book.last_update_id == 113:
+                        break
+                    await asyncio.sleep(0.02)
+                await manager.close()
+                await task
+                return manager
+        manager = asyncio.run(test())
+        self.assertEqual(manager.book.last_update_id, 113)
+        self.assertEqual(manager.resyncs, 1)
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(manager.book.best_bid(), (0.033, 0.1))
+        self.assertEqual(manager.book.get_depth()[ASKS], [(0.034, 1.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+from decimal import Decimal
+import numpy as np
+from binance.exceptions import OrderFilterError
+from binance.order_filters import SymbolFilters
+
+
+SYMBOL_INFO = {
+    'symbol': 'ETHBTC',
+    'filters': [
+        {'filterType': 'PRICE_FILTER', 'minPrice': '0.00000100',
+         'maxPrice': '100000.00000000', 'tickSize': '0.00000100'},
+        {'filterType': 'PERCENT_PRICE', 'multiplierUp': '5',
+         'multiplierDown': '0.2', 'avgPriceMins': 5},
+        {'filterType': 'LOT_SIZE', 'minQty': '0.00100000',
+         'maxQty': '100000.00000000', 'stepSize': '0.00100000'},
+        {'filterType': 'MIN_NOTIONAL', 'minNotional': '0.00010000',
+         'applyToMarket': True, 'avgPriceMins': 5},
+        {'filterType': 'MARKET_LOT_SIZE', 'minQty': '0.00000000',
+         'maxQty': '1000.00000000', 'stepSize': '0.00000000'},
+    ]
+}
+
+
+class TestOrderFilters(unittest.TestCase):
+
+    def setUp(self):
+        self.filters = SymbolFilters.from_symbol_info(SYMBOL_INFO)
+
+    def test_round_price(self):
+        self.assertEqual(self.filters.round_price(0.0345678), Decimal('0.034567'))
+        self.assertEqual(self.filters.round_price('0.0345678', 'up'),
+                         Decimal('0.034568'))
+        self.assertEqual(self.filters.round_price('0.0345674', 'nearest'),
+                         Decimal('0.034567'))
+        self.assertEqual(self.filters.round_price('0.034567'), Decimal('0.034567'))
+
+    def test_round_quantity(self):
+        self.assertEqual(self.filters.round_quantity(1.23456), Decimal('1.234'))
+        self.assertEqual(self.filters.round_quantity('0.0019', rounding='up'),
+                         Decimal('0.002'))
+        # market lot size is disabled, the market order falls back to LOT_SIZE
+        self.assertEqual(self.filters.round_quantity(1.23456, type='MARKET'),
+                         Decimal('1.234'))
+
+    def test_validate(self):
+        self.filters.validate(quantity='1.234', price='0.034567')
+        errors = self.filters.check(quantity='1.2345', price='0.0345675')
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(len(self.filters.check(quantity='0.001', price='0.000001')), 1)
+        self.assertEqual(len(self.filters.check(quantity='1', price='0.5',
+                                                avg_price='0.05')), 1)
+        with self.assertRaises(OrderFilterError) as cm:
+            self.filters.validate(quantity='0.0001', price='0.034567')
+        self.assertIn('below the minimum', cm.exception.message)
+
+    def test_batch(self):
+        prices = np.array([0.0345678, 0.034567, 0.0000001])
+        quantities = np.array([1.23456, 1.234, 0.5])
+        valid = self.filters.check_batch(prices, quantities)
+        self.assertEqual(valid.tolist(), [False, True, False])
+        rounded_prices, rounded_quantities = self.filters.round_batch(prices, quantities)
+        self.assertTrue(np.allclose(rounded_prices, [0.034567, 0.034567, 0.0]))
+        self.assertTrue(np.allclose(rounded_quantities, [1.234, 1.234, 0.5]))
+        self.assertEqual(self.filters.check_batch(rounded_prices[:2],
+                                                  rounded_quantities[:2]).tolist(),
+                         [True, True])
+
+    def test_batch_exact_units(self):
+        filters = SymbolFilters('TEST', [
+            {'filterType': 'PRICE_FILTER', 'minPrice': '0.1',
+             'maxPrice': '1000', 'tickSize': '0.1'},
+            {'filterType': 'LOT_SIZE', 'minQty': '0.1', 'maxQty': '1000',
+             'stepSize': '0.1'}])
+        values = np.array([0.3, 0.7, 2.3, 0.1 + 0.2, 4.35])
+        self.assertEqual(filters.price_filter.snap_array(values).tolist(),
+                         [3, 7, 23, 3, 43])
+        self.assertEqual(filters.price_filter.snap_array(values, 'up').tolist(),
+                         [3, 7, 23, 3, 44])
+        self.assertEqual(filters.price_filter.check_array(values).tolist(),
+                         [True, True, True, True, False])
+        expected = [filters.lot_size.check(value) is None for value in ['0.3', '0.30001']]
+        self.assertEqual(filters.lot_size.check_array([0.3, 0.30001]).tolist(), expected)
+
+    def test_batch_market_notional(self):
+        quantities = np.array([0.001, 1.0])
+        # market orders use the average price for the notional
+        self.assertEqual(self.filters.check_batch(None, quantities, type='MARKET',
+                                                  avg_price=0.05).tolist(),
+                         [False, True])
+        self.assertNotEqual(self.filters.check(quantity='0.001', type='MARKET',
+                                               avg_price='0.05'), [])
+        not_to_market = SymbolFilters('ETHBTC', SYMBOL_INFO['filters'][:3] + [
+            dict(SYMBOL_INFO['filters'][3], applyToMarket=False)])
+        self.assertEqual(not_to_market.check_batch(None, quantities, type='MARKET',
+                                                   avg_price=0.05).tolist(),
+                         [True, True])
+        self.assertEqual(not_to_market.check(quantity='0.001', type='MARKET',
+                                             avg_price='0.05'), [])
+        # without an average price the notional of market orders is not checked
+        self.assertEqual(self.filters.check_batch(None, quantities,
+                                                  type='MARKET').tolist(), [True, True])
+
+    def test_batch_exact_boundaries(self):
+        filters = SymbolFilters('TEST', [
+            {'filterType': 'PRICE_FILTER', 'minPrice': '0.01',
+             'maxPrice': '1000', 'tickSize': '0.01'},
+            {'filterType': 'PERCENT_PRICE', 'multiplierUp': '3',
+             'multiplierDown': '0.2', 'avgPriceMins': 5},
+            {'filterType': 'LOT_SIZE', 'minQty': '0.1', 'maxQty': '1000',
+             'stepSize': '0.1'},
+            {'filterType': 'NOTIONAL', 'minNotional': '0.029',
+             'applyMinToMarket': True, 'maxNotional': '0.21'}])
+        # 0.1 x 0.29 is below 0.029 and 0.7 x 3 above 2.1 in floats
+        cases = [('0.1', '0.29', None), ('0.7', '0.3', None),
+                 ('0.1', '2.1', '0.7'), ('2', '0.02', '0.1'),
+                 ('0.1', '0.28', None), ('0.1', '2.11', '0.7'), ('0.2', '1.1', None)]
+        expected = [filters.check(quantity, price, avg_price=avg_price) == []
+                    for quantity, price, avg_price in cases]
+        self.assertEqual(expected, [True, True, True, True, False, False, False])
+        for (quantity, price, avg_price), valid in zip(cases, expected):
+            self.assertEqual(filters.check_batch([float(price)], [float(quantity)],
+                                                 avg_price=avg_price).tolist(),
+                             [valid], (quantity, price, avg_price))
+        self.assertEqual(filters.check_batch(None, [0.1, 1.0], type='MARKET',
+                                             avg_price=0.29).tolist(), [True, False])
+
+    def test_batch_large_notional(self):
+        # notional units beyond int64 are compared as Python ints
+        filters = SymbolFilters('TEST', [
+            {'filterType': 'PRICE_FILTER', 'minPrice': '0.00000001',
+             'maxPrice': '10000000', 'tickSize': '0.00000001'},
+            {'filterType': 'LOT_SIZE', 'minQty': '0.00000001', 'maxQty': '90000000',
+             'stepSize': '0.00000001'},
+            {'filterType': 'NOTIONAL', 'minNotional': '10',
+             'applyMinToMarket': True, 'maxNotional': '9000000000'}])
+        valid = filters.check_batch([3000000.0, 3000000.0, 0.00000001],
+                                    [3000.0, 3000.00000001, 0.5])
+        self.assertEqual(valid.tolist(), [True, False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
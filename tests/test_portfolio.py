@@ -0,0 +1,148 @@
+import asyncio
+import json
+import unittest
+import numpy as np
+import websockets
+from binance.portfolio import AsyncPortfolioValuation, PortfolioValuation, PriceGraph
+from binance.streams import MarketStreamClient
+from binance.user_data import SPOT, MARGIN, ISOLATED_MARGIN
+
+
+SYMBOLS = [{'symbol': 'BTCUSDT', 'baseAsset': 'BTC', 'quoteAsset': 'USDT'},
+           {'symbol': 'ETHBTC', 'baseAsset': 'ETH', 'quoteAsset': 'BTC'},
+           {'symbol': 'BNBBUSD', 'baseAsset': 'BNB', 'quoteAsset': 'BUSD'},
+           {'symbol': 'USDTBUSD', 'baseAsset': 'USDT', 'quoteAsset': 'BUSD'}]
+TICKERS = [{'symbol': 'BTCUSDT', 'price': '50000.0'},
+           {'symbol': 'ETHBTC', 'price': '0.05'},
+           {'symbol': 'BNBBUSD', 'price': '400.0'},
+           {'symbol': 'USDTBUSD', 'price': '1.0'}]
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.calls = []
+
+    def get_exchange_info(self):
+        self.calls.append('exchangeInfo')
+        return {'symbols': SYMBOLS}
+
+    def get_price_ticker(self):
+        self.calls.append('ticker/price')
+        return TICKERS
+
+    def get_account_info(self):
+        return {'balances': [{'asset': 'BTC', 'free': '1.0', 'locked': '0.5'},
+                             {'asset': 'XYZ', 'free': '10.0', 'locked': '0'},
+                             {'asset': 'LTC', 'free': '0', 'locked': '0'}]}
+
+    def query_cross_margin_account_details(self):
+        return {'userAssets': [{'asset': 'ETH', 'netAsset': '2.0'},
+                               {'asset': 'USDT', 'netAsset': '-1000.0'}]}
+
+    def query_isolated_margin_account_info(self):
+        return {'assets': [{'symbol': 'BNBBUSD',
+                            'baseAsset': {'asset': 'BNB', 'netAsset': '1.0'},
+                            'quoteAsset': {'asset': 'BUSD', 'netAsset': '100.0'}}]}
+
+
+class AsyncFakeClient(FakeClient):
+
+    def __getattribute__(self, name):
+        attr = super().__getattribute__(name)
+        if not name.startswith(('get_', 'query_')):
+            return attr
+
+        async def call(**kwargs):
+            return attr(**kwargs)
+        return call
+
+
+class TestPortfolio(unittest.TestCase):
+
+    def test_price_graph(self):
+        graph = PriceGraph(SYMBOLS)
+        graph.update_prices(TICKERS)
+        self.assertEqual(graph.rate('BTC', 'USDT'), 50000.0)
+        self.assertEqual(graph.rate('USDT', 'BTC'), 1 / 50000.0)
+        self.assertEqual(graph.rate('ETH', 'USDT'), 2500.0)
+        self.assertEqual(graph.rate('BNB', 'BTC'), None)
+        self.assertEqual(graph.rate('XYZ', 'USDT'), None)
+        graph.update_price('ETHBTC', '0.06')
+        self.assertEqual(graph.rate('ETH', 'USDT'), 3000.0)
+
+    def test_price_graph_incremental(self):
+        graph = PriceGraph(SYMBOLS)
+        graph.update_prices([ticker for ticker in TICKERS if ticker['symbol'] != 'USDTBUSD'])
+        assets = ['BTC', 'ETH', 'BNB', 'USDT']
+        self.assertEqual(graph.rates(assets, 'USDT')[:2].tolist(), [50000.0, 2500.0])
+        self.assertTrue(np.isnan(graph.rates(assets, 'USDT')[2]))
+        vector = graph._vectors['USDT']
+        # a tick only recomputes the rates routed over its symbol
+        graph.update_price('BTCUSDT', '40000')
+        self.assertIs(graph._vectors['USDT'], vector)
+        self.assertEqual(graph.rates(assets, 'USDT').tolist()[:2], [40000.0, 2000.0])
+        self.assertEqual(vector.legs_by_slot[graph._slots['BTCUSDT']], [0, 1])
+        # the first price of a symbol opens a new route
+        graph.update_price('USDTBUSD', '1.0')
+        self.assertEqual(graph.rates(assets, 'USDT').tolist(), [40000.0, 2000.0, 400.0, 1.0])
+        self.assertIsNot(graph._vectors['USDT'], vector)
+        graph.update_price('UNKNOWN', '1.0')
+
+    def check_valuation(self, valuation):
+        self.assertEqual(valuation['accounts'], {SPOT: 75000.0, MARGIN: 4000.0,
+                                                 ISOLATED_MARGIN: 500.0})
+        self.assertEqual(valuation['total'], 79500.0)
+        self.assertEqual(valuation['assets'][MARGIN], {'ETH': 5000.0, 'USDT': -1000.0})
+        self.assertEqual(valuation['unpriced'], [(SPOT, 'XYZ')])
+
+    def test_valuation(self):
+        client = FakeClient()
+        portfolio = PortfolioValuation(client)
+        with self.assertRaises(ValueError):
+            portfolio.value()
+        # ticks before the first refresh are dropped
+        portfolio.on_ticker({'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '1.0'})
+        portfolio.refresh()
+        self.check_valuation(portfolio.value())
+        portfolio.on_ticker([{'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '60000.0'}])
+        self.assertEqual(portfolio.value()['accounts'][SPOT], 90000.0)
+        portfolio.refresh()
+        self.assertEqual(sorted(client.calls), ['exchangeInfo', 'ticker/price', 'ticker/price'])
+
+    def test_valuation_from_stream(self):
+        # ticks reach the valuation through the !miniTicker@arr stream
+        async def server_handler(websocket):
+            await websocket.send(json.dumps({'stream': '!miniTicker@arr', 'data': [
+                {'e': '24hrMiniTicker', 's': 'BTCUSDT', 'c': '60000.0'},
+                {'e': '24hrMiniTicker', 's': 'ETHBTC', 'c': '0.06'}]}))
+            await websocket.wait_closed()
+
+        portfolio = PortfolioValuation(FakeClient())
+        portfolio.refresh()
+
+        async def test():
+            async with websockets.serve(server_handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                streams = MarketStreamClient(stream_url='ws://127.0.0.1:{}'.format(port))
+                self.assertEqual(portfolio.subscribe(streams), '!miniTicker@arr')
+                task = asyncio.ensure_future(streams.run())
+                for _ in range(100):
+                    if portfolio.value()['accounts'][SPOT] == 90000.0:
+                        break
+                    await asyncio.sleep(0.02)
+                await streams.close()
+                await task
+                return streams
+        streams = asyncio.run(test())
+        self.assertEqual(streams.callback_errors, 0)
+        self.assertEqual(portfolio.value()['accounts'][SPOT], 90000.0)
+        self.assertEqual(portfolio.value()['assets'][MARGIN]['ETH'], 7200.0)
+
+    def test_async_valuation(self):
+        portfolio = AsyncPortfolioValuation(AsyncFakeClient())
+        asyncio.run(portfolio.refresh())
+        self.check_valuation(portfolio.value())
+
+
+if __name__ == '__main__':
+    unittest.main()
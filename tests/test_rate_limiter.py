@@ -0,0 +1,80 @@
+import json
+import unittest
+import httpretty
+from binance.rate_limiter import RateLimiter
+from binance.request_handler import RequestHandler
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_request_costs(self):
+        limiter = RateLimiter()
+        base = 'https://api.binance.com'
+        self.assertEqual(limiter.request_costs(
+            'get', base + '/api/v1/depth', {'symbol': 'ETHBTC', 'limit': 1000}),
+            {'REQUEST_WEIGHT': 10, 'RAW_REQUESTS': 1})
+        self.assertEqual(limiter.request_costs(
+            'get', base + '/api/v1/ticker/24hr')['REQUEST_WEIGHT'], 40)
+        self.assertEqual(limiter.request_costs(
+            'get', base + '/api/v1/ticker/24hr',
+            {'symbol': 'ETHBTC'})['REQUEST_WEIGHT'], 1)
+        self.assertEqual(limiter.request_costs(
+            'post', base + '/api/v3/order', [('symbol', 'ETHBTC')])['ORDERS'], 1)
+        self.assertNotIn('ORDERS', limiter.request_costs(
+            'post', base + '/api/v3/order/test'))
+        self.assertEqual(limiter.request_costs(
+            'get', base + '/sapi/v1/accountSnapshot')['SAPI_IP_WEIGHT'], 2400)
+        self.assertEqual(limiter.request_costs('get', 'https://testuri.com'), {})
+
+    def test_update_limits(self):
+        limiter = RateLimiter(headroom=0.0)
+        limiter.update_limits([{'rateLimitType': 'REQUEST_WEIGHT',
+                                'interval': 'MINUTE',
+                                'intervalNum': 1,
+                                'limit': 60}])
+        bucket = limiter.buckets[('REQUEST_WEIGHT', '1M')]
+        self.assertEqual(bucket.capacity, 60)
+        self.assertEqual(bucket.rate, 1)
+
+    def test_reserve_queues_callers(self):
+        limiter = RateLimiter(rate_limits=[{'rateLimitType': 'REQUEST_WEIGHT',
+                                            'interval': 'MINUTE',
+                                            'intervalNum': 1,
+                                            'limit': 60}],
+                              headroom=0.0)
+        uri = 'https://api.binance.com/api/v1/ticker/24hr'
+        self.assertEqual(limiter.reserve('get', uri), 0.0)
+        self.assertAlmostEqual(limiter.reserve('get', uri), 20.0, places=1)
+        self.assertAlmostEqual(limiter.reserve('get', uri), 60.0, places=1)
+
+    def test_update_from_headers(self):
+        limiter = RateLimiter(headroom=0.0)
+        limiter.update_from_headers(200, {'X-MBX-USED-WEIGHT-1M': '1100',
+                                          'X-MBX-ORDER-COUNT-10S': '100'})
+        self.assertAlmostEqual(
+            limiter.buckets[('REQUEST_WEIGHT', '1M')].tokens, 100, places=0)
+        self.assertGreater(limiter.reserve(
+            'post', 'https://api.binance.com/api/v3/order'), 0)
+
+    def test_retry_after_blocks(self):
+        limiter = RateLimiter()
+        limiter.update_from_headers(429, {'Retry-After': '30'})
+        self.assertGreater(limiter.reserve(
+            'get', 'https://api.binance.com/api/v1/ping'), 29)
+
+    @httpretty.activate
+    def test_request_handler_reads_headers(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/ping",
+                               status=200,
+                               body=json.dumps({}),
+                               adding_headers={'X-MBX-USED-WEIGHT-1M': '500'})
+        limiter = RateLimiter(headroom=0.0)
+        req_handle = RequestHandler(rate_limiter=limiter)
+        req_handle.get("https://api.binance.com/api/v1/ping")
+        self.assertAlmostEqual(
+            limiter.buckets[('REQUEST_WEIGHT', '1M')].tokens, 700, places=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
 import json
+import time
 import unittest
 import httpretty
 from collections.abc import Mapping
 from requests import Session
+from binance.clock import ServerClock
+from binance.json_decoder import JSON_DECODERS
+from binance.rate_limiter import RateLimiter
 from binance.request_handler import RequestHandler
 from binance.exceptions import BinanceAPIError, BinanceResponseError
 from binance.exceptions import RequestHandlerError
@@ -195,6 +199,75 @@ class TestRequestHandler(unittest.TestCase):
         self.assertEqual(cm.exception.message,
                          "Invalid Response: This is a faulty binance response")
 
-        
+    def test_clock_timestamp(self):
+        clock = ServerClock(lambda: {'serverTime': 10 ** 12})
+        clock.sync()
+        req_handle = RequestHandler('TestAPIKey', 'TestAPISecret')
+        req_handle.clock = clock
+        params = dict(req_handle._prepare_params(True, {'symbol': 'ETHBTC'}))
+        self.assertLess(abs(params['timestamp'] - 10 ** 12), 1000)
+        self.assertIn('signature', params)
+        self.assertLess(abs(clock.metrics['offset_ms']
+                            - (10 ** 12 - time.time() * 1000)), 1000)
+
+    @httpretty.activate
+    def test_connection_pools(self):
+        httpretty.register_uri(httpretty.GET, "https://testuri.com/api/v1/ping",
+                               body='{}')
+        httpretty.register_uri(httpretty.GET, "https://testuri.com/sapi/v1/ping",
+                               body='{}')
+        req_handle = RequestHandler(pool_maxsize=4)
+        req_handle.mount_pools("https://testuri.com/api/", "https://testuri.com/sapi/")
+        stats = req_handle.warm_up("https://testuri.com/api/v1/ping", 4)
+        opened = stats["https://testuri.com/api/"]['connections_opened']
+        self.assertTrue(1 <= opened <= 4)
+        req_handle.get("https://testuri.com/api/v1/ping")
+        req_handle.get("https://testuri.com/sapi/v1/ping")
+        stats = req_handle.pool_stats()
+        self.assertEqual(stats["https://testuri.com/api/"],
+                         {'requests': 5, 'connections_opened': opened,
+                          'connections_reused': 5 - opened})
+        self.assertEqual(stats["https://testuri.com/sapi/"]['connections_opened'], 1)
+
+    @httpretty.activate
+    def test_json_decoder(self):
+        httpretty.register_uri(httpretty.GET, "https://testuri.com",
+                               body=json.dumps({"msg": "testbody"}))
+        for decoder in JSON_DECODERS:
+            req_handle = RequestHandler(json_decoder=decoder)
+            self.assertEqual(req_handle.get("https://testuri.com"), {"msg": "testbody"})
+        req_handle.set_json_decoder('json')
+        self.assertEqual(req_handle.json_decoder, 'json')
+        with self.assertRaises(ValueError):
+            RequestHandler(json_decoder='nodecoder')
+
+    @httpretty.activate
+    def test_post_batch(self):
+        def order_callback(request, uri, response_headers):
+            params = {k: v[0] for k, v in request.querystring.items()}
+            if params['price'] == '0':
+                return [400, response_headers,
+                        json.dumps({'code': -1013, 'msg': 'Invalid price.'})]
+            return [200, response_headers, json.dumps(params)]
+        httpretty.register_uri(httpretty.POST, "https://testuri.com/api/v3/order",
+                               body=order_callback)
+        # a budget of two orders per second makes the third order wait
+        rate_limiter = RateLimiter([{'rateLimitType': 'ORDERS', 'interval': 'SECOND',
+                                     'intervalNum': 1, 'limit': 2}], headroom=0)
+        req_handle = RequestHandler('TestAPIKey', 'TestAPISecret',
+                                    rate_limiter=rate_limiter)
+        outcomes = req_handle.post_batch("https://testuri.com/api/v3/order",
+                                         [{'symbol': 'ETHBTC', 'price': '0.03'},
+                                          {'symbol': 'ETHBTC', 'price': '0'},
+                                          {'symbol': 'ETHBTC', 'price': '0.01'}])
+        self.assertEqual([result['price'] for result, _ in outcomes[::2]],
+                         ['0.03', '0.01'])
+        self.assertIsInstance(outcomes[1][1], BinanceAPIError)
+        self.assertIsNone(outcomes[1][0])
+        # the waiting order is only signed once the budget allows it
+        self.assertGreaterEqual(int(outcomes[2][0]['timestamp'])
+                                - int(outcomes[0][0]['timestamp']), 400)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,84 @@
+import json
+import unittest
+import httpretty
+from binance.client import AuthenticatedClient
+from binance.exceptions import BinanceAPIError
+from binance.request_handler import RequestHandler
+from binance.retry import RetryPolicy
+
+
+ORDER_URI = "https://api.binance.com/api/v3/order"
+
+
+class TestRetry(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=3, backoff=0, jitter=False)
+
+    def test_get_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=4, jitter=False)
+        self.assertEqual([policy.backoff_delay(i) for i in range(4)], [1, 2, 4, 4])
+        self.assertTrue(policy.is_retryable('get', ORDER_URI, {}))
+        self.assertFalse(policy.is_retryable('post', ORDER_URI, {}))
+        self.assertTrue(policy.is_retryable('post', ORDER_URI,
+                                            {'newClientOrderId': 'abc'}))
+        self.assertIsNone(policy.get_delay(3, 'get', ORDER_URI, {}))
+
+    @httpretty.activate
+    def test_retry_get(self):
+        responses = [httpretty.Response(body='{}', status=503),
+                     httpretty.Response(body='{}', status=429,
+                                        adding_headers={'Retry-After': '0'}),
+                     httpretty.Response(body='{"serverTime": 1}', status=200)]
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/api/v1/time",
+                               responses=responses)
+        handler = RequestHandler(retry_policy=self.policy)
+        self.assertEqual(handler.get("https://api.binance.com/api/v1/time"),
+                         {'serverTime': 1})
+        self.assertEqual(len(httpretty.latest_requests()), 3)
+
+    @httpretty.activate
+    def test_no_retry_without_client_order_id(self):
+        httpretty.register_uri(httpretty.POST, ORDER_URI, status=502,
+                               body=json.dumps({'code': -1001, 'msg': 'error'}))
+        client = AuthenticatedClient('key', 'secret')
+        client.set_spot_retry_policy(self.policy)
+        with self.assertRaises(BinanceAPIError):
+            client.create_order('ETHBTC', 'BUY', 'MARKET', quantity=1)
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+    @httpretty.activate
+    def test_order_lookup_before_retry(self):
+        order = {'symbol': 'ETHBTC', 'clientOrderId': 'abc', 'status': 'FILLED'}
+        httpretty.register_uri(httpretty.POST, ORDER_URI, status=502,
+                               body=json.dumps({'code': -1001, 'msg': 'error'}))
+        httpretty.register_uri(httpretty.GET, ORDER_URI, body=json.dumps(order))
+        client = AuthenticatedClient('key', 'secret')
+        client.set_spot_retry_policy(self.policy)
+        self.assertEqual(client.create_order('ETHBTC', 'BUY', 'MARKET', quantity=1,
+                                             newClientOrderId='abc'), order)
+        methods = [request.method for request in httpretty.latest_requests()]
+        self.assertEqual(methods, ['POST', 'GET'])
+        self.assertEqual(httpretty.last_request().querystring['origClientOrderId'],
+                         ['abc'])
+
+    @httpretty.activate
+    def test_order_resent_when_not_found(self):
+        order = {'symbol': 'ETHBTC', 'clientOrderId': 'abc', 'status': 'NEW'}
+        httpretty.register_uri(httpretty.POST, ORDER_URI,
+                               responses=[httpretty.Response(body='{}', status=503),
+                                          httpretty.Response(body=json.dumps(order))])
+        httpretty.register_uri(httpretty.GET, ORDER_URI, status=400,
+                               body=json.dumps({'code': -2013,
+                                                'msg': 'Order does not exist.'}))
+        client = AuthenticatedClient('key', 'secret')
+        client.set_spot_retry_policy(self.policy)
+        self.assertEqual(client.create_order('ETHBTC', 'BUY', 'MARKET', quantity=1,
+                                             newClientOrderId='abc'), order)
+        methods = [request.method for request in httpretty.latest_requests()]
+        self.assertEqual(methods, ['POST', 'GET', 'POST'])
+
+
+if __name__ == '__main__':
+    unittest.main()
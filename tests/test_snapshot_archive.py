@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from binance.api_def import WalletType
+from binance.snapshot_archive import DAY_MS, SnapshotArchive
+
+
+FIRST_DAY = 18000
+
+
+class FakeClient(object):
+    def __init__(self, first_day=FIRST_DAY, last_day=None):
+        self.calls = []
+        self.first_day = first_day
+        # last day with a published snapshot
+        self.last_day = last_day
+        self._lock = threading.Lock()
+
+    def get_daily_account_snapshot(self, type, startTime, endTime, limit):
+        with self._lock:
+            self.calls.append((type, startTime // DAY_MS, endTime // DAY_MS))
+        if type == WalletType.FUTURES:
+            raise ValueError('futures account not enabled')
+        first_day = max(self.first_day, startTime // DAY_MS)
+        last_day = endTime // DAY_MS
+        if self.last_day is not None:
+            last_day = min(last_day, self.last_day)
+        snapshots = []
+        for day in range(first_day, last_day + 1)[:limit]:
+            balances = [{'asset': 'BTC', 'free': str(day - self.first_day), 'locked': '0'}]
+            if type == WalletType.MARGIN:
+                balances = [dict(balances[0], borrowed='1.0', netAsset='2.5')]
+            snapshots.append({'type': type.lower(), 'updateTime': (day + 1) * DAY_MS - 1,
+                              'data': {'totalAssetOfBtc': '1.0',
+                                       'balances' if type == WalletType.SPOT
+                                       else 'userAssets': balances}})
+        return {'code': 200, 'msg': '', 'snapshotVos': snapshots}
+
+
+class TestSnapshotArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_sync_and_read(self):
+        client = FakeClient()
+        archive = SnapshotArchive(os.path.join(self.path, 'snapshots.db'), client)
+        # the first ten days have no snapshots
+        start, end = (FIRST_DAY - 10) * DAY_MS, (FIRST_DAY + 60) * DAY_MS - 1
+        result = archive.sync(start, end)
+        self.assertEqual(result.results, {WalletType.SPOT: 60, WalletType.MARGIN: 60})
+        self.assertEqual(list(result.errors), [WalletType.FUTURES])
+        self.assertEqual(sorted(call[1:] for call in client.calls
+                                if call[0] == WalletType.SPOT),
+                         [(FIRST_DAY - 10, FIRST_DAY + 19), (FIRST_DAY + 20, FIRST_DAY + 49),
+                          (FIRST_DAY + 50, FIRST_DAY + 59)])
+
+        client.calls = []
+        result = archive.sync(start, end + 5 * DAY_MS, wallet_types=(WalletType.SPOT,))
+        self.assertEqual(result.results, {WalletType.SPOT: 5})
+        self.assertEqual(client.calls, [(WalletType.SPOT, FIRST_DAY + 60, FIRST_DAY + 64)])
+        self.assertEqual(archive.missing_days(WalletType.SPOT, start, end), [])
+
+        snapshots = archive.read(WalletType.SPOT, FIRST_DAY * DAY_MS,
+                                 (FIRST_DAY + 10) * DAY_MS)
+        self.assertEqual(len(snapshots), 10)
+        self.assertEqual(snapshots[0]['data']['balances'][0]['free'], '0')
+        times, values = archive.balance_series(WalletType.SPOT, 'btc')
+        self.assertEqual(values.tolist(), [float(day) for day in range(65)])
+        self.assertEqual(values.dtype, 'float64')
+        self.assertEqual(times[0], (FIRST_DAY + 1) * DAY_MS - 1)
+        self.assertEqual(archive.balance_series(
+            WalletType.MARGIN, 'BTC', 'netAsset')[1].tolist(), [2.5] * 60)
+        self.assertEqual(len(archive.balance_series(WalletType.FUTURES, 'BTC')[0]), 0)
+        archive.close()
+
+    def test_recent_days_without_snapshot(self):
+        # yesterday's snapshot is not published yet, so the day is requested
+        # again by the next sync instead of being left as a gap
+        today = int(time.time() * 1000) // DAY_MS
+        client = FakeClient(first_day=today - 10, last_day=today - 2)
+        archive = SnapshotArchive(os.path.join(self.path, 'snapshots.db'), client)
+        start = (today - 5) * DAY_MS
+        result = archive.sync(start, wallet_types=(WalletType.SPOT,))
+        self.assertEqual(result.results, {WalletType.SPOT: 4})
+        self.assertEqual(archive.missing_days(WalletType.SPOT, start), [today - 1, today])
+
+        client.last_day = today - 1
+        client.calls = []
+        result = archive.sync(start, wallet_types=(WalletType.SPOT,))
+        self.assertEqual(result.results, {WalletType.SPOT: 1})
+        self.assertEqual(client.calls, [(WalletType.SPOT, today - 1, today)])
+        self.assertEqual(archive.missing_days(WalletType.SPOT, start), [today])
+        archive.close()
+
+    def test_sync_without_client(self):
+        archive = SnapshotArchive(os.path.join(self.path, 'snapshots.db'))
+        with self.assertRaises(ValueError):
+            archive.sync(0)
+        archive.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import unittest
+import warnings
+import httpretty
+from urllib.parse import urlparse, parse_qs
+from binance.client import AuthenticatedClient
+
+
+FIRST_TIME = 1000
+
+
+class TestSpotTrade(unittest.TestCase):
+
+    def records_callback(self, id_field):
+        # one record every 10 ms, filtered and limited like the exchange does
+        def callback(request, uri, response_headers):
+            query = {k: v[0] for k, v in parse_qs(urlparse(uri).query).items()}
+            self.requests.append(query)
+            start = int(query.get('startTime', 0))
+            end = int(query.get('endTime', 10 ** 15))
+            records = [{'symbol': 'ETHBTC', id_field: i, 'time': FIRST_TIME + i * 10}
+                       for i in range(self.total)
+                       if start <= FIRST_TIME + i * 10 <= end]
+            return [200, response_headers, json.dumps(records[:int(query['limit'])])]
+        return callback
+
+    def setUp(self):
+        self.requests = []
+        self.total = 1200
+        self.client = AuthenticatedClient('TestAPIKey', 'TestAPISecret')
+
+    def check_pages(self, pages, id_field):
+        self.assertEqual([len(page) for page in pages], [500, 500, 200])
+        ids = [record[id_field] for page in pages for record in page]
+        # no record is repeated or skipped at the page boundaries
+        self.assertEqual(ids, list(range(self.total)))
+        # one request for the earliest record, then one per page
+        self.assertEqual(len(self.requests), 4)
+        self.assertEqual(self.requests[2]['startTime'], str(FIRST_TIME + 499 * 10 + 1))
+
+    @httpretty.activate
+    def test_iter_all_orders(self):
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/api/v3/allOrders",
+                               body=self.records_callback('orderId'))
+        pages = list(self.client.iter_all_orders('ETHBTC'))
+        self.check_pages(pages, 'orderId')
+        self.assertEqual(self.client.get_all_orders('ETHBTC'),
+                         [record for page in pages for record in page])
+
+    @httpretty.activate
+    def test_iter_trade_list(self):
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/api/v3/myTrades",
+                               body=self.records_callback('id'))
+        pages = list(self.client.iter_trade_list('ETHBTC'))
+        self.check_pages(pages, 'id')
+        # a resumed iteration starts right after the last yielded record
+        self.requests = []
+        resumed = list(self.client.iter_trade_list(
+            'ETHBTC', startTime=pages[0][-1]['time'] + 1))
+        self.assertEqual(resumed[0][0], pages[1][0])
+        self.assertEqual(sum(len(page) for page in resumed), 700)
+
+    @httpretty.activate
+    def test_iter_ends_on_empty_and_end_time(self):
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/api/v3/myTrades",
+                               body=self.records_callback('id'))
+        self.total = 0
+        self.assertEqual(list(self.client.iter_trade_list('ETHBTC')), [])
+        self.assertEqual(len(self.requests), 1)
+        # exactly one full page up to endTime needs one more, empty, request
+        self.total = 1200
+        self.requests = []
+        pages = list(self.client.iter_trade_list('ETHBTC',
+                                                 endTime=FIRST_TIME + 499 * 10))
+        self.assertEqual([len(page) for page in pages], [500])
+        self.assertEqual(len(self.requests), 3)
+
+    @httpretty.activate
+    def test_deprecated_form_id(self):
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/api/v3/allOrderList",
+                               body='[]')
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/sapi/v1/margin/myTrades",
+                               body='[]')
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.client.get_all_oco_orders(formId=7)
+            self.client.query_margin_account_trade_list('ETHBTC', formId=3)
+        self.assertEqual([warning.category for warning in caught],
+                         [DeprecationWarning, DeprecationWarning])
+        self.assertEqual(caught[0].filename, __file__)
+        queries = [parse_qs(urlparse(request.path).query)
+                   for request in httpretty.latest_requests()]
+        self.assertEqual([query['fromId'] for query in queries], [['7'], ['3']])
+        self.assertTrue(all('formId' not in query for query in queries))
+        with self.assertRaises(TypeError), self.assertWarns(DeprecationWarning):
+            self.client.get_trade_list('ETHBTC', fromId=1, formId=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
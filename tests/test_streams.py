@@ -0,0 +1,139 @@
+import asyncio
+import json
+import unittest
+import websockets
+from binance.streams import MarketStreamClient
+
+
+def agg_trade(trade_id):
+    return {'a': trade_id, 'p': '0.03', 'q': '1.0', 'f': trade_id, 'l': trade_id,
+            'T': 1000 + trade_id, 'm': True, 'M': True}
+
+
+def kline(open_time):
+    return [open_time, '0.03', '0.04', '0.02', '0.035', '10.0', open_time + 59999,
+            '0.3', 5, '4.0', '0.12', '0']
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.agg_trade_calls = []
+        self.kline_calls = []
+        # 2500 one minute klines, the last one still open
+        self.kline_times = [i * 60000 for i in range(2500)]
+
+    def get_agg_trades(self, symbol, fromId=None, startTime=None, endTime=None,
+                       limit=500):
+        self.agg_trade_calls.append(fromId)
+        return [agg_trade(trade_id) for trade_id in range(fromId, 6)]
+
+    def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500):
+        self.kline_calls.append(startTime)
+        return [kline(open_time) for open_time in self.kline_times
+                if open_time >= startTime][:limit]
+
+
+class TestMarketStreamClient(unittest.TestCase):
+
+    def test_sharding_and_backfill(self):
+        paths = []
+
+        async def server_handler(websocket):
+            path = websocket.request.path
+            paths.append(path)
+            if 'aggTrade' not in path:
+                await websocket.wait_closed()
+                return
+            # the first connection drops after trade 2, trades 3 and 4 are
+            # only available through the backfill
+            trade_ids = [1, 2] if paths.count(path) == 1 else [5, 6]
+            for trade_id in trade_ids:
+                await websocket.send(json.dumps({
+                    'stream': 'ethbtc@aggTrade',
+                    'data': dict(agg_trade(trade_id), e='aggTrade', E=0, s='ETHBTC')}))
+            if trade_ids[0] == 5:
+                await websocket.wait_closed()
+
+        received = []
+        client = FakeClient()
+
+        async def test():
+            async with websockets.serve(server_handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                streams = MarketStreamClient(client,
+                                             stream_url='ws://127.0.0.1:{}'.format(port),
+                                             max_streams_per_connection=2,
+                                             reconnect_backoff=0.01)
+                streams.subscribe_agg_trades('ETHBTC', lambda event: received.append(event['a']))
+                streams.subscribe_book_ticker('ETHBTC', received.append)
+                streams.subscribe_klines('BNBBTC', '1m', received.append)
+                task = asyncio.ensure_future(streams.run())
+                for _ in range(100):
+                    if len(received) >= 6:
+                        break
+                    await asyncio.sleep(0.02)
+                await streams.close()
+                await task
+                return streams
+        streams = asyncio.run(test())
+        self.assertEqual(len(streams.connections), 2)
+        self.assertEqual(streams.connections[0].streams,
+                         ['ethbtc@aggTrade', 'ethbtc@bookTicker'])
+        self.assertEqual(received, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(client.agg_trade_calls, [3])
+
+    def test_array_payload_and_failing_callback(self):
+        tickers = [{'e': '24hrMiniTicker', 's': 'ETHBTC', 'c': '0.03'},
+                   {'e': '24hrMiniTicker', 's': 'BNBBTC', 'c': '0.01'}]
+
+        async def server_handler(websocket):
+            for _ in range(2):
+                await websocket.send(json.dumps({'stream': '!miniTicker@arr',
+                                                 'data': tickers}))
+                await websocket.send(json.dumps({'stream': 'ethbtc@bookTicker',
+                                                 'data': {'u': 1, 's': 'ETHBTC'}}))
+            await websocket.wait_closed()
+
+        received, errors = [], []
+
+        def failing_callback(event):
+            raise ValueError('callback failed')
+
+        async def test():
+            async with websockets.serve(server_handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                streams = MarketStreamClient(stream_url='ws://127.0.0.1:{}'.format(port),
+                                             on_error=lambda stream, error:
+                                             errors.append(stream))
+                streams.subscribe_mini_ticker(failing_callback)
+                streams.subscribe_mini_ticker(received.append)
+                streams.subscribe_book_ticker('ETHBTC', received.append)
+                task = asyncio.ensure_future(streams.run())
+                for _ in range(100):
+                    if len(received) >= 4:
+                        break
+                    await asyncio.sleep(0.02)
+                await streams.close()
+                await task
+                return streams
+        streams = asyncio.run(test())
+        self.assertEqual(received, [tickers, {'u': 1, 's': 'ETHBTC'}] * 2)
+        self.assertEqual(errors, ['!miniTicker@arr'] * 2)
+        self.assertIsInstance(streams.last_error, ValueError)
+
+    def test_kline_backfill_pages(self):
+        # an outage of more than 1000 intervals is backfilled page by page
+        received = []
+        client = FakeClient()
+        streams = MarketStreamClient(client, stream_url='ws://127.0.0.1:1')
+        stream = streams.subscribe_klines('BNBBTC', '1m',
+                                          lambda event: received.append(event['k']['t']))
+        streams._last_kline_open_times[stream] = 100 * 60000
+        asyncio.run(streams._backfill([stream]))
+        self.assertEqual(received, client.kline_times[100:])
+        self.assertEqual(client.kline_calls, [100 * 60000, 1099 * 60000 + 1,
+                                              2099 * 60000 + 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
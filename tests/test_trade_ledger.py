@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import httpretty
+from urllib.parse import urlparse, parse_qs
+from binance.client import AuthenticatedClient
+from binance.trade_ledger import AsyncTradeLedger, TradeLedger
+
+
+def trade(symbol, trade_id):
+    return {'symbol': symbol, 'id': trade_id, 'orderId': trade_id // 2,
+            'orderListId': -1, 'price': '0.03', 'qty': '1.0', 'quoteQty': '0.03',
+            'commission': '0.001', 'commissionAsset': 'BNB', 'time': 1000 * trade_id,
+            'isBuyer': trade_id % 2 == 0, 'isMaker': False, 'isBestMatch': True}
+
+
+class TestTradeLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.last_ids = {'ETHBTC': 2499, 'BNBBTC': 9}
+        self.from_ids = []
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def trades_callback(self, request, uri, response_headers):
+        query = parse_qs(urlparse(uri).query)
+        symbol = query['symbol'][0]
+        from_id = int(query['fromId'][0])
+        limit = int(query['limit'][0])
+        self.from_ids.append((symbol, from_id))
+        trades = [trade(symbol, trade_id)
+                  for trade_id in range(from_id, self.last_ids[symbol] + 1)]
+        return [200, response_headers, json.dumps(trades[:limit])]
+
+    @httpretty.activate
+    def test_sync_and_read(self):
+        httpretty.register_uri(httpretty.GET, "https://api.binance.com/api/v3/myTrades",
+                               body=self.trades_callback)
+        client = AuthenticatedClient('TestAPIKey', 'TestAPISecret')
+        ledger = TradeLedger(os.path.join(self.path, 'trades.db'), client)
+        self.assertIsNone(ledger.last_trade_id('ETHBTC'))
+        result = ledger.sync_symbols(['ETHBTC', 'BNBBTC'])
+        self.assertEqual(result.results, {'ETHBTC': 2500, 'BNBBTC': 10})
+        self.assertEqual(sorted(self.from_ids), [('BNBBTC', 0), ('ETHBTC', 0),
+                                                 ('ETHBTC', 1000), ('ETHBTC', 2000)])
+
+        self.last_ids['ETHBTC'] = 2599
+        self.from_ids = []
+        self.assertEqual(ledger.sync('ethbtc'), 100)
+        self.assertEqual(self.from_ids, [('ETHBTC', 2500)])
+        self.assertEqual(ledger.last_trade_id('ETHBTC'), 2599)
+
+        trades = ledger.read('ETHBTC', 10000, 19000)
+        self.assertEqual(len(trades), 10)
+        self.assertEqual(trades[0], trade('ETHBTC', 10))
+        self.assertEqual(len(ledger.read('ETHBTC')), 2600)
+        self.assertEqual(ledger.symbols(), ['BNBBTC', 'ETHBTC'])
+        self.assertEqual(ledger.append([trade('ETHBTC', 5)]), 0)
+        ledger.close()
+
+    def test_async_sync(self):
+        # an async client is synced through the public get_trade_page
+        last_ids = self.last_ids
+        from_ids = self.from_ids
+
+        class FakeAsyncClient(object):
+            class request_handler(object):
+                pool_maxsize = 4
+
+            async def get_trade_page(self, symbol, fromId=None, limit=None):
+                from_ids.append((symbol, fromId))
+                await asyncio.sleep(0)
+                return [trade(symbol, trade_id)
+                        for trade_id in range(fromId, last_ids[symbol] + 1)][:limit]
+
+        ledger = AsyncTradeLedger(os.path.join(self.path, 'trades.db'), FakeAsyncClient())
+        result = asyncio.run(ledger.sync_symbols(['ETHBTC', 'BNBBTC']))
+        self.assertEqual(result.results, {'ETHBTC': 2500, 'BNBBTC': 10})
+        self.assertEqual(sorted(self.from_ids), [('BNBBTC', 0), ('ETHBTC', 0),
+                                                 ('ETHBTC', 1000), ('ETHBTC', 2000)])
+        self.assertEqual(asyncio.run(ledger.sync('ETHBTC')), 0)
+        self.assertEqual(len(ledger.read('ETHBTC')), 2500)
+        ledger.close()
+        # the blocking ledger refuses the async client
+        ledger = TradeLedger(os.path.join(self.path, 'trades.db'), FakeAsyncClient())
+        with self.assertRaises(TypeError):
+            ledger.sync('BNBBTC')
+        ledger.close()
+
+    def test_sync_without_client(self):
+        ledger = TradeLedger(os.path.join(self.path, 'trades.db'))
+        self.assertEqual(ledger.read('ETHBTC'), [])
+        with self.assertRaises(ValueError):
+            ledger.sync('ETHBTC')
+        ledger.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
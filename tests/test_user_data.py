@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+import unittest
+import websockets
+from binance.user_data import MARGIN, SPOT, UserDataStream
+
+
+# event times after the cache is loaded
+NOW = int(time.time() * 1000) + 60000
+# update time of the reloaded accounts
+LOADED = NOW - 60000
+
+
+def execution_report(order_id, status, symbol='ETHBTC', event_time=NOW):
+    return {'e': 'executionReport', 'E': event_time, 's': symbol, 'c': 'client', 'S': 'BUY',
+            'o': 'LIMIT', 'f': 'GTC', 'q': '1.0', 'p': '0.03', 'P': '0', 'F': '0',
+            'g': -1, 'C': '', 'x': 'NEW', 'X': status, 'i': order_id, 'z': '0',
+            'Z': '0', 'T': event_time, 'w': True, 'O': 1, 'Q': '0'}
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.listen_keys = ['key1', 'key2']
+        self.open_orders = [[{'symbol': 'ETHBTC', 'orderId': 1, 'status': 'NEW',
+                              'updateTime': 1}],
+                            [{'symbol': 'BNBBTC', 'orderId': 7, 'status': 'NEW',
+                              'updateTime': 1}]]
+        self.open_order_calls = 0
+
+    def get_server_time(self):
+        return {'serverTime': 5}
+
+    def create_margin_listen_key(self):
+        return {'listenKey': self.listen_keys.pop(0)}
+
+    def keepalive_margin_listen_key(self, listenKey):
+        return {}
+
+    def query_margin_account_open_orders(self):
+        self.open_order_calls += 1
+        return self.open_orders.pop(0)
+
+    def query_cross_margin_account_details(self):
+        return {'userAssets': [{'asset': 'BTC', 'free': '1.0', 'locked': '0'}]}
+
+
+class FakeSpotClient(object):
+    def __init__(self):
+        self.open_orders = [[{'symbol': 'ETHBTC', 'orderId': 1, 'status': 'NEW',
+                              'updateTime': LOADED}], []]
+        self.balances = [[{'asset': 'BTC', 'free': '1.0', 'locked': '0.5'}],
+                         [{'asset': 'BTC', 'free': '1.5', 'locked': '0'},
+                          {'asset': 'ETH', 'free': '10.0', 'locked': '0'}]]
+
+    def create_listen_key(self):
+        return {'listenKey': 'spotkey'}
+
+    def keepalive_listen_key(self, listenKey):
+        return {}
+
+    def get_open_orders(self):
+        return self.open_orders.pop(0)
+
+    def get_account_info(self):
+        return {'balances': self.balances.pop(0), 'updateTime': LOADED}
+
+
+class TestUserDataStream(unittest.TestCase):
+
+    def test_cache_and_listen_key_renewal(self):
+        paths = []
+        balances = []
+        first_events = [
+            execution_report(2, 'NEW'),
+            execution_report(1, 'FILLED'),
+            {'e': 'outboundAccountPosition', 'E': NOW + 3, 'u': 10,
+             'B': [{'a': 'BTC', 'f': '0.5', 'l': '0.1'}]},
+            # already contained in the position update above
+            {'e': 'balanceUpdate', 'E': NOW + 3, 'a': 'BTC', 'd': '0.2', 'T': 9},
+            {'e': 'balanceUpdate', 'E': NOW + 4, 'a': 'BTC', 'd': '0.25', 'T': 11},
+            {'e': 'listenKeyExpired', 'E': NOW + 5}]
+
+        async def server_handler(websocket):
+            paths.append(websocket.request.path)
+            if len(paths) == 1:
+                for event in first_events:
+                    await websocket.send(json.dumps({'stream': 'key1', 'data': event}))
+            await websocket.wait_closed()
+
+        async def test():
+            async with websockets.serve(server_handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                stream = UserDataStream(FakeClient(), account=MARGIN,
+                                        stream_url='ws://127.0.0.1:{}'.format(port),
+                                        on_event=lambda event: balances.append(
+                                            stream.get_balance('btc')))
+                stream.stream.reconnect_backoff = 0.01
+                task = asyncio.ensure_future(stream.run())
+                for _ in range(100):
+                    if stream.reconciles == 2:
+                        break
+                    await asyncio.sleep(0.02)
+                await stream.close()
+                await task
+                return stream
+        stream = asyncio.run(test())
+        self.assertEqual(paths, ['/stream?streams=key1', '/stream?streams=key2'])
+        self.assertEqual(stream.listen_key, 'key2')
+        self.assertEqual(stream.client.open_order_calls, 2)
+        self.assertEqual(stream.get_open_orders(), [
+            {'symbol': 'BNBBTC', 'orderId': 7, 'status': 'NEW', 'updateTime': 1}])
+        self.assertEqual(balances[-1], {'asset': 'BTC', 'free': '0.75', 'locked': '0.1'})
+        # the balances are reloaded with the new listenKey
+        self.assertEqual(stream.get_balance('btc'),
+                         {'asset': 'BTC', 'free': '1.0', 'locked': '0'})
+
+    def test_spot_reload_after_reconnect(self):
+        # balance changes during the outage are never streamed, and events
+        # stamped before the reload must not bring back the filled order
+        connections = []
+        stale = [execution_report(1, 'NEW', event_time=1000),
+                 {'e': 'balanceUpdate', 'E': 1000, 'a': 'BTC', 'd': '5.0', 'T': 1000}]
+
+        async def server_handler(websocket):
+            connections.append(websocket.request.path)
+            if len(connections) == 1:
+                await websocket.send(json.dumps({'stream': 'spotkey', 'data': {
+                    'e': 'outboundAccountPosition', 'E': NOW, 'u': NOW,
+                    'B': [{'a': 'BTC', 'f': '0.8', 'l': '0.5'}]}}))
+                await asyncio.sleep(0.05)
+                await websocket.close()
+                return
+            for event in stale + [execution_report(3, 'NEW')]:
+                await websocket.send(json.dumps({'stream': 'spotkey', 'data': event}))
+            await websocket.wait_closed()
+
+        async def test():
+            async with websockets.serve(server_handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                stream = UserDataStream(FakeSpotClient(), account=SPOT,
+                                        stream_url='ws://127.0.0.1:{}'.format(port))
+                stream.stream.reconnect_backoff = 0.01
+                task = asyncio.ensure_future(stream.run())
+                for _ in range(100):
+                    if stream.get_open_orders():
+                        if stream.get_open_orders()[0]['orderId'] == 3:
+                            break
+                    await asyncio.sleep(0.02)
+                await stream.close()
+                await task
+                return stream
+        stream = asyncio.run(test())
+        self.assertEqual(len(connections), 2)
+        self.assertEqual(stream.reconciles, 2)
+        self.assertEqual([order['orderId'] for order in stream.get_open_orders()], [3])
+        self.assertEqual(stream.balances, {
+            'BTC': {'asset': 'BTC', 'free': '1.5', 'locked': '0'},
+            'ETH': {'asset': 'ETH', 'free': '10.0', 'locked': '0'}})
+
+    def test_reload_reconciled_by_update_times(self):
+        # events are compared with the update times of the reload, whatever
+        # the local clock says
+        client = FakeSpotClient()
+        client.open_orders = [[{'symbol': 'ETHBTC', 'orderId': 1, 'status': 'NEW',
+                                'executedQty': '0', 'updateTime': 7000}]]
+        client.balances = [[{'asset': 'BTC', 'free': '1.0', 'locked': '0'}]]
+        client.get_account_info = lambda: {'balances': client.balances.pop(0),
+                                           'updateTime': 5000}
+        stream = UserDataStream(client, account=SPOT, stream_url='ws://127.0.0.1:1')
+        asyncio.run(stream._on_connect())
+        events = [
+            # already in the reload
+            execution_report(1, 'FILLED', event_time=6500),
+            execution_report(2, 'NEW', event_time=4000),
+            {'e': 'balanceUpdate', 'E': 5000, 'a': 'BTC', 'd': '5.0', 'T': 5000},
+            {'e': 'outboundAccountPosition', 'E': 4000, 'u': 4000,
+             'B': [{'a': 'BTC', 'f': '9.0', 'l': '0'}]},
+            # after the reload, though long before the local time
+            execution_report(3, 'NEW', event_time=6000),
+            dict(execution_report(1, 'PARTIALLY_FILLED', event_time=7500), z='0.5'),
+            {'e': 'balanceUpdate', 'E': 5001, 'a': 'BTC', 'd': '0.5', 'T': 5001}]
+        for event in events:
+            stream._apply(event)
+        orders = {order['orderId']: order for order in stream.get_open_orders()}
+        self.assertEqual(sorted(orders), [1, 3])
+        self.assertEqual(orders[1]['executedQty'], '0.5')
+        self.assertEqual(stream.get_balance('BTC'), {'asset': 'BTC', 'free': '1.5', 'locked': '0'})
+
+
+if __name__ == '__main__':
+    unittest.main()
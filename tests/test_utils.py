@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import threading
+import time
 import unittest
 from binance.utils import create_sorted_list, create_query_string
-from binance.utils import format_time, interval_to_ms
+from binance.utils import format_time, interval_to_ms, iter_concurrently
 from binance.api_def import KlineInterval
 
 
@@ -64,6 +68,40 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(format_time("25.2.2021"), 1614211200000)
         self.assertEqual(format_time("2/23/2021 18:15:55"), 1614104155000)
 
+    def test_iter_concurrently_stopped_early(self):
+        calls = []
+        lock = threading.Lock()
+
+        def slow_call(index):
+            with lock:
+                calls.append(index)
+            time.sleep(0.05)
+            return index
+
+        results = iter_concurrently(slow_call, [{'index': i} for i in range(100)],
+                                    max_workers=2)
+        start = time.monotonic()
+        self.assertEqual([next(results), next(results)], [0, 1])
+        results.close()
+        # the remaining calls are cancelled instead of run to completion
+        self.assertLess(time.monotonic() - start, 1.0)
+        time.sleep(0.1)
+        self.assertLess(len(calls), 10)
+
+    def test_iter_concurrently_without_cancel_futures(self):
+        # python before 3.9 has no shutdown(cancel_futures=True), the early
+        # stop and the full iteration must not depend on it
+        shutdown = ThreadPoolExecutor.shutdown
+
+        def old_shutdown(self, wait=True):
+            return shutdown(self, wait)
+
+        with mock.patch.object(ThreadPoolExecutor, 'shutdown', old_shutdown):
+            self.assertEqual(list(iter_concurrently(lambda index: index,
+                                                    [{'index': i} for i in range(5)])),
+                             list(range(5)))
+            self.test_iter_concurrently_stopped_early()
+
 
 if __name__ == "__main__":
     unittest.main()
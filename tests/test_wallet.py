@@ -0,0 +1,83 @@
+import asyncio
+import json
+import unittest
+import httpretty
+from urllib.parse import urlparse, parse_qs
+from binance.async_client import AsyncAuthenticatedClient
+from binance.client import AuthenticatedClient
+
+
+ONE_DAY = 24 * 3600 * 1000
+TWO_HOURS = 2 * 3600 * 1000
+DEPOSITS = [{'txId': 'tx{}'.format(i), 'coin': 'BTC', 'amount': '0.1',
+             'insertTime': i * TWO_HOURS} for i in range(200 * 12)]
+
+
+class TestWallet(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+
+    def deposits_callback(self, request, uri, response_headers):
+        query = {k: int(v[0]) for k, v in parse_qs(urlparse(uri).query).items()
+                 if k in ('startTime', 'endTime', 'offset', 'limit')}
+        self.assertLessEqual(query['endTime'] - query['startTime'], 90 * ONE_DAY)
+        self.requests.append(query)
+        return [200, response_headers, json.dumps(self.deposits_page(**query))]
+
+    @staticmethod
+    def deposits_page(startTime, endTime, offset, limit, **params):
+        deposits = [deposit for deposit in reversed(DEPOSITS)
+                    if startTime <= deposit['insertTime'] <= endTime]
+        return deposits[offset:offset + limit]
+
+    @httpretty.activate
+    def test_deposit_history_range(self):
+        httpretty.register_uri(httpretty.GET,
+                               "https://api.binance.com/sapi/v1/capital/deposit/hisrec",
+                               body=self.deposits_callback)
+        client = AuthenticatedClient('TestAPIKey', 'TestAPISecret')
+        deposits = client.get_deposit_history_range(0, 200 * ONE_DAY - 1)
+        self.assertEqual(deposits, DEPOSITS)
+        # three windows, the first two are paged twice
+        self.assertEqual(len(self.requests), 5)
+        self.assertEqual(list(client.iter_deposit_history_range(0, 200 * ONE_DAY - 1)),
+                         DEPOSITS)
+
+    def test_async_deposit_history_range(self):
+        async def get_deposit_history(**params):
+            return self.deposits_page(**params)
+
+        async def get_async():
+            async with AsyncAuthenticatedClient('TestAPIKey', 'TestAPISecret') as client:
+                client.get_deposit_history = get_deposit_history
+                deposits = await client.get_deposit_history_range(0, 200 * ONE_DAY - 1)
+                streamed = [deposit async for deposit in client.iter_deposit_history_range(
+                    0, 200 * ONE_DAY - 1)]
+                return deposits, streamed
+        self.assertEqual(asyncio.run(get_async()), (DEPOSITS, DEPOSITS))
+
+        async def failing_window(**params):
+            if params['startTime'] > 0:
+                raise ValueError('window failed')
+            return self.deposits_page(**params)
+
+        async def get_failing():
+            async with AsyncAuthenticatedClient('TestAPIKey', 'TestAPISecret') as client:
+                client.get_deposit_history = failing_window
+                return await client.get_deposit_history_range(0, 200 * ONE_DAY - 1)
+        # a failed window fails the whole range, like the blocking client
+        with self.assertRaises(ValueError):
+            asyncio.run(get_failing())
+
+    def test_history_windows(self):
+        windows = AuthenticatedClient._history_windows(0, 180 * ONE_DAY)
+        self.assertEqual(windows, [(0, 90 * ONE_DAY - 1),
+                                   (90 * ONE_DAY, 180 * ONE_DAY - 1),
+                                   (180 * ONE_DAY, 180 * ONE_DAY)])
+        with self.assertRaises(ValueError):
+            AuthenticatedClient._history_windows(ONE_DAY, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()